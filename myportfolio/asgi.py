@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+The async read views (portfolio/async_views.py) are opt-in: set
+PORTFOLIO_ASYNC_VIEWS=1 in the server's environment to serve them, after
+comparing them with `manage.py benchmark_views`. Otherwise ASGI serves the
+same sync views as WSGI.
 """
 
 import os
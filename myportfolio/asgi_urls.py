@@ -0,0 +1,12 @@
+"""
+URL configuration used with PORTFOLIO_ASYNC_VIEWS=1 (see asgi.py): the async
+versions of the public read views (portfolio/async_urls.py) take precedence
+over the sync ones; everything else is the same as in urls.py.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('', include('portfolio.async_urls')),
+] + sync_urlpatterns
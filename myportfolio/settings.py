@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware', # Serves collected static files; see STORAGES below
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -40,7 +41,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'myportfolio.urls'
+# With PORTFOLIO_ASYNC_VIEWS=1 in the environment (opt-in, for ASGI; see asgi.py) the public
+# read views are the async versions in portfolio/async_views.py; otherwise the sync ones.
+ROOT_URLCONF = 'myportfolio.asgi_urls' if os.environ.get('PORTFOLIO_ASYNC_VIEWS') == '1' else 'myportfolio.urls'
 
 TEMPLATES = [
     {
@@ -72,6 +75,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local-memory by default; point this at Redis/Memcached in production so that
+# cache invalidation (e.g. the global context cache) is shared between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hezzy-portfolio',
+    }
+}
+
+# Blog view counts are buffered in the cache and written in batches (portfolio/counters.py).
+# Each worker flushes its own buffer this often (seconds); set to None when using a shared
+# cache and running `manage.py flush_blog_views` from cron instead.
+BLOG_VIEWS_FLUSH_INTERVAL = 60
+
+# Anonymous page cache (portfolio/page_cache.py). Pages are purged by model signals
+# as soon as their content changes; this only bounds how long changes made without
+# signals (queryset.update()) can stay invisible.
+PAGE_CACHE_TIMEOUT = 15 * 60
+
+# Static copies of the public pages written by `manage.py prerender` (portfolio/prerender.py)
+# for a static server in front of Django; kept up to date on every content change once built.
+# PRERENDER_HOST must be one of ALLOWED_HOSTS.
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+PRERENDER_HOST = ALLOWED_HOSTS[0]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -115,10 +147,24 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# Output of `manage.py build_assets` (portfolio/assets.py); inside static/ so that
+# collectstatic picks the bundles up. Run build_assets before collectstatic.
+ASSET_BUNDLES_ROOT = BASE_DIR / 'static' / 'dist'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media' # Or os.path.join(BASE_DIR, 'media') if you prefer os.path
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # Add this line
+# `collectstatic` stores hashed, precompressed (gzip, and Brotli when the `brotli`
+# package is installed) copies of the static files; WhiteNoise serves the hashed
+# names with `Cache-Control: max-age=315360000, public, immutable`.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'myportfolio.storage.StaticFilesStorage',
+    },
+}
 
 
 # Default primary key field type
@@ -128,6 +174,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # settings.py
+# Contact-form emails are queued in the outbox (portfolio/outbox.py) and sent by
+# `manage.py send_outbox --loop` running as a worker (or `send_outbox` from cron).
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com' # or your SMTP server
 EMAIL_PORT = 587
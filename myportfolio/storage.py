@@ -0,0 +1,19 @@
+# myportfolio/storage.py
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    collectstatic writes content-hashed copies of every static file (listed in
+    staticfiles.json) plus precompressed .gz and, when the `brotli` package is
+    installed, .br variants. WhiteNoise serves the hashed names with a
+    far-future immutable Cache-Control and picks the variant matching the
+    request's Accept-Encoding.
+    """
+
+    def stored_name(self, name):
+        # Before the first collectstatic (local checkouts, the test run) there is no
+        # manifest: use the plain names instead of failing every {% static %} tag
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -8,7 +8,6 @@ urlpatterns = [
     path('', include('portfolio.urls'))
 ]
 
-# Serve media files only during development
+# Serve media files only during development (static files are served by WhiteNoise)
 if settings.DEBUG: # This ensures it's only active when DEBUG is True
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) # Also static for robustness
@@ -6,7 +6,7 @@ from django.utils import timezone # Import timezone for admin actions
 from .models import (
     Skill, Project, ProjectImage, Blog, Comment,
     Experience, Education, Certification, Award, Service,
-    Testimonial, ContactInfo, SocialLink, SiteSetting, Message
+    Testimonial, ContactInfo, SocialLink, SiteSetting, Message, OutgoingEmail
 )
 
 # --- Inlines for related models ---
@@ -44,10 +44,10 @@ class SkillAdmin(admin.ModelAdmin):
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = (
-        'title', 'slug', 'end_date', 'project_type',
+        'title', 'slug', 'end_date', 'project_type', 'main_category',
         'status', 'featured', 'live_demo_link', 'github_link'
     )
-    list_filter = ('end_date', 'project_type', 'status', 'featured', 'technologies__name')
+    list_filter = ('end_date', 'project_type', 'main_category', 'status', 'featured', 'technologies__name')
     search_fields = ('title', 'short_description', 'overview_content')
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'end_date'
@@ -270,3 +270,16 @@ class MessageAdmin(admin.ModelAdmin):
         queryset.update(is_read=False)
     mark_as_unread.short_description = "Mark selected messages as unread"
 
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to', 'last_error')
+    readonly_fields = ('subject', 'body', 'html_body', 'from_email', 'to', 'message', 'attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        # Picked up by the next send_outbox run; failed emails get a fresh set of attempts
+        queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+    retry_now.short_description = "Retry selected emails now"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio'
+
+    def ready(self):
+        from . import signals # noqa: F401 - registers the signal receivers
@@ -0,0 +1,321 @@
+# portfolio/assets.py
+"""
+Per-page CSS/JS bundles and inlined critical CSS.
+
+`manage.py build_assets` concatenates and minifies the static files of every
+bundle in BUNDLES into ASSET_BUNDLES_ROOT (static/dist/ by default, so
+collectstatic hashes and compresses the results like any other static file)
+and records them in a manifest. For bundles with a `critical` template it
+also extracts the rules that style the markup above FOLD_MARKER (the navbar
+from base.html plus the top of the page's content block); the
+{% bundle_css %} tag (templatetags/asset_bundles.py) inlines those and loads
+the full stylesheet without blocking the first paint.
+
+Until the bundles are built the tags fall back to the individual source files.
+
+The minifiers are deliberately conservative: comments and redundant
+whitespace go, newlines in scripts stay (so automatic semicolon insertion is
+unaffected) and the contents of strings, template literals and regular
+expressions are copied verbatim.
+"""
+import hashlib
+import json
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+
+BUNDLES_DIR = 'dist' # URL prefix of the built files under STATIC_URL
+MANIFEST_NAME = 'bundles.json'
+FOLD_MARKER = '{# fold #}' # Ends the above-the-fold markup of a critical template
+
+BUNDLES = {
+    'base': {
+        'css': ['css/style.css'],
+        'js': ['js/main.js'],
+    },
+    'index': { # Scripts come from the base bundle
+        'css': ['css/style.css'],
+        'critical': 'portfolio/index.html',
+    },
+    'blog_detail': {
+        'css': ['css/style.css', 'css/blog_detail.css', 'css/comments.css'],
+        'js': ['js/main.js', 'js/blog_detail.js'],
+        'critical': 'portfolio/blog_detail.html',
+    },
+    'project_detail': {
+        'css': ['css/style.css', 'css/project_detail.css'],
+        'js': ['js/main.js', 'js/project_detail.js'],
+        'critical': 'portfolio/project_detail.html',
+    },
+    'projects': {
+        'css': ['css/style.css', 'css/blog_detail.css', 'css/comments.css', 'css/projects.css'],
+        'js': ['js/main.js', 'js/projects.js'],
+    },
+    'contact_success': {
+        'css': ['css/style.css', 'css/contact_success.css'],
+    },
+}
+
+_manifest_cache = {'key': None, 'data': {}}
+
+
+def bundles_root():
+    return str(settings.ASSET_BUNDLES_ROOT)
+
+
+def _read_static(name):
+    path = finders.find(name)
+    if path is None:
+        raise FileNotFoundError(f"Static file {name!r} not found")
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+# --- Minification -------------------------------------------------------------
+
+def _scan(source, on_code, js=False):
+    """
+    Copies strings (and, for scripts, template literals and regex literals)
+    verbatim and drops comments; the code between them goes through on_code().
+    """
+    quotes = '"\'`' if js else '"\''
+    output, i, code_start = [], 0, 0
+    tail = [''] # The end of the output so far, enough for _starts_regex (rebuilding it all per slash is quadratic)
+
+    def emit(text):
+        output.append(text)
+        tail[0] = (tail[0] + text).rstrip()[-TAIL_LENGTH:]
+
+    def flush(end):
+        emit(on_code(source[code_start:end]))
+
+    while i < len(source):
+        char, following = source[i], source[i + 1:i + 2]
+        if char in quotes:
+            flush(i)
+            end = i + 1
+            while end < len(source) and source[end] != char:
+                end += 2 if source[end] == '\\' else 1
+            emit(source[i:end + 1])
+            i = code_start = end + 1
+        elif char == '/' and (following == '*' or (js and following == '/')):
+            flush(i)
+            if following == '*':
+                end = source.find('*/', i + 2)
+                i = len(source) if end == -1 else end + 2
+                emit(' ' if js else '')
+            else:
+                end = source.find('\n', i)
+                i = len(source) if end == -1 else end
+            code_start = i
+        elif char == '/' and js and _starts_regex(tail[0] + _code_before(source, code_start, i)):
+            flush(i)
+            end, in_class = i + 1, False
+            while end < len(source) and (source[end] != '/' or in_class):
+                if source[end] == '\\':
+                    end += 1
+                elif source[end] in '[]':
+                    in_class = source[end] == '['
+                end += 1
+            emit(source[i:end + 1])
+            i = code_start = end + 1
+        else:
+            i += 1
+    flush(len(source))
+    return ''.join(output)
+
+
+TAIL_LENGTH = 16 # Longer than any keyword _starts_regex looks for, plus the character before it
+
+
+def _code_before(source, start, end):
+    """The last TAIL_LENGTH characters of source[start:end], trailing whitespace dropped, without copying the rest."""
+    while end > start and source[end - 1].isspace():
+        end -= 1
+    return source[max(start, end - TAIL_LENGTH):end]
+
+
+def _starts_regex(before):
+    # A slash starts a regex literal where an operand is expected, i.e. not after a value
+    before = before.rstrip()
+    return not before or before[-1] in '(,=:[!&|?{};' or re.search(r'\b(return|typeof|case)$', before)
+
+
+def minify_css(css):
+    def code(chunk):
+        chunk = re.sub(r'\s+', ' ', chunk)
+        chunk = re.sub(r' ?([{};,>]) ?', r'\1', chunk)
+        chunk = chunk.replace(': ', ':') # Only after colons: ".a :hover" differs from ".a:hover"
+        return chunk.replace(';}', '}')
+    return _scan(css, code).strip()
+
+
+def minify_js(js):
+    def code(chunk):
+        chunk = re.sub(r'[ \t]*\n\s*', '\n', chunk) # Keep line breaks: semicolons may be implied
+        return re.sub(r'[ \t]+', ' ', chunk)
+    return _scan(js, code, js=True).strip()
+
+
+# --- Critical CSS ---------------------------------------------------------------
+
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+INTERACTION_PSEUDOS = re.compile(r':(hover|focus|focus-within|focus-visible|active|visited)\b')
+
+
+def parse_css(css):
+    """
+    Splits minified CSS into a list of (prelude, body) pairs. Bodies of
+    @media-like rules are parsed recursively into lists; other bodies
+    (declarations, @keyframes, @font-face) stay strings. Statements such as
+    @import are (statement, None).
+    """
+    nodes, i = [], 0
+    while i < len(css):
+        brace, semicolon = css.find('{', i), css.find(';', i)
+        if brace == -1:
+            break
+        if css[i] == '@' and -1 < semicolon < brace:
+            nodes.append((css[i:semicolon + 1], None))
+            i = semicolon + 1
+            continue
+        prelude, depth, end = css[i:brace].strip(), 0, brace
+        while end < len(css):
+            if css[end] in '"\'':
+                end = css.index(css[end], end + 1)
+            elif css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        body = css[brace + 1:end]
+        nodes.append((prelude, parse_css(body) if prelude.startswith(NESTED_AT_RULES) else body))
+        i = end + 1
+    return nodes
+
+
+def selector_tokens(markup):
+    """The tag names, classes and ids used in an HTML fragment."""
+    markup = re.sub(r'{%.*?%}|{{.*?}}', ' ', markup)
+    tags = {tag.lower() for tag in re.findall(r'<([a-zA-Z][\w-]*)', markup)} | {'html', 'body'}
+    classes = {name for value in re.findall(r'class="([^"]*)"', markup) for name in value.split()}
+    ids = set(re.findall(r'id="([^"]+)"', markup))
+    return tags, classes, ids
+
+
+def _selector_matches(selector, tags, classes, ids):
+    if INTERACTION_PSEUDOS.search(selector):
+        return False # State styles never apply on first paint
+    simple = re.sub(r'\[[^\]]*\]|::?[\w-]+(\([^)]*\))?', '', selector)
+    return (
+        set(re.findall(r'\.([\w-]+)', simple)) <= classes
+        and set(re.findall(r'#([\w-]+)', simple)) <= ids
+        and set(tag.lower() for tag in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', simple)) <= tags
+    )
+
+
+def _critical_nodes(nodes, tokens, animations):
+    kept = []
+    for prelude, body in nodes:
+        if body is None or prelude.startswith('@font-face'):
+            kept.append((prelude, body))
+        elif isinstance(body, list):
+            children = _critical_nodes(body, tokens, animations)
+            if children:
+                kept.append((prelude, children))
+        elif prelude.startswith('@keyframes'):
+            kept.append((prelude, body)) # Dropped below unless a kept rule uses it
+        elif not prelude.startswith('@'):
+            selectors = [s for s in prelude.split(',') if _selector_matches(s, *tokens)]
+            if selectors:
+                kept.append((','.join(selectors), body))
+                animations.update(re.findall(r'animation(?:-name)?:([^;]+)', body))
+    return kept
+
+
+def _serialize(nodes, animations):
+    used = ' '.join(animations)
+    parts = []
+    for prelude, body in nodes:
+        if body is None:
+            parts.append(prelude)
+        elif isinstance(body, list):
+            parts.append(f"{prelude}{{{_serialize(body, animations)}}}")
+        elif prelude.startswith('@keyframes'):
+            if re.search(rf'(^|[\s,]){re.escape(prelude.split()[-1])}([\s,]|$)', used):
+                parts.append(f"{prelude}{{{body}}}")
+        else:
+            parts.append(f"{prelude}{{{body}}}")
+    return ''.join(parts)
+
+
+def above_the_fold_markup(template_name):
+    """base.html up to its content block plus the page's content block up to FOLD_MARKER."""
+    page = get_template(template_name).template.source
+    base = get_template('portfolio/base.html').template.source
+    content = page.split('{% block content %}', 1)[-1]
+    if FOLD_MARKER not in content:
+        raise ValueError(f"{template_name} has no {FOLD_MARKER} marker")
+    return base.split('{% block content %}', 1)[0] + content.split(FOLD_MARKER, 1)[0]
+
+
+def critical_css(css, markup):
+    """The rules of (minified) `css` that can apply to `markup`."""
+    animations = set()
+    nodes = _critical_nodes(parse_css(css), selector_tokens(markup), animations)
+    return _serialize(nodes, animations)
+
+
+# --- Build and lookup -------------------------------------------------------------
+
+def _write(name, content):
+    path = os.path.join(bundles_root(), name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def build_bundles():
+    """Builds every bundle and the manifest; returns the manifest."""
+    os.makedirs(bundles_root(), exist_ok=True)
+    manifest = {}
+    for bundle, spec in BUNDLES.items():
+        entry = {}
+        for kind, minify in (('css', minify_css), ('js', minify_js)):
+            if not spec.get(kind):
+                continue
+            joiner = '\n' if kind == 'css' else ';\n' # A script without a final semicolon must not run into the next
+            content = joiner.join(minify(_read_static(name)) for name in spec[kind])
+            digest = hashlib.md5(content.encode()).hexdigest()[:8]
+            file_name = f"{bundle}.{digest}.min.{kind}" # Stale browser caches never see a mixed build
+            _write(file_name, content)
+            entry[kind] = f"{BUNDLES_DIR}/{file_name}"
+            entry[f'{kind}_size'] = len(content.encode())
+            if kind == 'css' and spec.get('critical'):
+                entry['critical'] = critical_css(content, above_the_fold_markup(spec['critical']))
+        manifest[bundle] = entry
+
+    current = {os.path.basename(entry[kind]) for entry in manifest.values() for kind in ('css', 'js') if kind in entry}
+    for name in os.listdir(bundles_root()):
+        if name.endswith(('.min.css', '.min.js')) and name not in current:
+            os.remove(os.path.join(bundles_root(), name)) # Left over from an earlier build
+    _write(MANIFEST_NAME, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def get_manifest():
+    """The build manifest ({} before the first build), reloaded whenever the file changes."""
+    path = os.path.join(bundles_root(), MANIFEST_NAME)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if _manifest_cache['key'] != (path, mtime):
+        with open(path, encoding='utf-8') as f:
+            _manifest_cache['data'] = json.load(f)
+        _manifest_cache['key'] = (path, mtime)
+    return _manifest_cache['data']
@@ -0,0 +1,16 @@
+# portfolio/async_urls.py
+from django.urls import path
+from . import async_views # Async versions of the public read views (see async_views.py)
+
+# Same paths and names as in urls.py; myportfolio/asgi_urls.py puts these first
+urlpatterns = [
+    path('', async_views.home, name='home'),
+    path('projects/', async_views.projects_list, name='projects'),
+    path('projects/<slug:slug>/', async_views.project_detail, name='project_detail'),
+    path('api/projects/', async_views.projects_api, name='projects_api'),
+    path('blog/', async_views.blog_list, name='blog_list'),
+    path('blog/page/<int:page>/', async_views.blog_list, name='blog_page'),
+    path('blog/<slug:slug>/', async_views.blog_detail, name='blog_detail'),
+    path('tags/<slug:tag_slug>/', async_views.blog_list, name='blog_tag'),
+    path('tags/<slug:tag_slug>/page/<int:page>/', async_views.blog_list, name='blog_tag_page'),
+]
@@ -0,0 +1,245 @@
+# portfolio/async_views.py
+"""
+Async versions of the public read views, served under ASGI when
+PORTFOLIO_ASYNC_VIEWS=1 is set (see myportfolio/asgi.py); otherwise both
+apps serve the views in views.py.
+
+Each view loads its independent sections concurrently with asyncio.gather
+and the async ORM (aget, acount, async for), and shares its querysets,
+helpers and page-cache tags with the sync view. Three things still run in a
+worker thread through sync_to_async: helpers that query through sync code
+(the cached global context, related items, comment pages, the serializer's
+image metadata), template rendering, since templates follow relations lazily
+(tags, technologies, image metadata), and the page cache's lookups, since the
+cache backends are sync.
+
+Django's async ORM still runs the queries of one request in that request's
+sync thread, so gathered queries do not reach the database in parallel. What
+the async views offer is an event loop that stays free while requests wait on
+the database, which only pays off when waiting (a networked database) rather
+than rendering dominates. `manage.py benchmark_views` compares them with the
+sync views under WSGI and ASGI; measure before preferring one deployment.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, render
+from django.views.decorators.http import require_GET
+from taggit.models import Tag
+
+from . import views
+from .caching import get_author_stats
+from .comments import get_comment_page
+from .conditional import ablog_detail_condition, ablog_list_condition, aprojects_condition
+from .forms import CommentForm, ContactForm
+from .models import Blog, ContactInfo, Project
+from .page_cache import add_page_tags, cache_page_tagged
+from .search import filter_blogs_fallback, search_blog_ids
+from .serializers import ProjectSerializer, filter_projects
+
+arender = sync_to_async(render)
+aget_global_context = sync_to_async(views.get_global_context)
+aadd_page_tags = sync_to_async(add_page_tags)
+
+
+async def alist(queryset):
+    return [item async for item in queryset]
+
+
+async def apaginate(queryset, per_page, number):
+    """
+    The page `number` of `queryset` (the first or last page when it is not a
+    valid number, like the sync views), with its rows already loaded.
+    """
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount() # Paginator.count is a cached_property; the sync one would query here
+    try:
+        page = paginator.page(number)
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+    page.object_list = await alist(page.object_list)
+    return page
+
+
+@require_GET
+@cache_page_tagged(*views.home.page_cache_tags)
+async def home(request):
+    """Homepage view."""
+    sections = views.home_sections()
+    context, contact_info, *loaded = await asyncio.gather(
+        aget_global_context(),
+        ContactInfo.objects.afirst(),
+        *(alist(queryset) for queryset in sections.values()),
+    )
+    context.update(zip(sections, loaded))
+    context.update({
+        'contact_info': contact_info,
+        'contact_form': ContactForm(),
+    })
+    return await arender(request, 'portfolio/index.html', context)
+
+
+@require_GET
+@cache_page_tagged(*views.projects_list.page_cache_tags)
+@aprojects_condition
+async def projects_list(request):
+    """View to display a list of all projects."""
+    project_list = Project.objects.filter(status='completed').order_by('-end_date')
+    context, projects_paged = await asyncio.gather(
+        aget_global_context(),
+        apaginate(project_list, 9, request.GET.get('page')),
+    )
+    context['projects'] = projects_paged
+    return await arender(request, 'portfolio/projects.html', context)
+
+
+@require_GET
+@cache_page_tagged(*views.project_detail.page_cache_tags)
+@aprojects_condition
+async def project_detail(request, slug):
+    """View to display a single project's details."""
+    project = await aget_object_or_404(Project, slug=slug, status='completed')
+    context, (previous_project, next_project), related_projects = await asyncio.gather(
+        aget_global_context(),
+        sync_to_async(project.get_adjacent_projects)(),
+        sync_to_async(project.get_related_projects)(),
+    )
+    await aadd_page_tags(request, *views.project_page_tags(project, previous_project, next_project, *related_projects))
+    context.update({
+        'project': project,
+        'previous_project': previous_project,
+        'next_project': next_project,
+        'related_projects': related_projects,
+    })
+    return await arender(request, 'portfolio/project_detail.html', context)
+
+
+@require_GET
+@aprojects_condition
+async def projects_api(request):
+    """JSON project data for projects.js; see views.projects_api for the parameters."""
+    fields = ProjectSerializer.parse_fields(request.GET.get('fields'))
+    projects_queryset = filter_projects(
+        ProjectSerializer.get_queryset(fields),
+        category=request.GET.get('category', '').strip().lower() or None,
+        technology=request.GET.get('tech', '').strip() or None,
+        query=request.GET.get('q', '').strip() or None,
+        slug=request.GET.get('slug', '').strip() or None,
+    )
+
+    try:
+        page_size = min(max(int(request.GET.get('page_size', views.PROJECTS_API_PAGE_SIZE)), 1), views.PROJECTS_API_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = views.PROJECTS_API_PAGE_SIZE
+
+    projects_paged = await apaginate(projects_queryset, page_size, request.GET.get('page')) # async for also runs the prefetches
+
+    def page_url(number):
+        params = request.GET.copy()
+        params['page'] = number
+        return f"{request.path}?{params.urlencode()}"
+
+    return JsonResponse({
+        'count': projects_paged.paginator.count,
+        'num_pages': projects_paged.paginator.num_pages,
+        'page': projects_paged.number,
+        'next': page_url(projects_paged.next_page_number()) if projects_paged.has_next() else None,
+        'previous': page_url(projects_paged.previous_page_number()) if projects_paged.has_previous() else None,
+        'results': await sync_to_async(lambda: ProjectSerializer(projects_paged.object_list, fields).data)(), # Loads image metadata
+    })
+
+
+def _ranked_page(ranked_results, number):
+    paginator = Paginator(ranked_results, views.BLOG_PAGE_SIZE)
+    try:
+        return paginator.page(number)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
+async def _blog_page(blog_posts_list, query, number):
+    """
+    The page of posts to list: ranked search results (FTS5, see search.py) when
+    searching where that is available, else a page of the (filtered) queryset.
+    """
+    if query:
+        ranked_results = await sync_to_async(search_blog_ids)(blog_posts_list, query)
+        if ranked_results is None:
+            blog_posts_list = filter_blogs_fallback(blog_posts_list, query)
+        else:
+            posts_paged = await sync_to_async(_ranked_page)(ranked_results, number) # Pages in SQL (see search.py)
+
+            posts_by_id = await Blog.objects.defer('content').ain_bulk([blog_id for blog_id, snippet in posts_paged.object_list])
+            page_posts = []
+            for blog_id, snippet in posts_paged.object_list:
+                post = posts_by_id[blog_id]
+                post.search_snippet = snippet
+                page_posts.append(post)
+            posts_paged.object_list = page_posts
+            return posts_paged
+    return await apaginate(blog_posts_list, views.BLOG_PAGE_SIZE, number)
+
+
+@require_GET
+@cache_page_tagged(*views.blog_list.page_cache_tags)
+@ablog_list_condition
+async def blog_list(request, tag_slug=None, page=None):
+    """View to display a list of all published blog posts (optionally of one tag)."""
+    blog_posts_list = Blog.objects.filter(status='published').defer('content').order_by('-published_at')
+    context = {}
+
+    tag_slug = tag_slug or request.GET.get('tag')
+    if tag_slug:
+        tag = await aget_object_or_404(Tag, slug=tag_slug)
+        blog_posts_list = blog_posts_list.filter(tags=tag)
+        context['current_tag'] = tag
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        context['search_query'] = query
+
+    global_context, all_tags, posts_paged = await asyncio.gather(
+        aget_global_context(),
+        alist(Tag.objects.all().order_by('name')),
+        _blog_page(blog_posts_list, query, page or request.GET.get('page')),
+    )
+    context.update(global_context)
+    context['blog_posts'] = posts_paged
+    context.update(views.blog_page_links(posts_paged, tag_slug, query))
+    context['all_tags'] = all_tags
+    return await arender(request, 'portfolio/blog.html', context)
+
+
+@require_GET
+@cache_page_tagged(*views.blog_detail.page_cache_tags)
+@ablog_detail_condition
+async def blog_detail(request, slug):
+    """
+    View for a specific blog post's details with comments and likes; the
+    per-visitor state comes from blog_page_state, as with the sync view.
+    """
+    blog_post = await aget_object_or_404(Blog, slug=slug, status='published')
+    context, (comments, comments_next), related_blogs, author_stats = await asyncio.gather(
+        aget_global_context(),
+        sync_to_async(get_comment_page)(blog_post),
+        sync_to_async(blog_post.get_related_blogs)(),
+        sync_to_async(get_author_stats)(),
+    )
+    await aadd_page_tags(request, *views.blog_page_tags(blog_post, *related_blogs))
+    context.update({
+        'blog_post': blog_post,
+        'comments': comments,
+        'comments_next_url': views.comment_page_url(blog_post, cursor=comments_next),
+        'comment_form': CommentForm(initial={'blog_post': blog_post.id}),
+        'related_blogs': related_blogs,
+        'blog_post_count': author_stats['total_articles'],
+        'total_blog_views': author_stats['total_blog_views'],
+        'years_experience': author_stats['years_experience'],
+    })
+    return await arender(request, 'portfolio/blog_detail.html', context)
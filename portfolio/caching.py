@@ -0,0 +1,142 @@
+# portfolio/caching.py
+"""
+Two-level cache for data that almost never changes but is needed on every page
+(site settings, active social links).
+
+Level 1 is a plain dict living in the current process, level 2 is Django's
+configured cache backend (shared between workers). A version token stored in
+the shared cache tells each process whether its local copy is still current,
+so a save in one worker invalidates every other worker on its next request.
+
+It also keeps "content versions": per-namespace timestamps bumped whenever a
+model without its own updated_at (gallery images, skills, comments...) changes,
+so HTTP validators can account for them without querying those tables.
+
+Finally it holds the author-bio statistics shown on every blog post, which
+are invalidated by signals and by the view-counter flush.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+GLOBAL_CONTEXT_KEY = 'portfolio:global_context'
+GLOBAL_CONTEXT_VERSION_KEY = 'portfolio:global_context:version'
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def _load_global_context():
+    """Query the database for the site-wide context (cache miss path)."""
+    from .models import SiteSetting, SocialLink # Local import to avoid app-loading cycles
+
+    site_settings = SiteSetting.objects.first()
+    if not site_settings:
+        # Create a default SiteSetting if none exists, to prevent errors on first run
+        site_settings = SiteSetting.objects.create(
+            site_title="My Portfolio",
+            tagline="A Passionate Developer",
+            about_me="A dedicated full-stack developer."
+        )
+
+    social_links = list(SocialLink.objects.filter(active=True).order_by('order'))
+
+    return {
+        'site_settings': site_settings,
+        'social_links': social_links,
+    }
+
+
+def get_cached_global_context():
+    """
+    Returns a fresh dict with 'site_settings' and 'social_links'.
+    Steady state costs one shared-cache lookup (the version token) and no queries.
+    """
+    version = cache.get(GLOBAL_CONTEXT_VERSION_KEY)
+
+    local = _local.get('entry') # (version, value), read in one lookup: invalidation may clear _local meanwhile
+    if version is not None and local is not None and local[0] == version:
+        return dict(local[1])
+
+    value = cache.get(GLOBAL_CONTEXT_KEY) if version is not None else None
+    if value is None:
+        value = _load_global_context()
+        version = uuid.uuid4().hex
+        cache.set_many({GLOBAL_CONTEXT_KEY: value, GLOBAL_CONTEXT_VERSION_KEY: version}, timeout=None)
+
+    with _local_lock:
+        _local['entry'] = (version, value)
+
+    return dict(value)
+
+
+def invalidate_global_context(**kwargs):
+    """Signal receiver: drops both cache levels so the next request reloads from the database."""
+    cache.delete_many([GLOBAL_CONTEXT_KEY, GLOBAL_CONTEXT_VERSION_KEY])
+    with _local_lock:
+        _local.clear()
+
+
+# --- Content versions (used by HTTP validators, see conditional.py) ---
+CONTENT_VERSION_KEY = 'portfolio:content_version:%s'
+
+
+def get_content_version(namespace):
+    """
+    Returns the last-change timestamp (float, seconds) recorded for `namespace`.
+    A missing entry (cold or evicted cache) is initialised to "now", which can
+    only cause an extra full response, never a stale 304.
+    """
+    key = CONTENT_VERSION_KEY % namespace
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_content_version(namespace):
+    cache.set(CONTENT_VERSION_KEY % namespace, time.time(), timeout=None)
+
+
+# --- Author bio statistics (blog_detail) ---
+AUTHOR_STATS_KEY = 'portfolio:author_stats'
+
+
+def _load_author_stats():
+    from .models import Blog, Experience # Local import to avoid app-loading cycles
+
+    stats = Blog.objects.filter(status='published').aggregate(total_articles=Count('id'), total_blog_views=Sum('views'))
+    first_start = Experience.objects.order_by('start_date').values_list('start_date', flat=True).first()
+    return {
+        'total_articles': stats['total_articles'],
+        'total_blog_views': stats['total_blog_views'] or 0,
+        'first_experience_year': first_start.year if first_start else None,
+    }
+
+
+def get_author_stats():
+    """
+    Returns 'total_articles', 'total_blog_views' and 'years_experience'.
+    Queries only on a cache miss; years_experience is derived at read time so it
+    rolls over with the calendar year.
+    """
+    stats = cache.get(AUTHOR_STATS_KEY)
+    if stats is None:
+        stats = _load_author_stats()
+        cache.set(AUTHOR_STATS_KEY, stats, timeout=None)
+
+    first_year = stats['first_experience_year']
+    return {
+        'total_articles': stats['total_articles'],
+        'total_blog_views': stats['total_blog_views'],
+        'years_experience': timezone.now().year - first_year if first_year else 0,
+    }
+
+
+def invalidate_author_stats(**kwargs):
+    cache.delete(AUTHOR_STATS_KEY)
@@ -0,0 +1,74 @@
+# portfolio/comments.py
+"""
+Paged comment threads for blog_detail and the blog_comments endpoint.
+
+Comments are listed oldest first and paged by keyset on (created_at, id), so
+a page costs the same however far into a long discussion it is. Each page
+loads one level of a thread plus a short preview of every comment's replies;
+deeper or longer threads are fetched on demand ("load more replies") through
+the same endpoint with `parent` set. A page costs two queries whatever the
+size of the discussion.
+"""
+from datetime import datetime
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from .models import Comment
+
+COMMENTS_PAGE_SIZE = 10
+COMMENTS_MAX_PAGE_SIZE = 50
+REPLIES_PREVIEW = 3 # Replies shown under each comment before "load more replies"
+
+
+def encode_cursor(comment):
+    return f"{comment.created_at.isoformat()}_{comment.pk}"
+
+
+def decode_cursor(cursor):
+    """Returns (created_at, id); raises ValueError for a malformed cursor."""
+    created_at, _, pk = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+def _with_reply_counts(queryset):
+    active_replies = Comment.objects.filter(parent=OuterRef('pk'), active=True).order_by().values('parent')
+    return queryset.select_related('author').annotate(
+        reply_count=Coalesce(Subquery(active_replies.annotate(total=Count('pk')).values('total')), Value(0))
+    )
+
+
+def get_comment_page(blog_post, parent_id=None, after=None, limit=COMMENTS_PAGE_SIZE):
+    """
+    One page of active comments under `parent_id` (top level when None),
+    starting after the `after` cursor. Each comment carries `children` (its
+    first REPLIES_PREVIEW replies), `more_replies` (how many are not shown)
+    and `replies_cursor` (where "load more replies" continues from; replies in
+    the preview start their own thread from the beginning).
+    Returns (comments, next_cursor or None).
+    """
+    comments = Comment.objects.filter(blog_post=blog_post, parent_id=parent_id, active=True)
+    if after is not None:
+        created_at, pk = after
+        comments = comments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+    comments = list(_with_reply_counts(comments).order_by('created_at', 'id')[:limit + 1])
+
+    next_cursor = encode_cursor(comments[limit - 1]) if len(comments) > limit else None
+    comments = comments[:limit]
+
+    children = {comment.pk: [] for comment in comments}
+    if any(comment.reply_count for comment in comments):
+        previews = _with_reply_counts(
+            Comment.objects.filter(parent_id__in=list(children), active=True)
+        ).annotate(
+            position=Window(RowNumber(), partition_by=[F('parent_id')], order_by=[F('created_at').asc(), F('id').asc()])
+        ).filter(position__lte=REPLIES_PREVIEW).order_by('created_at', 'id')
+        for reply in previews:
+            reply.children, reply.more_replies, reply.replies_cursor = [], reply.reply_count, None
+            children[reply.parent_id].append(reply)
+
+    for comment in comments:
+        comment.children = children[comment.pk]
+        comment.more_replies = comment.reply_count - len(comment.children)
+        comment.replies_cursor = encode_cursor(comment.children[-1]) if comment.children and comment.more_replies else None
+    return comments, next_cursor
@@ -0,0 +1,99 @@
+# portfolio/conditional.py
+"""
+ETag / Last-Modified validators for the public read views, used with
+django.views.decorators.http.condition.
+
+Each validator costs one aggregate query (max(updated_at) + count, the count
+catching deletions) plus a few cache lookups for the content versions of
+related models that have no timestamp of their own. Both the ETag and the
+Last-Modified functions share one computation per request.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from .caching import get_content_version
+from .models import Blog, Project
+
+# Namespaces bumped by signals.py
+SITE_VERSION = 'site' # SiteSetting, SocialLink (rendered on every page)
+PROJECTS_VERSION = 'projects' # ProjectImage, Skill, project technologies
+BLOG_VERSION = 'blog' # Comment, tags, Experience (author bio)
+
+
+def _validators(request, cache_attr, queryset, namespaces):
+    """Computes (etag, last_modified) once per request and memoizes it on the request."""
+    if not hasattr(request, cache_attr):
+        stats = queryset.aggregate(last_updated=Max('updated_at'), total=Count('id'))
+        versions = [get_content_version(namespace) for namespace in namespaces]
+
+        candidates = [datetime.fromtimestamp(version, tz=dt_timezone.utc) for version in versions]
+        if stats['last_updated']:
+            candidates.append(stats['last_updated'])
+        last_modified = max(candidates)
+
+        parts = [stats['last_updated'], stats['total'], *versions]
+        etag = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+        setattr(request, cache_attr, (etag, last_modified))
+    return getattr(request, cache_attr)
+
+
+def _projects_validators(request, *args, **kwargs):
+    return _validators(
+        request, '_projects_validators',
+        Project.objects.filter(status='completed'),
+        (SITE_VERSION, PROJECTS_VERSION),
+    )
+
+
+def _blog_validators(request, *args, **kwargs):
+    return _validators(
+        request, '_blog_validators',
+        Blog.objects.filter(status='published'),
+        (SITE_VERSION, BLOG_VERSION),
+    )
+
+
+# Decorators for the views; prev/next and related-item sections depend on the
+# whole collection, so detail pages are validated against it too.
+projects_condition = condition(
+    etag_func=lambda request, *args, **kwargs: _projects_validators(request)[0],
+    last_modified_func=lambda request, *args, **kwargs: _projects_validators(request)[1],
+)
+
+blog_list_condition = condition(
+    etag_func=lambda request, *args, **kwargs: _blog_validators(request)[0],
+    last_modified_func=lambda request, *args, **kwargs: _blog_validators(request)[1],
+)
+
+# The detail page holds no per-visitor state (that comes from blog_page_state),
+# so it is validated like the list.
+blog_detail_condition = blog_list_condition
+
+
+def _async_condition(condition_decorator, validators):
+    """
+    The condition decorator for an async view. condition() calls its validator
+    functions on the event loop, where the ORM may not run, so the validators
+    are computed in a worker thread first; condition() then reads them back
+    from the request (they are memoized there).
+    """
+    def decorator(view_func):
+        conditioned = condition_decorator(view_func)
+
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            await sync_to_async(validators)(request)
+            return await conditioned(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Decorators for the async views (async_views.py)
+aprojects_condition = _async_condition(projects_condition, _projects_validators)
+ablog_list_condition = _async_condition(blog_list_condition, _blog_validators)
+ablog_detail_condition = ablog_list_condition
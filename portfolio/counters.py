@@ -0,0 +1,130 @@
+# portfolio/counters.py
+"""
+Write-behind counters.
+
+Blog views are accumulated in the cache (an atomic incr per request, no
+database access) and written to Blog.views in batches by flush_blog_views(),
+run periodically via the flush_blog_views management command. Batched writes
+are single-column F() updates, so updated_at is never touched.
+
+With a per-process cache (LocMemCache) a separate command process cannot see
+the web workers' counts, so each worker also flushes its own counts from a
+background thread every settings.BLOG_VIEWS_FLUSH_INTERVAL seconds (None
+disables this; use the command with a shared cache such as Redis instead).
+
+Likes and comment counts are written straight away (the count is shown to
+the visitor who acted), but as conditional F() deltas rather than
+read-modify-save.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+
+from .caching import invalidate_author_stats
+from .models import Blog
+
+BLOG_VIEWS_KEY = 'portfolio:blog_views:%s'
+
+
+_flush_state = {'last': time.monotonic(), 'running': False}
+_flush_lock = threading.Lock()
+
+
+def record_blog_view(blog_id):
+    """Counts one view of a post without touching the database."""
+    key = BLOG_VIEWS_KEY % blog_id
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError: # Key evicted between add() and incr()
+            cache.add(key, 1, timeout=None)
+    _maybe_flush_in_background()
+
+
+def _maybe_flush_in_background():
+    interval = getattr(settings, 'BLOG_VIEWS_FLUSH_INTERVAL', None)
+    if interval is None:
+        return
+    with _flush_lock:
+        if _flush_state['running'] or time.monotonic() - _flush_state['last'] < interval:
+            return
+        _flush_state['running'] = True
+    threading.Thread(target=_background_flush, name='blog-views-flush', daemon=True).start()
+
+
+def _background_flush():
+    try:
+        flush_blog_views()
+    finally:
+        connection.close() # Thread-local connection opened by the flush
+        with _flush_lock:
+            _flush_state['running'] = False
+            _flush_state['last'] = time.monotonic()
+
+
+def pending_blog_views(blog_ids):
+    """Returns {blog_id: views not yet flushed} for the given posts."""
+    keys = {BLOG_VIEWS_KEY % blog_id: blog_id for blog_id in blog_ids}
+    return {keys[key]: count for key, count in cache.get_many(list(keys)).items() if count}
+
+
+def flush_blog_views():
+    """
+    Moves pending view counts from the cache into Blog.views.
+    Posts with the same pending count share one UPDATE. Returns the number of views flushed.
+    """
+    pending = pending_blog_views(Blog.objects.values_list('pk', flat=True))
+    if not pending:
+        return 0
+
+    # Claim the counts first (atomic decr), so views recorded meanwhile stay pending
+    claimed = {}
+    by_delta = {}
+    for blog_id, count in pending.items():
+        try:
+            cache.decr(BLOG_VIEWS_KEY % blog_id, count)
+        except ValueError: # Key evicted or expired since it was read: its views are gone, skip it
+            continue
+        claimed[blog_id] = count
+        by_delta.setdefault(count, []).append(blog_id)
+
+    try:
+        with transaction.atomic():
+            for delta, blog_ids in by_delta.items():
+                Blog.objects.filter(pk__in=blog_ids).update(views=F('views') + delta)
+    except Exception:
+        # Give the claimed counts back so the next flush retries them
+        for blog_id, count in claimed.items():
+            key = BLOG_VIEWS_KEY % blog_id
+            if not cache.add(key, count, timeout=None):
+                cache.incr(key, count)
+        raise
+
+    if claimed:
+        invalidate_author_stats() # Total views shown in the author bio
+    return sum(claimed.values())
+
+
+def adjust_blog_likes(blog_id, delta):
+    """
+    Applies +1/-1 to Blog.likes_count as a single conditional UPDATE (never below
+    zero, no lost updates under concurrency) and returns the new count.
+    Returns None if the post does not exist.
+    """
+    posts = Blog.objects.filter(pk=blog_id)
+    if delta < 0:
+        posts = posts.filter(likes_count__gte=-delta)
+    posts.update(likes_count=F('likes_count') + delta)
+    return Blog.objects.filter(pk=blog_id).values_list('likes_count', flat=True).first()
+
+
+def adjust_comment_count(blog_id, delta):
+    """Applies `delta` to Blog.comment_count (never below zero); called by the Comment signals."""
+    posts = Blog.objects.filter(pk=blog_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
@@ -0,0 +1,282 @@
+# portfolio/images.py
+"""
+Responsive image derivatives.
+
+Every ImageField listed in IMAGE_FIELDS gets resized WebP and JPEG copies at
+DERIVATIVE_WIDTHS (never upscaled) when a new file is saved; see signals.py.
+The copies are written to the media storage under derivatives/ and recorded
+in the ImageDerivative table. The {% responsive_image %} tag
+(templatetags/responsive_images.py) turns them into <picture>/srcset markup.
+
+Alongside the derivatives, every image gets an ImageMetadata row with its
+intrinsic size and a tiny inline placeholder (a PLACEHOLDER_WIDTH px WebP as a
+data: URI), so templates can reserve the right box and paint a blurred
+preview before the real image arrives, without extra requests.
+
+Lookups are cached per source file, so rendering a page full of images costs
+cache hits rather than queries. Images without derivatives are cached only
+for MISSING_INFO_TIMEOUT seconds, so processes pick up derivatives created
+elsewhere.
+
+Each row records the SHA-256 of its source file and a fingerprint of the
+settings above, so the backfill_image_derivatives command can skip images
+whose derivatives are already current and resume after an interruption.
+"""
+import base64
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ImageDerivative, ImageMetadata
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280, 1920)
+DERIVATIVES_DIR = 'derivatives'
+# Storage name of a derivative. The source's own extension is kept, so a.png and a.jpg never share derivatives.
+DERIVATIVE_NAME = '{directory}/{source}-{width}w.{extension}'
+
+# format -> (Pillow format, file extension, save options)
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# (model label, field name) of every image that gets derivatives
+IMAGE_FIELDS = (
+    ('portfolio.Project', 'featured_image'),
+    ('portfolio.ProjectImage', 'image'),
+    ('portfolio.Blog', 'featured_image'),
+    ('portfolio.Testimonial', 'avatar'),
+    ('portfolio.Education', 'logo'),
+    ('portfolio.SiteSetting', 'profile_picture'),
+)
+
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+DERIVATIVES_CACHE_KEY = 'portfolio:image_derivatives:%s'
+# Seconds an image without derivatives stays cached as such. Derivatives made in another
+# process (backfill_image_derivatives) only reach a per-process cache when the entry expires.
+MISSING_INFO_TIMEOUT = 60
+
+
+def image_fields_by_model():
+    """Returns {model label: [field names]} for IMAGE_FIELDS."""
+    fields = {}
+    for model_label, field_name in IMAGE_FIELDS:
+        fields.setdefault(model_label, []).append(field_name)
+    return fields
+
+
+def _cache_key(source):
+    return DERIVATIVES_CACHE_KEY % hashlib.md5(source.encode()).hexdigest() # Storage names may contain spaces
+
+
+def _cache_infos(infos):
+    """Caches {source: info}: for good once derivatives exist, briefly while there are none."""
+    for timeout in (None, MISSING_INFO_TIMEOUT):
+        batch = {
+            _cache_key(source): info for source, info in infos.items()
+            if bool(info['derivatives']) == (timeout is None)
+        }
+        if batch:
+            cache.set_many(batch, timeout=timeout)
+
+
+def target_widths(original_width):
+    """Derivative widths for an image `original_width` pixels wide: no upscaling, the original size included."""
+    widths = [width for width in DERIVATIVE_WIDTHS if width < original_width]
+    if original_width <= DERIVATIVE_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def _derivative_name(source, width, extension):
+    return DERIVATIVE_NAME.format(directory=DERIVATIVES_DIR, source=source, width=width, extension=extension)
+
+
+def _encode(image, pil_format, options):
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha channel: flatten transparent images onto white
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def spec_version():
+    """Fingerprint of the derivative settings; derivatives made with other settings are stale."""
+    settings = (DERIVATIVE_WIDTHS, DERIVATIVE_FORMATS, PLACEHOLDER_WIDTH, PLACEHOLDER_QUALITY, DERIVATIVE_NAME)
+    return hashlib.md5(repr(settings).encode()).hexdigest()[:12]
+
+
+def _placeholder(image):
+    """A data: URI of the image scaled down to PLACEHOLDER_WIDTH pixels (a few hundred bytes)."""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    tiny = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB').resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS)
+    buffer = BytesIO()
+    tiny.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def render_derivatives(source, storage=default_storage, known_hash=None):
+    """
+    Writes the derivative files of the stored image `source` without touching
+    the database, so it can run in worker processes. Returns (content hash,
+    result) where result is {'width', 'height', 'placeholder', 'derivatives':
+    [(format, width, height, storage name, size)]}, or None when the file's
+    hash equals `known_hash`, i.e. its derivatives are already current.
+    Raises OSError for missing or unreadable files.
+    """
+    with storage.open(source, 'rb') as original:
+        data = original.read()
+    source_hash = hashlib.sha256(data).hexdigest()
+    if source_hash == known_hash:
+        return source_hash, None
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    image.load()
+    rendered = []
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for format_name, (pil_format, extension, options) in DERIVATIVE_FORMATS.items():
+            content = _encode(resized, pil_format, options)
+            name = _derivative_name(source, width, extension)
+            storage.delete(name) # Overwrite rather than let the storage pick a new name
+            name = storage.save(name, ContentFile(content))
+            rendered.append((format_name, width, height, name, len(content)))
+    return source_hash, {
+        'width': image.width,
+        'height': image.height,
+        'placeholder': _placeholder(image),
+        'derivatives': rendered,
+    }
+
+
+@transaction.atomic
+def record_derivatives(source, source_hash, result, storage=default_storage):
+    """Replaces the stored derivatives and metadata of `source` with a render_derivatives() result and primes the cache."""
+    rendered = result['derivatives']
+    new_names = {name for _, _, _, name, _ in rendered}
+    stale = ImageDerivative.objects.filter(source=source)
+    for name in stale.values_list('file', flat=True):
+        if name not in new_names:
+            storage.delete(name)
+    stale.delete()
+
+    spec = spec_version()
+    derivatives = ImageDerivative.objects.bulk_create([
+        ImageDerivative(
+            source=source, source_hash=source_hash, spec=spec,
+            format=format_name, width=width, height=height, file=name, size=size,
+        )
+        for format_name, width, height, name, size in rendered
+    ])
+    metadata, _ = ImageMetadata.objects.update_or_create(source=source, defaults={
+        'width': result['width'], 'height': result['height'], 'placeholder': result['placeholder'],
+    })
+    _cache_infos({source: _describe(metadata, derivatives)})
+    return derivatives
+
+
+def generate_derivatives(source, storage=default_storage):
+    """
+    (Re)creates the derivatives of the stored image `source` and returns the
+    ImageDerivative rows. Unreadable or missing files are logged and yield [].
+    """
+    try:
+        source_hash, result = render_derivatives(source, storage)
+    except (OSError, UnidentifiedImageError) as exc:
+        logger.warning("Could not create derivatives for %s: %s", source, exc)
+        delete_derivatives(source, storage)
+        return []
+    return record_derivatives(source, source_hash, result, storage)
+
+
+def delete_derivatives(source, storage=default_storage):
+    """Removes the derivative files, rows and metadata of `source`."""
+    derivatives = ImageDerivative.objects.filter(source=source)
+    for name in derivatives.values_list('file', flat=True):
+        storage.delete(name)
+    derivatives.delete()
+    ImageMetadata.objects.filter(source=source).delete()
+    cache.delete(_cache_key(source))
+
+
+def _describe(metadata, derivatives):
+    info = {
+        'derivatives': [(d.format, d.width, d.height, d.file.name) for d in derivatives],
+        'width': None, 'height': None, 'placeholder': '',
+    }
+    if metadata is not None:
+        info.update(width=metadata.width, height=metadata.height, placeholder=metadata.placeholder)
+    return info
+
+
+def get_image_info(source):
+    """
+    Returns {'width', 'height', 'placeholder', 'derivatives'} for `source`
+    (None / '' / [] when nothing was generated). Derivatives are
+    [(format, width, height, storage name)], smallest first within each format.
+    Served from the cache after the first lookup.
+    """
+    return get_image_infos([source])[source]
+
+
+def get_image_infos(sources):
+    """
+    get_image_info() for many images at once, as {source: info}: one cache
+    lookup for all of them, and two queries for all the misses together.
+    """
+    keys = {_cache_key(source): source for source in sources}
+    infos = {keys[key]: info for key, info in cache.get_many(list(keys)).items()}
+    missing = [source for source in keys.values() if source not in infos]
+    if missing:
+        metadata = {row.source: row for row in ImageMetadata.objects.filter(source__in=missing)}
+        derivatives = {}
+        for derivative in ImageDerivative.objects.filter(source__in=missing).order_by('format', 'width'):
+            derivatives.setdefault(derivative.source, []).append(derivative)
+        loaded = {source: _describe(metadata.get(source), derivatives.get(source, [])) for source in missing}
+        _cache_infos(loaded)
+        infos.update(loaded)
+    return infos
+
+
+def get_derivatives(source):
+    return get_image_info(source)['derivatives']
+
+
+def srcset(derivatives, format_name, storage=default_storage):
+    return ', '.join(
+        f"{storage.url(name)} {width}w" for derivative_format, width, height, name in derivatives
+        if derivative_format == format_name
+    )
+
+
+def best_url(field_file, max_width, format_name='webp', storage=default_storage, info=None):
+    """
+    URL of the largest `format_name` derivative no wider than `max_width`
+    (the smallest one if all are wider), or the original when there are none.
+    Pass the image's get_image_info() result as `info` when it is already loaded.
+    """
+    if not field_file:
+        return None
+    derivatives = (info or get_image_info(field_file.name))['derivatives']
+    candidates = [item for item in derivatives if item[0] == format_name]
+    if not candidates:
+        return field_file.url
+    fitting = [item for item in candidates if item[1] <= max_width] or candidates[:1]
+    return storage.url(fitting[-1][3])
@@ -0,0 +1,101 @@
+# portfolio/management/commands/backfill_image_derivatives.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from portfolio.images import image_fields_by_model, record_derivatives, render_derivatives, spec_version
+from portfolio.models import ImageDerivative
+
+
+def _init_worker():
+    # Spawned (non-forked) workers start with an unconfigured Django
+    if not apps.ready:
+        django.setup()
+
+
+def _render(source, known_hash):
+    """Worker entry point: renders files only; the parent process writes the rows."""
+    try:
+        source_hash, result = render_derivatives(source, known_hash=known_hash)
+    except Exception as exc: # Reported per image; one bad file must not stop the run
+        return source, None, None, f"{type(exc).__name__}: {exc}"
+    return source, source_hash, result, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates missing or stale responsive image derivatives for every image field "
+        "(see portfolio/images.py) using a pool of worker processes. Images whose content "
+        "hash and derivative settings are unchanged are skipped, so an interrupted run can "
+        "simply be started again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: number of CPUs; 1 renders in this process).",
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Regenerate every image, ignoring stored content hashes.",
+        )
+
+    def collect_sources(self):
+        sources = set()
+        for model_label, field_names in image_fields_by_model().items():
+            model = apps.get_model(model_label)
+            for field_name in field_names:
+                names = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+                sources.update(names.values_list(field_name, flat=True))
+        return sorted(sources)
+
+    def handle(self, *args, **options):
+        sources = self.collect_sources()
+        known_hashes = {}
+        if not options['force']:
+            current = ImageDerivative.objects.filter(spec=spec_version()).values_list('source', 'source_hash').distinct()
+            known_hashes = dict(current)
+        jobs = [(source, known_hashes.get(source)) for source in sources]
+
+        started = time.perf_counter()
+        counts = {'generated': 0, 'skipped': 0, 'failed': 0, 'files': 0, 'bytes': 0}
+
+        if options['workers'] <= 1:
+            results = (_render(*job) for job in jobs)
+            self.record_results(results, counts, options['verbosity'])
+        else:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as executor:
+                futures = [executor.submit(_render, *job) for job in jobs]
+                self.record_results((future.result() for future in as_completed(futures)), counts, options['verbosity'])
+
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(jobs)} image(s) in {elapsed:.2f}s ({len(jobs) / elapsed:.1f} images/s) "
+            f"with {max(options['workers'], 1)} worker(s): {counts['generated']} generated, "
+            f"{counts['skipped']} skipped, {counts['failed']} failed; "
+            f"{counts['files']} derivative file(s), {counts['bytes'] / 1024 / 1024:.1f} MB written."
+        ))
+
+    def record_results(self, results, counts, verbosity):
+        # Rows are written as each image finishes, so progress survives an interruption
+        for source, source_hash, result, error in results:
+            if error:
+                counts['failed'] += 1
+                self.stderr.write(f"  {source}: {error}")
+            elif result is None:
+                counts['skipped'] += 1
+            else:
+                record_derivatives(source, source_hash, result)
+                rendered = result['derivatives']
+                counts['generated'] += 1
+                counts['files'] += len(rendered)
+                counts['bytes'] += sum(size for *_, size in rendered)
+                if verbosity >= 2:
+                    self.stdout.write(f"  {source}: {len(rendered)} derivative(s)")
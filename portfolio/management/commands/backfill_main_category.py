@@ -0,0 +1,31 @@
+# portfolio/management/commands/backfill_main_category.py
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.models import Project
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized Project.main_category from each project's technologies."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only verify the stored categories; exit with an error if any are stale.",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            stale = []
+            projects = Project.objects.prefetch_related('technologies').only('pk', 'title', 'main_category')
+            for project in projects:
+                expected = Project.main_category_for(tech.category for tech in project.technologies.all())
+                if project.main_category != expected:
+                    stale.append(f"{project.title} (id={project.pk}): stored '{project.main_category}', expected '{expected}'")
+            if stale:
+                raise CommandError("Stale main_category on %d project(s):\n  %s" % (len(stale), "\n  ".join(stale)))
+            self.stdout.write(self.style.SUCCESS("All project categories are up to date."))
+            return
+
+        updated = Project.refresh_main_categories()
+        self.stdout.write(self.style.SUCCESS(f"Updated main_category on {updated} project(s)."))
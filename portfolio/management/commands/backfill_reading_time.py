@@ -0,0 +1,32 @@
+# portfolio/management/commands/backfill_reading_time.py
+from django.core.management.base import BaseCommand
+
+from portfolio.models import Blog
+
+
+class Command(BaseCommand):
+    help = "Computes the stored Blog.word_count and Blog.reading_minutes from each post's content."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Recompute every post, not only those without a stored word count.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Blog.objects.only('pk', 'content').order_by('pk')
+        if not options['all']:
+            posts = posts.filter(word_count__isnull=True)
+
+        batch, updated = [], 0
+        for post in posts.iterator(chunk_size=options['batch_size']):
+            post.update_reading_time()
+            batch.append(post)
+            if len(batch) >= options['batch_size']:
+                updated += Blog.objects.bulk_update(batch, ['word_count', 'reading_minutes'])
+                batch = []
+        if batch:
+            updated += Blog.objects.bulk_update(batch, ['word_count', 'reading_minutes'])
+        self.stdout.write(self.style.SUCCESS(f"Updated reading time on {updated} post(s)."))
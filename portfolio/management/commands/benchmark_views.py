@@ -0,0 +1,96 @@
+# portfolio/management/commands/benchmark_views.py
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from portfolio.models import Blog, Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of the public read views under WSGI (sync views, one thread "
+        "per concurrent request) and under ASGI, with the sync views and with the async views "
+        "of portfolio/async_views.py, with --concurrency requests in flight. Requests go through the full "
+        "handler and middleware stack in-process, so server overhead is not included. The "
+        "page cache is off unless --page-cache is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help="Requests per path and mode (default: 300).")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once (default: 16).")
+        parser.add_argument('--path', action='append', dest='paths', help="Path to request (repeatable; default: the main public pages).")
+        parser.add_argument('--page-cache', action='store_true', help="Leave the anonymous page cache on.")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests and --concurrency must be at least 1.")
+        paths = options['paths'] or self.default_paths()
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']} # The test clients' host
+        if not options['page_cache']:
+            overrides['PAGE_CACHE_TIMEOUT'] = 0 # A timeout of 0 stores nothing
+        with override_settings(**overrides):
+            for path in paths:
+                wsgi = self.run_wsgi(path, options['requests'], options['concurrency'])
+                asgi_sync = asyncio.run(self.run_asgi(path, options['requests'], options['concurrency']))
+                with override_settings(ROOT_URLCONF='myportfolio.asgi_urls'):
+                    asgi = asyncio.run(self.run_asgi(path, options['requests'], options['concurrency']))
+                self.stdout.write(path)
+                for mode, result in (('WSGI', wsgi), ('ASGI, sync views', asgi_sync), ('ASGI, async views', asgi)):
+                    self.stdout.write(f"  {mode}: {self.summary(*result)}")
+                self.stdout.write(f"  Async views' throughput: {wsgi[0] / asgi[0]:.2f}x WSGI, {asgi_sync[0] / asgi[0]:.2f}x ASGI with sync views")
+
+    def default_paths(self):
+        paths = [reverse('home'), reverse('projects'), reverse('projects_api'), reverse('blog_list')]
+        project_slug = Project.objects.filter(status='completed').values_list('slug', flat=True).first()
+        if project_slug:
+            paths.append(reverse('project_detail', args=[project_slug]))
+        blog_slug = Blog.objects.filter(status='published').values_list('slug', flat=True).first()
+        if blog_slug:
+            paths.append(reverse('blog_detail', args=[blog_slug]))
+        return paths
+
+    def run_wsgi(self, path, requests, concurrency):
+        local = threading.local()
+
+        def fetch(_):
+            if not hasattr(local, 'client'):
+                local.client = Client(raise_request_exception=False)
+            started = time.perf_counter()
+            status = local.client.get(path).status_code
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, range(requests)))
+        return time.perf_counter() - started, results
+
+    async def run_asgi(self, path, requests, concurrency):
+        client = AsyncClient(raise_request_exception=False)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch():
+            async with semaphore:
+                started = time.perf_counter()
+                status = (await client.get(path)).status_code
+                return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(fetch() for _ in range(requests)))
+        return time.perf_counter() - started, results
+
+    def summary(self, elapsed, results):
+        latencies = sorted(latency for latency, status in results)
+        errors = sum(1 for latency, status in results if status >= 400)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (
+            f"{len(results) / elapsed:.1f} req/s, mean {statistics.mean(latencies) * 1000:.1f} ms, "
+            f"p95 {p95 * 1000:.1f} ms, {errors} error(s)"
+        )
@@ -0,0 +1,12 @@
+# portfolio/management/commands/flush_blog_views.py
+from django.core.management.base import BaseCommand
+
+from portfolio.counters import flush_blog_views
+
+
+class Command(BaseCommand):
+    help = "Writes blog view counts accumulated in the cache to the database. Run periodically (e.g. every minute from cron)."
+
+    def handle(self, *args, **options):
+        flushed = flush_blog_views()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} blog view(s)."))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.prerender import prerender_root, render_pending, render_site
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders every public page (and the projects API) to static files in PRERENDER_ROOT, "
+        "and removes the files of pages that no longer exist. After the first run, content "
+        "changes are queued; --pending renders only the pages they affect. Run that from cron, "
+        "or with --loop as a long-running worker (see portfolio/prerender.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pending', action='store_true', help="Only render the pages affected by queued changes.")
+        parser.add_argument('--loop', action='store_true', help="With --pending, keep running, polling the queue every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds between polls with --loop (default: 5).")
+
+    def handle(self, *args, **options):
+        if not options['pending']:
+            self.report(render_site())
+            return
+        while True:
+            counts = render_pending()
+            if counts is not None:
+                self.report(counts)
+            elif not options['loop']:
+                self.stdout.write("No queued changes.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def report(self, counts):
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {counts['rendered']} page(s) into {prerender_root()}; removed {counts['removed']}."
+        ))
+        if counts['failed']:
+            self.stderr.write(self.style.WARNING(f"{counts['failed']} page(s) could not be rendered; see the log."))
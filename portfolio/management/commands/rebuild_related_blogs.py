@@ -0,0 +1,12 @@
+# portfolio/management/commands/rebuild_related_blogs.py
+from django.core.management.base import BaseCommand
+
+from portfolio.related_posts import rebuild_related_blogs
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the related-posts index (tag overlap + TF-IDF similarity) for all published posts."
+
+    def handle(self, *args, **options):
+        rows = rebuild_related_blogs()
+        self.stdout.write(self.style.SUCCESS(f"Related-posts index rebuilt: {rows} entr{'y' if rows == 1 else 'ies'}."))
@@ -0,0 +1,14 @@
+# portfolio/management/commands/rebuild_related_projects.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.models import RelatedProject
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized related-projects index (Jaccard overlap of technologies)."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = RelatedProject.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Related-projects index rebuilt: {rows} pair(s)."))
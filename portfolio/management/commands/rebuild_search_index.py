@@ -0,0 +1,17 @@
+# portfolio/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the SQLite FTS5 blog search index from the Blog table."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING("FTS5 search index not available on this database; nothing to do."))
+            return
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt: {count} post(s)."))
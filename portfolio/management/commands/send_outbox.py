@@ -0,0 +1,35 @@
+# portfolio/management/commands/send_outbox.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.outbox import BATCH_SIZE, send_due_emails
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the due emails of the outbox (portfolio/outbox.py), retrying failures with "
+        "backoff. Run it from cron, or with --loop as a long-running worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling the outbox every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds between polls with --loop (default: 5).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Emails sent per connection (default: {BATCH_SIZE}).")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+            while True: # Drain everything that is due, one connection per batch
+                counts = send_due_emails(batch_size=options['batch_size'])
+                for key, value in counts.items():
+                    totals[key] += value
+                if sum(counts.values()) < options['batch_size']:
+                    break
+            if not options['loop'] or sum(totals.values()):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {totals['sent']} email(s); {totals['retrying']} will be retried, {totals['failed']} failed permanently."
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+def backfill_main_category(apps, schema_editor):
+    # The rule of Project.main_category_for, restated over the technologies' categories
+    Project = apps.get_model('portfolio', 'Project')
+    tech_categories = {}
+    for project_id, category in Project.technologies.through.objects.values_list('project_id', 'skill__category'):
+        tech_categories.setdefault(project_id, set()).add(category)
+
+    for project_id, categories in tech_categories.items():
+        if 'frontend' in categories and 'backend' in categories:
+            category = 'fullstack'
+        elif 'frontend' in categories:
+            category = 'frontend'
+        elif 'backend' in categories:
+            category = 'backend'
+        else:
+            continue # Already the default
+        Project.objects.filter(pk=project_id).update(main_category=category)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_alter_testimonial_options_testimonial_is_approved_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='main_category',
+            field=models.CharField(choices=[('fullstack', 'Full Stack'), ('frontend', 'Frontend'), ('backend', 'Backend'), ('other', 'Other')], db_index=True, default='other', editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_main_category, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_project_main_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'end_date', 'id'], name='project_status_end_date_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_related_projects(apps, schema_editor):
+    # Jaccard overlap of every pair of completed projects' technologies, as RelatedProject.rebuild scores them
+    Project = apps.get_model('portfolio', 'Project')
+    RelatedProject = apps.get_model('portfolio', 'RelatedProject')
+    tech_sets = {}
+    rows = Project.technologies.through.objects.filter(project__status='completed').values_list('project_id', 'skill_id')
+    for project_id, skill_id in rows:
+        tech_sets.setdefault(project_id, set()).add(skill_id)
+
+    entries = []
+    for project_id, techs in tech_sets.items():
+        for other_id, other_techs in tech_sets.items():
+            if other_id != project_id and techs & other_techs:
+                score = len(techs & other_techs) / len(techs | other_techs)
+                entries.append(RelatedProject(project_id=project_id, related_id=other_id, score=score))
+    RelatedProject.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_project_status_end_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Jaccard similarity of the two projects' technologies (0-1).")),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='portfolio.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', '-score'], name='related_project_score_idx')],
+                'unique_together': {('project', 'related')},
+            },
+        ),
+        migrations.RunPython(build_related_projects, migrations.RunPython.noop),
+    ]
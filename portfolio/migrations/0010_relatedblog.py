@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_relatedproject'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedBlog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='portfolio.blog')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.blog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['blog', '-score'], name='related_blog_score_idx')],
+                'unique_together': {('blog', 'related')},
+            },
+        ),
+    ]
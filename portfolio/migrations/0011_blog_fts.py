@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:41
+
+from html import unescape
+
+from django.db import migrations
+from django.db.utils import OperationalError
+from django.utils.html import strip_tags
+
+FTS_TABLE = 'portfolio_blog_fts'
+
+
+def create_blog_fts(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases use the icontains fallback in search.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, excerpt, content, tags, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        return # SQLite built without FTS5
+
+    Blog = apps.get_model('portfolio', 'Blog')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT ti.object_id, group_concat(t.name, ' ') FROM taggit_taggeditem ti "
+            "JOIN taggit_tag t ON t.id = ti.tag_id "
+            "JOIN django_content_type ct ON ct.id = ti.content_type_id "
+            "WHERE ct.app_label = 'portfolio' AND ct.model = 'blog' GROUP BY ti.object_id"
+        )
+        tags = dict(cursor.fetchall())
+        for blog in Blog.objects.all():
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+                [blog.pk, blog.title, blog.excerpt or '', unescape(strip_tags(blog.content or '')), tags.get(blog.pk, '')],
+            )
+
+
+def drop_blog_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_relatedblog'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_blog_fts, drop_blog_fts),
+    ]
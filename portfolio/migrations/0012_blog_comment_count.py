@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_comment_count(apps, schema_editor):
+    Blog = apps.get_model('portfolio', 'Blog')
+    Comment = apps.get_model('portfolio', 'Comment')
+    counts = Comment.objects.filter(active=True).values('blog_post_id').annotate(total=Count('id')).order_by()
+    for row in counts:
+        Blog.objects.filter(pk=row['blog_post_id']).update(comment_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0011_blog_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog_post', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0012_blog_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='reading_minutes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='word_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
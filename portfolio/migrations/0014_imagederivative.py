@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0013_blog_reading_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, help_text='Storage name of the original upload.', max_length=255)),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=10)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file', models.FileField(max_length=255, upload_to='')),
+                ('size', models.PositiveIntegerField(help_text='File size in bytes.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['source', 'format', 'width'],
+                'unique_together': {('source', 'format', 'width')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0014_imagederivative'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagederivative',
+            name='source_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the original file.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='imagederivative',
+            name='spec',
+            field=models.CharField(blank=True, help_text='Fingerprint of the derivative settings used (see images.spec_version).', max_length=32),
+        ),
+    ]
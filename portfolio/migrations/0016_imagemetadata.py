@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0015_imagederivative_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Storage name of the original upload.', max_length=255, unique=True)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('placeholder', models.TextField(blank=True, help_text='data: URI of a tiny preview, shown while the image loads.')),
+            ],
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:05
+
+import math
+import re
+from collections import Counter
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# The scoring of portfolio/related_posts.py as of this migration, frozen here so
+# later changes to that module (or to the models it imports) cannot break it
+RELATED_BLOGS_PER_POST = 6
+TAG_WEIGHT = 0.4
+TEXT_WEIGHT = 0.6
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]+")
+STOP_WORDS = frozenset("""
+    about above after again against all also and any are because been before being below between both but
+    can could did does doing down during each few for from further had has have having her here hers him
+    his how into its itself just more most not now off once only other our ours out over own same she
+    should some such than that the their theirs them then there these they this those through too under
+    until very was were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(strip_tags(text or '').lower()) if token not in STOP_WORDS]
+
+
+def tfidf_vectors(documents):
+    document_frequency = Counter()
+    for tokens in documents.values():
+        document_frequency.update(set(tokens))
+    total = len(documents)
+
+    vectors = {}
+    for pk, tokens in documents.items():
+        vector = {
+            term: (count / len(tokens)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1)
+            for term, count in Counter(tokens).items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors[pk] = {term: weight / norm for term, weight in vector.items()}
+    return vectors
+
+
+def similarity(a, b, tags, other_tags):
+    union = len(tags | other_tags)
+    tag_score = len(tags & other_tags) / union if union else 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return TAG_WEIGHT * tag_score + TEXT_WEIGHT * sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def build_related_blogs(apps, schema_editor):
+    # Posts and tags are read through historical models; taggit's manager is not available on them
+    Blog = apps.get_model('portfolio', 'Blog')
+    RelatedBlog = apps.get_model('portfolio', 'RelatedBlog')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+
+    documents = {
+        pk: tokenize(' '.join((title, excerpt or '', content)))
+        for pk, title, excerpt, content in Blog.objects.filter(status='published').values_list('pk', 'title', 'excerpt', 'content')
+    }
+    tag_sets = {pk: set() for pk in documents}
+    content_type = ContentType.objects.filter(app_label='portfolio', model='blog').first()
+    if content_type is not None:
+        rows = TaggedItem.objects.filter(content_type=content_type, object_id__in=list(documents)).values_list('object_id', 'tag_id')
+        for object_id, tag_id in rows:
+            tag_sets[object_id].add(tag_id)
+
+    vectors = tfidf_vectors(documents)
+    entries = []
+    for pk in vectors:
+        scores = [
+            (similarity(vectors[pk], vectors[other], tag_sets[pk], tag_sets[other]), other)
+            for other in vectors if other != pk
+        ]
+        scores = sorted(((score, other) for score, other in scores if score > 0), key=lambda item: (-item[0], -item[1]))
+        entries += [RelatedBlog(blog_id=pk, related_id=other, score=score) for score, other in scores[:RELATED_BLOGS_PER_POST]]
+
+    RelatedBlog.objects.all().delete()
+    RelatedBlog.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0017_outgoingemail'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_related_blogs, migrations.RunPython.noop),
+    ]
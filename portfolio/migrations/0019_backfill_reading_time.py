@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:20
+
+import re
+
+from django.db import migrations
+
+WORDS_PER_MINUTE = 200 # Blog.WORDS_PER_MINUTE when this migration was written
+
+
+def backfill_reading_time(apps, schema_editor):
+    # Words outside HTML tags, at WORDS_PER_MINUTE (Blog.count_words and Blog.minutes_for); only rows not yet counted
+    Blog = apps.get_model('portfolio', 'Blog')
+    batch = []
+    for post in Blog.objects.filter(word_count__isnull=True).only('pk', 'content').order_by('pk').iterator(chunk_size=500):
+        post.word_count = len(re.sub(r'<[^>]+>', '', post.content or '').split())
+        post.reading_minutes = post.word_count // WORDS_PER_MINUTE
+        batch.append(post)
+        if len(batch) >= 500:
+            Blog.objects.bulk_update(batch, ['word_count', 'reading_minutes'])
+            batch = []
+    Blog.objects.bulk_update(batch, ['word_count', 'reading_minutes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0018_backfill_related_blogs'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reading_time, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 # portfolio/models.py
+import re
+
 from django.db import models
+from django.db.models import Q
 from django.utils.text import slugify
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -43,6 +46,12 @@ class Project(models.Model):
         ('in-progress', 'In Progress'),
         ('planned', 'Planned'),
     ]
+    MAIN_CATEGORY_CHOICES = [
+        ('fullstack', 'Full Stack'),
+        ('frontend', 'Frontend'),
+        ('backend', 'Backend'),
+        ('other', 'Other'),
+    ]
     
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
@@ -62,6 +71,14 @@ class Project(models.Model):
     github_link = models.URLField(blank=True, null=True)
     documentation_url = models.URLField(blank=True, null=True)
     technologies = models.ManyToManyField(Skill, related_name='projects')
+    # Denormalized from technologies' categories; kept current by signals (see signals.py)
+    main_category = models.CharField(
+        max_length=20,
+        choices=MAIN_CATEGORY_CHOICES,
+        default='other',
+        editable=False,
+        db_index=True,
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed')
     start_date = models.DateField(blank=True, null=True)
     end_date = models.DateField(blank=True, null=True) 
@@ -94,6 +111,10 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['-featured', '-end_date', '-created_at']
+        indexes = [
+            # Keyset navigation between completed projects (see get_adjacent_projects)
+            models.Index(fields=['status', 'end_date', 'id'], name='project_status_end_date_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -103,9 +124,10 @@ class Project(models.Model):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
-    @property
-    def get_main_category(self):
-        tech_categories = set(self.technologies.values_list('category', flat=True))
+    @staticmethod
+    def main_category_for(tech_categories):
+        """Maps a collection of Skill categories to the project's card category."""
+        tech_categories = set(tech_categories)
         if 'frontend' in tech_categories and 'backend' in tech_categories:
             return 'fullstack'
         elif 'frontend' in tech_categories:
@@ -114,6 +136,113 @@ class Project(models.Model):
             return 'backend'
         return 'other'
 
+    @property
+    def get_main_category(self):
+        return self.main_category
+
+    @classmethod
+    def refresh_main_categories(cls, project_ids=None):
+        """
+        Recomputes main_category for the given projects (all if None) with one read
+        of the technologies join table and at most one UPDATE per category.
+        Uses queryset.update(), so updated_at is left untouched.
+        Returns the number of projects whose stored category changed.
+        """
+        projects = cls.objects.all()
+        if project_ids is not None:
+            projects = projects.filter(pk__in=list(project_ids))
+        current = dict(projects.values_list('pk', 'main_category'))
+
+        tech_categories = {pk: set() for pk in current}
+        rows = cls.technologies.through.objects.all()
+        if project_ids is not None:
+            rows = rows.filter(project_id__in=list(current))
+        rows = rows.values_list('project_id', 'skill__category')
+        for project_id, category in rows:
+            tech_categories.setdefault(project_id, set()).add(category)
+
+        changed = {}
+        for pk, categories in tech_categories.items():
+            category = cls.main_category_for(categories)
+            if category != current.get(pk):
+                changed.setdefault(category, []).append(pk)
+
+        for category, pks in changed.items():
+            cls.objects.filter(pk__in=pks).update(main_category=category)
+        return sum(len(pks) for pks in changed.values())
+
+    def _adjacent_querysets(self):
+        """
+        The queries of get_adjacent_projects, each a single range of
+        project_status_end_date_idx read in index order: (previous, next,
+        first, last) lists, tried in turn until one finds a project. NULL
+        end_dates sort first; they are queried separately so that no query
+        depends on the database's NULL ordering.
+        """
+        completed = Project.objects.filter(status='completed')
+        undated = completed.filter(end_date__isnull=True)
+        dated = completed.filter(end_date__isnull=False)
+        first = [undated.order_by('id'), dated.order_by('end_date', 'id')]
+        last = [dated.order_by('-end_date', '-id'), undated.order_by('-id')]
+
+        if self.end_date is None:
+            previous = [undated.filter(id__lt=self.pk).order_by('-id')]
+            following = [undated.filter(id__gt=self.pk).order_by('id'), first[1]]
+        else:
+            # A range up to this date minus its ties on the wrong side of this id:
+            # one index range, where an OR of keyset conditions would not be
+            previous = [
+                dated.filter(end_date__lte=self.end_date).exclude(end_date=self.end_date, id__gte=self.pk).order_by('-end_date', '-id'),
+                last[1],
+            ]
+            following = [dated.filter(end_date__gte=self.end_date).exclude(end_date=self.end_date, id__lte=self.pk).order_by('end_date', 'id')]
+        return previous, following, first, last
+
+    def get_adjacent_projects(self):
+        """
+        Returns (previous, next) completed projects in (end_date, id) order, wrapping
+        around at both ends. NULL end_dates sort first. Each neighbour is usually
+        one indexed query (see _adjacent_querysets); the wrap-around and the
+        boundary between dated and undated projects add one more.
+        """
+        previous, following, first, last = self._adjacent_querysets()
+
+        def first_found(querysets):
+            for queryset in querysets:
+                project = queryset.first()
+                if project is not None:
+                    return project
+            return None
+
+        previous_project = first_found(previous)
+        next_project = first_found(following)
+
+        # Wrap around to loop through projects (from last to first, or first to last).
+        # If neither neighbour exists this is the only project, so there is nothing to wrap to.
+        if previous_project is None and next_project is not None:
+            previous_project = first_found(last)
+        elif next_project is None and previous_project is not None:
+            next_project = first_found(first)
+
+        return previous_project, next_project
+
+    def get_related_projects(self, limit=3):
+        """
+        Top related projects from the materialized RelatedProject index (one query).
+        Only when fewer than `limit` share a technology is the list topped up with
+        other recent completed projects.
+        """
+        related_projects = [
+            entry.related for entry in
+            self.related_entries.select_related('related').order_by('-score', '-related__end_date', '-related_id')[:limit]
+        ]
+        if len(related_projects) < limit:
+            exclude_ids = [self.pk] + [p.pk for p in related_projects]
+            related_projects += list(
+                Project.objects.filter(status='completed').exclude(pk__in=exclude_ids).order_by('-end_date')[:limit - len(related_projects)]
+            )
+        return related_projects
+
     @property
     def completion_date(self):
         return self.end_date
@@ -137,6 +266,82 @@ class ProjectImage(models.Model):
         return f"Image {self.order} for {self.project.title}"
 
 
+class RelatedProject(models.Model):
+    """
+    Materialized "related projects" index: one row per ordered pair of completed
+    projects that share at least one technology, scored by the Jaccard overlap
+    of their technology sets. Maintained incrementally by signals (see
+    signals.py) and rebuilt by the rebuild_related_projects command.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Jaccard similarity of the two projects' technologies (0-1).")
+
+    class Meta:
+        unique_together = ('project', 'related')
+        indexes = [
+            models.Index(fields=['project', '-score'], name='related_project_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project} ~ {self.related} ({self.score:.2f})"
+
+    @staticmethod
+    def jaccard(a, b):
+        union = len(a | b)
+        return len(a & b) / union if union else 0.0
+
+    @classmethod
+    def refresh_for(cls, project_ids):
+        """
+        Recomputes every pair involving the given projects. Similarity is symmetric,
+        so both directions are rewritten. Costs a fixed handful of queries.
+        """
+        project_ids = set(project_ids)
+        if not project_ids:
+            return
+        through = Project.technologies.through
+
+        cls.objects.filter(Q(project_id__in=project_ids) | Q(related_id__in=project_ids)).delete()
+
+        sources = set(Project.objects.filter(pk__in=project_ids, status='completed').values_list('pk', flat=True))
+        if not sources:
+            return
+
+        # Technology sets of the changed projects and of every completed project sharing a technology
+        source_skills = through.objects.filter(project_id__in=sources).values_list('skill_id', flat=True)
+        tech_sets = {}
+        rows = through.objects.filter(
+            project__status='completed',
+            project_id__in=through.objects.filter(skill_id__in=source_skills).values('project_id'),
+        ).values_list('project_id', 'skill_id')
+        for project_id, skill_id in rows:
+            tech_sets.setdefault(project_id, set()).add(skill_id)
+
+        entries = {}
+        for source in sources:
+            source_techs = tech_sets.get(source)
+            if not source_techs:
+                continue
+            for other, other_techs in tech_sets.items():
+                if other == source or not (source_techs & other_techs):
+                    continue
+                score = cls.jaccard(source_techs, other_techs)
+                entries[(source, other)] = score
+                entries[(other, source)] = score
+        cls.objects.bulk_create([
+            cls(project_id=project_id, related_id=related_id, score=score)
+            for (project_id, related_id), score in entries.items()
+        ])
+
+    @classmethod
+    def rebuild(cls):
+        """Recomputes the whole index. Returns the number of rows written."""
+        cls.objects.all().delete()
+        cls.refresh_for(Project.objects.filter(status='completed').values_list('pk', flat=True))
+        return cls.objects.count()
+
+
 class Blog(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -157,25 +362,114 @@ class Blog(models.Model):
     
     liked_by = models.ManyToManyField(User, related_name='liked_posts', blank=True)
     likes_count = models.PositiveIntegerField(default=0)  # <-- Add this line
+    comment_count = models.PositiveIntegerField(default=0, editable=False) # Active comments, kept current by signals
+    # Computed from content in save(); NULL until backfilled (manage.py backfill_reading_time)
+    word_count = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    reading_minutes = models.PositiveIntegerField(blank=True, null=True, editable=False)
 
     class Meta:
         ordering = ['-published_at']
     
     def __str__(self):
         return self.title
-    
+
+    WORDS_PER_MINUTE = 200
+
+    @staticmethod
+    def count_words(html):
+        """Words in rich-text content, HTML tags removed."""
+        return len(re.sub(r'<[^>]+>', '', html or '').split())
+
+    @classmethod
+    def minutes_for(cls, word_count):
+        return word_count // cls.WORDS_PER_MINUTE
+
+    def update_reading_time(self):
+        self.word_count = self.count_words(self.content)
+        self.reading_minutes = self.minutes_for(self.word_count)
+
+    # Fields that feed the related-posts and search indexes (see related_posts.py, search.py)
+    INDEXED_FIELDS = ('status', 'title', 'excerpt', 'content')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._index_state = instance._get_index_state()
+        return instance
+
+    def _get_index_state(self):
+        loaded = self.__dict__
+        return {name: loaded[name] for name in self.INDEXED_FIELDS if name in loaded} # Deferred fields are left out
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
+
+        # Saves that write none of the indexed fields (counters, comment counts, saves of
+        # instances loaded with deferred content) skip re-indexing, which reads every
+        # published post; the search index's post_save receiver reads this flag too.
+        update_fields = kwargs.get('update_fields')
+        state = {name: value for name, value in self._get_index_state().items() if update_fields is None or name in update_fields}
+        previous_state = getattr(self, '_index_state', None)
+        # A field deferred at load time and loaded since has no known previous value
+        self._index_state_changed = previous_state is None or any(
+            name not in previous_state or value != previous_state[name] for name, value in state.items()
+        )
+        if 'content' in state and (self._index_state_changed or self.word_count is None):
+            self.update_reading_time()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'word_count', 'reading_minutes'}
         super().save(*args, **kwargs)
 
+        # Keep the related-posts index current when a post is published, edited or unpublished
+        if self._index_state_changed and (self.status == 'published' or previous_state is not None):
+            from .related_posts import refresh_related_blogs # Imported here: related_posts imports this module
+            refresh_related_blogs(self.pk)
+        self._index_state = {**(previous_state or {}), **state}
+
+    def get_related_blogs(self, limit=3):
+        """
+        Top related published posts from the RelatedBlog index (one query). Only
+        when fewer than `limit` are indexed is the list topped up with recent posts.
+        """
+        related_blogs = [
+            entry.related for entry in
+            self.related_entries.filter(related__status='published').select_related('related').defer('related__content')
+            .order_by('-score', '-related__published_at')[:limit]
+        ]
+        if len(related_blogs) < limit:
+            exclude_ids = [self.pk] + [b.pk for b in related_blogs]
+            related_blogs += list(
+                Blog.objects.filter(status='published').exclude(pk__in=exclude_ids).defer('content').order_by('-published_at')[:limit - len(related_blogs)]
+            )
+        return related_blogs
+
     # @property
     # def likes_count(self):
     #     return self.liked_by.count()
 
 
+class RelatedBlog(models.Model):
+    """
+    Materialized related-posts index: each published post's best matches by
+    combined tag overlap and TF-IDF text similarity (see related_posts.py).
+    """
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('blog', 'related')
+        indexes = [
+            models.Index(fields=['blog', '-score'], name='related_blog_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.blog} ~ {self.related} ({self.score:.2f})"
+
+
 class Comment(models.Model):
     blog_post = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments') 
     author = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -188,13 +482,17 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of a thread level (see comments.py)
+            models.Index(fields=['blog_post', 'parent', 'created_at', 'id'], name='comment_thread_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.get_author_name} on {self.blog_post.title}"
 
     @property
     def is_reply(self):
-        return self.parent is not None
+        return self.parent_id is not None
 
     @property
     def get_author_name(self):
@@ -459,3 +757,94 @@ class Message(models.Model):
     def __str__(self):
         return f"Message from {self.name}"
 
+
+class OutgoingEmail(models.Model):
+    """
+    An email waiting to be sent. Rows are written in the same transaction as
+    whatever triggered them (e.g. a contact Message) and delivered by the
+    send_outbox command; see outbox.py.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, help_text="Optional HTML alternative to the plain-text body.")
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text="List of recipient addresses.")
+    message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Not retried before this time.")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx')]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+
+
+class ImageDerivative(models.Model):
+    """
+    A resized WebP/JPEG copy of an uploaded image, generated by images.py and
+    rendered by the {% responsive_image %} tag.
+    """
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ]
+
+    source = models.CharField(max_length=255, db_index=True, help_text="Storage name of the original upload.")
+    source_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the original file.")
+    spec = models.CharField(max_length=32, blank=True, help_text="Fingerprint of the derivative settings used (see images.spec_version).")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.FileField(max_length=255)
+    size = models.PositiveIntegerField(help_text="File size in bytes.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source', 'format', 'width')
+        ordering = ['source', 'format', 'width']
+
+    def __str__(self):
+        return f"{self.source} ({self.format}, {self.width}w)"
+
+
+class ImageMetadata(models.Model):
+    """
+    Intrinsic size and inline low-quality placeholder of an uploaded image,
+    generated with its derivatives (see images.py).
+    """
+    source = models.CharField(max_length=255, unique=True, help_text="Storage name of the original upload.")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    placeholder = models.TextField(blank=True, help_text="data: URI of a tiny preview, shown while the image loads.")
+
+    def __str__(self):
+        return f"{self.source} ({self.width}x{self.height})"
+
+
+class PrerenderQueue(models.Model):
+    """
+    A page-cache tag whose pre-rendered pages are out of date. Rows are written
+    in the same transaction as the change and drained by `manage.py prerender
+    --pending`; see prerender.py.
+    """
+    tag = models.CharField(max_length=100)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['pk']
+
+    def __str__(self):
+        return self.tag
@@ -0,0 +1,116 @@
+# portfolio/outbox.py
+"""
+Transactional email outbox.
+
+Views never talk to the SMTP server. queue_email() writes an OutgoingEmail
+row, inside the caller's transaction, so an email exists exactly when the
+record that triggered it was committed. The send_outbox management command
+(run from cron, or as a long-running worker with --loop) delivers due rows
+with send_due_emails() over one SMTP connection per batch.
+
+A failed delivery is retried with exponential backoff (RETRY_BASE_DELAY,
+doubling up to RETRY_MAX_DELAY) and given up after MAX_ATTEMPTS. Rows are
+claimed with a conditional update that also pushes next_attempt_at forward
+by CLAIM_TIMEOUT, so concurrent workers never send the same email twice and
+an email claimed by a worker that died is picked up again later.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 60 # Seconds before the first retry
+RETRY_MAX_DELAY = 6 * 60 * 60
+CLAIM_TIMEOUT = 10 * 60 # A claimed email is due again after this if its worker never reports back
+BATCH_SIZE = 50
+
+
+def queue_email(subject, body, to, html_body='', from_email=None, message=None):
+    """Adds an email to the outbox; call it inside the transaction that creates `message`."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        message=message,
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the `attempts`-th failed attempt."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def _claim(email, now):
+    claimed = OutgoingEmail.objects.filter(
+        pk=email.pk, status='pending', attempts=email.attempts, next_attempt_at__lte=now,
+    ).update(attempts=F('attempts') + 1, next_attempt_at=now + timedelta(seconds=CLAIM_TIMEOUT))
+    email.attempts += 1
+    return bool(claimed)
+
+
+def _as_message(email, connection):
+    message = EmailMultiAlternatives(email.subject, email.body, email.from_email, email.to, connection=connection)
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception: # The server may already have dropped the session
+        pass
+
+
+def send_due_emails(batch_size=BATCH_SIZE, connection=None):
+    """
+    Sends up to `batch_size` due emails over a single connection and returns
+    {'sent', 'retrying', 'failed'} counts. If the server cannot be reached at
+    all nothing is claimed; the emails stay due for the next run.
+    """
+    counts = {'sent': 0, 'retrying': 0, 'failed': 0}
+    now = timezone.now()
+    due = list(OutgoingEmail.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at', 'pk')[:batch_size])
+    if not due:
+        return counts
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Outbox: could not connect to the mail server: %s", exc)
+        return counts
+
+    try:
+        for email in due:
+            if not _claim(email, now):
+                continue # Another worker has it
+            try:
+                connection.open() # No-op while the session is up; reconnects after a failure
+                _as_message(email, connection).send()
+            except Exception as exc:
+                _close_quietly(connection) # Don't reuse a session in an unknown state
+                status = 'failed' if email.attempts >= MAX_ATTEMPTS else 'pending'
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status=status,
+                    last_error=f"{type(exc).__name__}: {exc}",
+                    next_attempt_at=timezone.now() + timedelta(seconds=retry_delay(email.attempts)),
+                )
+                counts['failed' if status == 'failed' else 'retrying'] += 1
+                logger.warning("Outbox: sending email %s failed (attempt %s): %s", email.pk, email.attempts, exc)
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(status='sent', sent_at=timezone.now(), last_error='')
+                counts['sent'] += 1
+    finally:
+        _close_quietly(connection)
+    return counts
@@ -0,0 +1,205 @@
+# portfolio/page_cache.py
+"""
+Full-page cache for anonymous visitors, invalidated by dependency tags.
+
+Views wrapped in @cache_page_tagged(...) store their whole 200 response in
+the cache, keyed by path and query string. Authenticated users and anything
+but GET/HEAD bypass it. Each entry records the tags it depends on, e.g.
+'project:*' (any project), 'blog:12' (one post), 'blog:order' (which posts
+are published, and in what order) or 'site' (settings and social links
+rendered on every page). Listing pages depend on the '*' tags; detail pages
+add the tags of the objects they show, known only after they ran, with
+add_page_tags(request, ...), so editing one post leaves the other posts'
+pages cached.
+
+Purging is done by tag version: every tag has a token in the cache, an entry
+remembers the tokens current when it was stored, and purge_tags() replaces
+them, so the next lookup of every entry carrying a purged tag is a miss.
+Model signals (signals.py) purge the tags of whatever changed; see
+instance_tags(). PAGE_CACHE_TIMEOUT bounds the staleness of anything changed
+without signals (queryset.update()).
+
+CSRF tokens from {% csrf_token %} are not shared between visitors: they are
+stored as a placeholder and filled in with the current visitor's token on
+every hit.
+"""
+import hashlib
+import re
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+PAGE_KEY = 'portfolio:page:%s'
+TAG_KEY = 'portfolio:page_tag:%s'
+
+CSRF_PLACEHOLDER = '__page_cache_csrf_token__'
+CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+# A change to one of these counts as a change to its parent (model name -> parent id attribute, parent model name)
+PARENT_MODELS = {
+    'projectimage': ('project_id', 'project'),
+}
+# Shown only on their parent's own page, so a change purges just that page
+DETAIL_CHILD_MODELS = {
+    'comment': ('blog_post_id', 'blog'),
+}
+# Fields deciding which objects a detail page links to (previous/next, related posts) and the
+# counts it shows: a change to one of them, or a new or deleted object, also purges '<model>:order'
+ORDER_FIELDS = {
+    'project': ('status', 'end_date'),
+    'blog': ('status', 'published_at'),
+}
+SITE_MODELS = ('sitesetting', 'sociallink')
+
+
+def _page_key(request):
+    return PAGE_KEY % hashlib.md5(request.get_full_path().encode()).hexdigest()
+
+
+def _tag_versions(tags, create=False):
+    keys = {tag: TAG_KEY % tag for tag in tags}
+    found = cache.get_many(keys.values())
+    versions = {tag: found.get(key) for tag, key in keys.items()}
+    if create:
+        for tag, version in versions.items():
+            if version is None:
+                cache.add(keys[tag], uuid.uuid4().hex, timeout=None)
+                versions[tag] = cache.get(keys[tag])
+    return versions
+
+
+def purge_tags(*tags):
+    """Invalidates every cached page depending on any of `tags`."""
+    cache.set_many({TAG_KEY % tag: uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def _order_state(instance):
+    return tuple(instance.__dict__.get(field) for field in ORDER_FIELDS[instance._meta.model_name])
+
+
+def remember_order_state(instance):
+    """Records the ORDER_FIELDS of an instance loaded from the database (post_init, see signals.py)."""
+    instance._page_order_state = _order_state(instance) if instance.pk is not None else None
+
+
+def instance_tags(instance, deleted=False):
+    """The tags touched by saving or deleting `instance` (also counted as a change to its parent)."""
+    name = instance._meta.model_name
+    if name in SITE_MODELS:
+        return ['site']
+    if name in DETAIL_CHILD_MODELS:
+        attribute, parent = DETAIL_CHILD_MODELS[name]
+        return [f'{parent}:{getattr(instance, attribute)}']
+    tags = [f'{name}:*', f'{name}:{instance.pk}']
+    if name in PARENT_MODELS:
+        attribute, parent = PARENT_MODELS[name]
+        tags += [f'{parent}:*', f'{parent}:{getattr(instance, attribute)}']
+    if name in ORDER_FIELDS and (deleted or getattr(instance, '_page_order_state', None) != _order_state(instance)):
+        tags.append(f'{name}:order') # New objects have no recorded state, so they always purge it
+        instance._page_order_state = _order_state(instance)
+    return tags
+
+
+def add_page_tags(request, *tags):
+    """Adds tags to the page being rendered, e.g. add_page_tags(request, f'blog:{post.pk}')."""
+    if hasattr(request, '_page_cache_tags'):
+        request._page_cache_tags.update(_tag_versions(tags, create=True))
+
+
+def _cacheable_request(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+
+
+def _store(request, response, tag_versions):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return
+    content = CSRF_INPUT.sub(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', response.content.decode(response.charset))
+    entry = {
+        'content': content,
+        'headers': {name: value for name, value in response.headers.items() if name.lower() not in ('vary', 'set-cookie')},
+        'tags': tag_versions,
+    }
+    cache.set(_page_key(request), entry, timeout=settings.PAGE_CACHE_TIMEOUT)
+
+
+def _cached_response(request):
+    entry = cache.get(_page_key(request))
+    if entry is None or _tag_versions(entry['tags']) != entry['tags']:
+        return None
+    request._page_cache_tags = entry['tags'] # What the page depends on, as if it had been rendered (see prerender.py)
+    content = entry['content']
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request)) # Sets this visitor's CSRF cookie
+    response = HttpResponse(content, headers=entry['headers'])
+    # Revalidation requests still get a 304 (the validators were stored with the page)
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+        response=response,
+    )
+
+
+_acached_response = sync_to_async(_cached_response)
+_atag_versions = sync_to_async(_tag_versions)
+_astore = sync_to_async(_store)
+
+
+def cache_page_tagged(*tags):
+    """
+    Serves the view from the page cache for anonymous GET/HEAD requests; the
+    stored page is purged whenever any of `tags` (plus those added with
+    add_page_tags) is. Responses carry X-Page-Cache: hit/miss. Requests
+    marked `request.prerendering` (see prerender.py) always render. Works on
+    sync and async views.
+    Usage: @cache_page_tagged('site', 'project:*')
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                # request.user would load the session on the event loop; auser() does not
+                if request.method not in ('GET', 'HEAD') or (await request.auser()).is_authenticated:
+                    return await view_func(request, *args, **kwargs)
+                fresh = getattr(request, 'prerendering', False)
+                # The cache backends are sync (a networked one would block the event loop)
+                response = None if fresh else await _acached_response(request)
+                if response is not None:
+                    response['X-Page-Cache'] = 'hit'
+                    return response
+
+                request._page_cache_tags = await _atag_versions(tags, create=True)
+                response = await view_func(request, *args, **kwargs)
+                if not fresh:
+                    await _astore(request, response, request._page_cache_tags)
+                response['X-Page-Cache'] = 'miss'
+                return response
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if not _cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+                # Pre-rendering (prerender.py) renders the page afresh, recording its tags but storing nothing
+                fresh = getattr(request, 'prerendering', False)
+                response = None if fresh else _cached_response(request)
+                if response is not None:
+                    response['X-Page-Cache'] = 'hit'
+                    return response
+
+                # Versions are read before rendering, so a change made meanwhile makes the stored page stale at once
+                request._page_cache_tags = _tag_versions(tags, create=True)
+                response = view_func(request, *args, **kwargs)
+                if not fresh:
+                    _store(request, response, request._page_cache_tags)
+                response['X-Page-Cache'] = 'miss'
+                return response
+        wrapper.page_cache_tags = tags # Also what prerender.py re-renders the page on
+        return wrapper
+    return decorator
@@ -0,0 +1,207 @@
+# portfolio/prerender.py
+"""
+Static pre-rendering of the public site.
+
+render_site() requests every public URL (public_paths()) through Django as
+an anonymous visitor and writes the responses under settings.PRERENDER_ROOT
+in the layout static servers resolve by default: /blog/hello/ is stored as
+blog/hello/index.html and the projects API as api/projects/index.json. Serve
+that directory in front of Django, with STATIC_ROOT at /static/ and
+MEDIA_ROOT at /media/, and pass on to Django whatever is not on disk, every
+POST and every request with a query string (search, API filters and pages);
+the rest of the read traffic never reaches Django or the database. The blog
+list links its pages and tags as plain paths for that reason. WhiteNoise can
+serve the directory too (WHITENOISE_ROOT = PRERENDER_ROOT, with
+WHITENOISE_INDEX_FILE = True), but it indexes files when the process starts,
+so its workers must be restarted to pick up re-rendered pages.
+
+Per-visitor state is loaded by the pages themselves (blog_page_state,
+csrf_token), so the files carry no CSRF token.
+
+Rebuilds are incremental and happen outside the request. A page depends on
+the page-cache tags its view recorded while rendering (page_cache.cache_page_tagged
+and add_page_tags, or VIEW_TAGS), which the manifest keeps per page.
+signals.py hands the tags of every change to schedule_rebuild(), which
+queues them (PrerenderQueue rows, written in the changing transaction like
+the email outbox); `manage.py prerender --pending`, from cron or as a worker
+with --loop, drains the queue with render_pending() and renders only the
+pages depending on the queued tags. Pages of new objects are added and those
+of deleted or unpublished ones removed. Comments queue nothing, so no
+visitor can make the site re-render: a pre-rendered post shows new comments
+after the next rebuild of that post, or of the whole site with `manage.py
+prerender`. Nothing is queued until `manage.py prerender` has built the
+site once. Files are replaced atomically, so a server never sees half a page.
+
+Pages are rendered through the request handler (middleware included) but
+never served from or stored in the page cache. A per-process cache
+(LocMemCache) never sees the purges made by the web processes, so with one
+the worker empties its own copy before every run; a shared cache is purged
+by the signals like everywhere else.
+"""
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.handlers.base import BaseHandler
+from django.db.models import Count
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from taggit.models import Tag
+
+from .models import Blog, PrerenderQueue, Project
+from .page_cache import CSRF_INPUT
+from .views import BLOG_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'prerender.json' # {path: {'file', 'tags'}} of the pages written; files relative to PRERENDER_ROOT
+
+# Tags of pre-rendered views that are not page-cached
+VIEW_TAGS = {
+    'projects_api': ('project:*', 'skill:*'),
+}
+
+
+def prerender_root():
+    return Path(settings.PRERENDER_ROOT)
+
+
+def public_paths():
+    """Every public URL path: the pages, each page of the blog list and of every tag, and the projects API."""
+    yield from (reverse('home'), reverse('projects'), reverse('projects_api'), reverse('blog_list'))
+    for slug in Project.objects.filter(status='completed').values_list('slug', flat=True):
+        yield reverse('project_detail', args=[slug])
+
+    posts = Blog.objects.filter(status='published')
+    for slug in posts.values_list('slug', flat=True):
+        yield reverse('blog_detail', args=[slug])
+    for page in range(2, -(-posts.count() // BLOG_PAGE_SIZE) + 1):
+        yield reverse('blog_page', args=[page])
+
+    tags = Tag.objects.filter(blog__status='published').annotate(posts=Count('blog')).values_list('slug', 'posts')
+    for slug, count in tags:
+        yield reverse('blog_tag', args=[slug])
+        for page in range(2, -(-count // BLOG_PAGE_SIZE) + 1):
+            yield reverse('blog_tag_page', args=[slug, page])
+
+
+def page_tags(path, request):
+    """The tags the page at `path` depends on: those its view recorded while rendering `request` (see page_cache.py)."""
+    recorded = getattr(request, '_page_cache_tags', None)
+    if recorded is not None:
+        return set(recorded)
+    return set(VIEW_TAGS.get(resolve(path).url_name, ()))
+
+
+def _renderer():
+    """Returns render(path) -> (request, response), going through the middleware like a real request."""
+    handler = BaseHandler()
+    handler.load_middleware()
+    factory = RequestFactory(HTTP_HOST=settings.PRERENDER_HOST)
+
+    def render(path):
+        request = factory.get(path)
+        request.prerendering = True # Bypasses the page cache (see page_cache.cache_page_tagged)
+        response = handler.get_response(request)
+        response.close()
+        return request, response
+    return render
+
+
+def _file_name(path, content_type):
+    index = 'index.json' if content_type.startswith('application/json') else 'index.html'
+    return f"{path.strip('/')}/{index}".lstrip('/')
+
+
+def _write(target, content):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=target.parent, prefix='.prerender-')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(content)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, target)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _remove(root, name):
+    target = root / name
+    target.unlink(missing_ok=True)
+    for directory in target.parents: # Drop directories left empty
+        if directory == root or any(directory.iterdir()):
+            break
+        directory.rmdir()
+
+
+def _read_manifest(root):
+    try:
+        return json.loads((root / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def render_site(tags=None):
+    """
+    Renders the public pages depending on any of `tags` (every page when None),
+    plus pages that were not rendered before, and removes the files of pages
+    that are gone. Returns {'rendered', 'removed', 'failed'} counts.
+    """
+    root = prerender_root()
+    manifest = _read_manifest(root) or {}
+    counts = {'rendered': 0, 'removed': 0, 'failed': 0}
+    tags = set(tags) if tags is not None else None
+    if isinstance(caches['default'], LocMemCache):
+        cache.clear() # Only this process's copy, which the web processes' purges never reached
+    render = _renderer()
+
+    paths = list(public_paths())
+    for path in paths:
+        if tags is not None and path in manifest and not tags.intersection(manifest[path]['tags']):
+            continue
+        request, response = render(path)
+        if response.status_code != 200:
+            logger.warning("Pre-render: %s answered %s; keeping the previous file.", path, response.status_code)
+            counts['failed'] += 1
+            continue
+        name = _file_name(path, response['Content-Type'])
+        content = response.content
+        if name.endswith('.html'):
+            content = CSRF_INPUT.sub(r'\g<1>\g<2>', content.decode(response.charset)).encode(response.charset)
+        _write(root / name, content)
+        manifest[path] = {'file': name, 'tags': sorted(page_tags(path, request))}
+        counts['rendered'] += 1
+
+    for path in set(manifest) - set(paths):
+        _remove(root, manifest.pop(path)['file'])
+        counts['removed'] += 1
+
+    _write(root / MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode())
+    return counts
+
+
+def schedule_rebuild(*tags):
+    """Queues a re-render of the pages depending on `tags`, in the current transaction (see render_pending)."""
+    if not (prerender_root() / MANIFEST_NAME).exists():
+        return
+    PrerenderQueue.objects.bulk_create([PrerenderQueue(tag=tag) for tag in tags])
+
+
+def render_pending():
+    """
+    Renders the pages depending on the queued tags and removes those tags from
+    the queue. Returns render_site()'s counts, or None when nothing was queued.
+    Tags queued meanwhile stay for the next run.
+    """
+    queued = list(PrerenderQueue.objects.values_list('pk', 'tag'))
+    if not queued:
+        return None
+    counts = render_site({tag for pk, tag in queued})
+    PrerenderQueue.objects.filter(pk__in=[pk for pk, tag in queued]).delete() # Only after rendering: a failed run is retried
+    return counts
@@ -0,0 +1,168 @@
+# portfolio/related_posts.py
+"""
+Related-posts engine for blog_detail.
+
+A post's similarity to another published post combines
+  - tag overlap (Jaccard similarity of their taggit tags), and
+  - text similarity (cosine of TF-IDF vectors built from title, excerpt and content).
+
+The top RELATED_BLOGS_PER_POST matches of every post are stored in the
+RelatedBlog table, so the request path reads them with a single query.
+`rebuild_related_blogs()` recomputes everything (management command
+rebuild_related_blogs); `refresh_related_blogs()` updates one post
+incrementally when it is published or edited (called from Blog.save, only
+when a save writes a new title, excerpt, content or status, since it reads
+every published post). Migration 0018 filled the index for existing posts
+with a copy of this scoring frozen at the time; changes made since reach
+existing posts through rebuild_related_blogs.
+"""
+import math
+import re
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.html import strip_tags
+from taggit.models import TaggedItem
+
+from .models import Blog, RelatedBlog
+
+RELATED_BLOGS_PER_POST = 6
+TAG_WEIGHT = 0.4
+TEXT_WEIGHT = 0.6
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]+")
+STOP_WORDS = frozenset("""
+    about above after again against all also and any are because been before being below between both but
+    can could did does doing down during each few for from further had has have having her here hers him
+    his how into its itself just more most not now off once only other our ours out over own same she
+    should some such than that the their theirs them then there these they this those through too under
+    until very was were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(strip_tags(text or '').lower()) if token not in STOP_WORDS]
+
+
+def _documents(blog_queryset):
+    return {
+        pk: tokenize(' '.join((title, excerpt or '', content)))
+        for pk, title, excerpt, content in blog_queryset.values_list('pk', 'title', 'excerpt', 'content')
+    }
+
+
+def _tfidf_vectors(documents):
+    """Returns {pk: {term: weight}} with L2-normalised TF-IDF weights."""
+    document_frequency = Counter()
+    for tokens in documents.values():
+        document_frequency.update(set(tokens))
+    total = len(documents)
+
+    vectors = {}
+    for pk, tokens in documents.items():
+        counts = Counter(tokens)
+        vector = {
+            term: (count / len(tokens)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors[pk] = {term: weight / norm for term, weight in vector.items()}
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def _tag_sets(blog_ids):
+    tag_sets = {pk: set() for pk in blog_ids}
+    rows = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Blog), object_id__in=list(blog_ids)
+    ).values_list('object_id', 'tag_id')
+    for object_id, tag_id in rows:
+        tag_sets.setdefault(object_id, set()).add(tag_id)
+    return tag_sets
+
+
+def _similarity(pk, other, vectors, tag_sets):
+    tags, other_tags = tag_sets.get(pk, set()), tag_sets.get(other, set())
+    union = len(tags | other_tags)
+    tag_score = len(tags & other_tags) / union if union else 0.0
+    return TAG_WEIGHT * tag_score + TEXT_WEIGHT * _cosine(vectors[pk], vectors[other])
+
+
+def _top_matches(pk, vectors, tag_sets, limit=RELATED_BLOGS_PER_POST):
+    scores = [(_similarity(pk, other, vectors, tag_sets), other) for other in vectors if other != pk]
+    scores = [(score, other) for score, other in scores if score > 0]
+    scores.sort(key=lambda item: (-item[0], -item[1]))
+    return scores[:limit]
+
+
+def _published_corpus():
+    documents = _documents(Blog.objects.filter(status='published'))
+    return _tfidf_vectors(documents), _tag_sets(documents)
+
+
+def related_entries(documents, tag_sets):
+    """
+    Yields (blog id, related id, score) for the top matches of every post, given
+    {pk: tokens} documents and {pk: tag ids}.
+    """
+    vectors = _tfidf_vectors(documents)
+    for pk in vectors:
+        for score, other in _top_matches(pk, vectors, tag_sets):
+            yield pk, other, score
+
+
+@transaction.atomic
+def rebuild_related_blogs():
+    """Recomputes the whole index. Returns the number of rows written."""
+    documents = _documents(Blog.objects.filter(status='published'))
+    tag_sets = _tag_sets(documents)
+    RelatedBlog.objects.all().delete()
+    entries = [RelatedBlog(blog_id=pk, related_id=other, score=score) for pk, other, score in related_entries(documents, tag_sets)]
+    RelatedBlog.objects.bulk_create(entries)
+    return len(entries)
+
+
+@transaction.atomic
+def refresh_related_blogs(blog_id):
+    """
+    Incremental update for one post: rewrites its own matches and inserts it into
+    other posts' lists where it now ranks in their top RELATED_BLOGS_PER_POST.
+    IDF weights of other posts drift slightly until the next full rebuild.
+    """
+    RelatedBlog.objects.filter(blog_id=blog_id).delete()
+    RelatedBlog.objects.filter(related_id=blog_id).delete()
+
+    vectors, tag_sets = _published_corpus()
+    if blog_id not in vectors:
+        return # Not published: it has just been removed from every list
+
+    all_matches = _top_matches(blog_id, vectors, tag_sets, limit=len(vectors))
+    RelatedBlog.objects.bulk_create([
+        RelatedBlog(blog_id=blog_id, related_id=other, score=score)
+        for score, other in all_matches[:RELATED_BLOGS_PER_POST]
+    ])
+
+    # Similarity is symmetric, so the reverse scores come for free
+    candidates = {other: score for score, other in all_matches}
+    existing = {}
+    for entry in RelatedBlog.objects.filter(blog_id__in=list(candidates)).exclude(related_id=blog_id):
+        existing.setdefault(entry.blog_id, []).append(entry)
+
+    new_entries = []
+    for other, score in candidates.items():
+        entries = existing.get(other, [])
+        if len(entries) < RELATED_BLOGS_PER_POST:
+            new_entries.append(RelatedBlog(blog_id=other, related_id=blog_id, score=score))
+            continue
+        weakest = min(entries, key=lambda entry: entry.score)
+        if score > weakest.score:
+            weakest.related_id = blog_id
+            weakest.score = score
+            weakest.save(update_fields=['related', 'score'])
+    RelatedBlog.objects.bulk_create(new_entries)
@@ -0,0 +1,173 @@
+# portfolio/search.py
+"""
+Full-text search for blog_list.
+
+On SQLite the posts are mirrored into an FTS5 virtual table (created by
+migration 0011) holding title, excerpt, plain-text content and tag names.
+It is kept in sync by signals (see signals.py); results are ranked with
+BM25 and come with a highlighted snippet of the matching content. Results
+are paged in SQL (RankedResults), so a search that matches every post still
+fetches, and builds snippets for, one page.
+
+Other databases (or SQLite builds without FTS5) fall back to icontains
+predicates, with the tag match done through an EXISTS subquery instead of
+a join + DISTINCT.
+"""
+import re
+from html import unescape
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+from taggit.models import TaggedItem
+
+from .models import Blog
+
+FTS_TABLE = 'portfolio_blog_fts'
+
+# BM25 column weights: title, excerpt, content, tags
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 6.0)
+
+SNIPPET_TOKENS = 24
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03' # Placeholders swapped for <mark> after escaping
+
+_available = {}
+
+
+def fts_available():
+    """True when the default database is SQLite and the FTS table exists (checked once per process)."""
+    key = (connection.vendor, connection.settings_dict['NAME'])
+    if key not in _available:
+        _available[key] = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+    return _available[key]
+
+
+def build_match_expression(query):
+    """
+    Turns free text into a safe FTS5 MATCH expression: every word becomes a quoted
+    prefix term, all of which must match. Returns None if there is nothing to search for.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _document(blog):
+    tag_names = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Blog), object_id=blog.pk
+    ).values_list('tag__name', flat=True)
+    return (blog.title, blog.excerpt or '', unescape(strip_tags(blog.content or '')), ' '.join(tag_names))
+
+
+def index_blog(blog):
+    """Inserts or replaces a post's row in the FTS table."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [blog.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)',
+            [blog.pk, *_document(blog)],
+        )
+
+
+def unindex_blog(blog_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [blog_id])
+
+
+def rebuild_index():
+    """Re-populates the FTS table from scratch. Returns the number of posts indexed."""
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    blogs = Blog.objects.all()
+    for blog in blogs:
+        index_blog(blog)
+    return len(blogs)
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>'))
+
+
+class RankedResults:
+    """
+    The posts matching an FTS query, best match first, as a sequence Paginator
+    can page over: count() and every slice run one query each (LIMIT/OFFSET in
+    SQL), so only the page shown is fetched and gets its snippets built.
+    Items are (blog_id, snippet).
+    """
+
+    def __init__(self, match, queryset):
+        self.match = match
+        # The caller's filters (published, tag...) as an id subquery
+        self.filter_sql, self.filter_params = queryset.order_by().values('pk').query.sql_with_params()
+        self._count = None
+
+    def _execute(self, select, select_params=(), tail='', tail_params=()):
+        sql = f"SELECT {select} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({self.filter_sql}){tail}"
+        with transaction.atomic(), connection.cursor() as cursor: # Savepoint: a failed MATCH must not poison the transaction
+            cursor.execute(sql, [*select_params, self.match, *self.filter_params, *tail_params])
+            return cursor.fetchall()
+
+    def count(self):
+        if self._count is None:
+            self._count = self._execute('COUNT(*)')[0][0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0) # -1: no limit
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        rows = self._execute(
+            f"rowid, snippet({FTS_TABLE}, 2, %s, %s, '…', %s)", [_MARK_OPEN, _MARK_CLOSE, SNIPPET_TOKENS],
+            f" ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s", [limit, start],
+        )
+        return [(blog_id, _highlight(snippet)) for blog_id, snippet in rows]
+
+
+def search_blog_ids(queryset, query):
+    """
+    Returns the posts in `queryset` matching `query` as RankedResults (paged
+    in SQL), best match first, or None when FTS is unavailable (use
+    filter_blogs_fallback).
+    """
+    if not fts_available():
+        return None
+    match = build_match_expression(query)
+    if match is None:
+        return []
+
+    results = RankedResults(match, queryset)
+    try:
+        results.count() # Runs the MATCH once, so a query FTS5 rejects falls back here
+    except DatabaseError:
+        return None
+    return results
+
+
+def filter_blogs_fallback(queryset, query):
+    """Portable search for databases without FTS5."""
+    tag_match = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Blog),
+        object_id=OuterRef('pk'),
+        tag__name__icontains=query,
+    )
+    return queryset.filter(
+        Q(title__icontains=query) |
+        Q(content__icontains=query) |
+        Q(excerpt__icontains=query) |
+        Exists(tag_match)
+    )
@@ -0,0 +1,226 @@
+# portfolio/serializers.py
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from .images import best_url, get_image_info, get_image_infos
+from .models import Project, ProjectImage, Skill
+
+
+class ProjectSerializer:
+    """
+    Builds the JSON payload for /api/projects/ (consumed by static/js/projects.js).
+    All related data comes from prefetches, and the image metadata of the card
+    fields is loaded for the whole page at once, so serializing N projects
+    costs a constant number of queries (projects, gallery images, technologies,
+    and on a cold cache image metadata and derivatives).
+
+    Supports sparse fieldsets: only the requested fields are computed, and only
+    the columns/relations they need are loaded.
+    """
+
+    # Field name -> (model columns it reads, relations it needs prefetched)
+    FIELDS = {
+        'id': ((), ()),
+        'title': (('title',), ()),
+        'slug': (('slug',), ()),
+        'short_description': (('short_description',), ()),
+        'description': (('overview_content',), ()),
+        'full_description': (('overview_content',), ()),
+        'category': (('main_category',), ()),
+        'completion_date': (('start_date', 'end_date'), ()),
+        'technologies': ((), ('technologies',)),
+        'featured_image_url': (('featured_image',), ('gallery_images',)),
+        'gallery_images_urls': ((), ('gallery_images',)),
+        'live_url': (('live_demo_link',), ()),
+        'github_url': (('github_link',), ()),
+        'documentation_url': (('documentation_url',), ()),
+        'key_features': (('key_features',), ()),
+        'challenges_and_solutions': (('challenges_and_solutions',), ()),
+        'project_type': (('project_type',), ()),
+        'client': (('client',), ()),
+        'version': (('version',), ()),
+        'seo_description': (('seo_description',), ()),
+        'seo_keywords': (('seo_keywords',), ()),
+        'main_image_url': (('featured_image',), ()),
+        'images': (('featured_image',), ()),
+        'card_image_url': (('featured_image',), ()),
+        'card_image_placeholder': (('featured_image',), ()),
+    }
+
+    # What a project card in the grid actually renders
+    CARD_FIELDS = (
+        'id', 'title', 'slug', 'short_description', 'category', 'technologies',
+        'card_image_url', 'card_image_placeholder', 'live_url', 'github_url',
+    )
+
+    CARD_IMAGE_WIDTH = 640 # Derivative served on grid cards (see images.py)
+    IMAGE_INFO_FIELDS = {'card_image_url', 'card_image_placeholder'} # Fields reading get_image_info()
+
+    @classmethod
+    def parse_fields(cls, value):
+        """Parses a `fields=` query value ("card" is an alias). Returns None for all fields."""
+        if not value:
+            return None
+        names = []
+        for name in value.split(','):
+            name = name.strip()
+            if name == 'card':
+                names.extend(cls.CARD_FIELDS)
+            elif name in cls.FIELDS:
+                names.append(name)
+        return tuple(dict.fromkeys(names)) or None # De-duplicate, keep order
+
+    @classmethod
+    def get_queryset(cls, fields=None):
+        fields = fields or tuple(cls.FIELDS)
+        columns = {'id', 'end_date'} # end_date is the ordering key
+        relations = set()
+        for name in fields:
+            field_columns, field_relations = cls.FIELDS[name]
+            columns.update(field_columns)
+            relations.update(field_relations)
+
+        queryset = Project.objects.filter(status='completed').order_by('-end_date', '-id').only(*columns)
+        if 'gallery_images' in relations:
+            queryset = queryset.prefetch_related(
+                Prefetch('gallery_images', queryset=ProjectImage.objects.only('project_id', 'image', 'order').order_by('order', 'id'))
+            )
+        if 'technologies' in relations:
+            queryset = queryset.prefetch_related(
+                Prefetch('technologies', queryset=Skill.objects.only('name', 'category').order_by('order', 'name'))
+            )
+        return queryset
+
+    def __init__(self, projects, fields=None):
+        self.projects = projects
+        self.fields = fields or tuple(self.FIELDS)
+        self.image_infos = {}
+
+    @property
+    def data(self):
+        projects = list(self.projects)
+        if self.IMAGE_INFO_FIELDS.intersection(self.fields):
+            self.image_infos = get_image_infos([project.featured_image.name for project in projects if project.featured_image])
+        return [self.serialize(project) for project in projects]
+
+    def serialize(self, project):
+        return {name: getattr(self, f'get_{name}')(project) for name in self.fields}
+
+    # --- Field getters ---
+    # .all() on a prefetched relation is served from the prefetch cache (no query)
+
+    def get_id(self, project):
+        return project.id
+
+    def get_title(self, project):
+        return project.title
+
+    def get_slug(self, project):
+        return project.slug # Include slug for direct linking
+
+    def get_short_description(self, project):
+        return project.short_description
+
+    def get_description(self, project):
+        return project.description # Property mapping to overview_content
+
+    def get_full_description(self, project):
+        return project.overview_content
+
+    def get_category(self, project):
+        return project.main_category
+
+    def get_completion_date(self, project):
+        if project.end_date:
+            return project.end_date.strftime('%B %Y')
+        if project.start_date:
+            return project.start_date.strftime('%B %Y')
+        return None
+
+    def get_technologies(self, project):
+        return [tech.name for tech in project.technologies.all()]
+
+    def get_featured_image_url(self, project):
+        # Use featured_image, fall back to first gallery image if available
+        if project.featured_image:
+            return project.featured_image.url
+        gallery_images_urls = self.get_gallery_images_urls(project)
+        return gallery_images_urls[0] if gallery_images_urls else None
+
+    def get_gallery_images_urls(self, project):
+        return [img.image.url for img in project.gallery_images.all()]
+
+    def get_live_url(self, project):
+        return project.live_demo_link
+
+    def get_github_url(self, project):
+        return project.github_link
+
+    def get_documentation_url(self, project):
+        return project.documentation_url
+
+    def get_key_features(self, project):
+        return project.key_features.strip().splitlines() if project.key_features else []
+
+    def get_challenges_and_solutions(self, project):
+        return project.challenges_and_solutions or ''
+
+    def get_project_type(self, project):
+        return project.project_type
+
+    def get_client(self, project):
+        return project.client
+
+    def get_version(self, project):
+        return project.version
+
+    def get_seo_description(self, project):
+        return project.seo_description
+
+    def get_seo_keywords(self, project):
+        return project.seo_keywords
+
+    def get_main_image_url(self, project):
+        return project.featured_image.url if project.featured_image else '/static/images/default_project_image.jpg'
+
+    def get_images(self, project):
+        return [project.featured_image.url] if project.featured_image else []
+
+    def image_info(self, project):
+        name = project.featured_image.name
+        return self.image_infos.get(name) or get_image_info(name) # Loaded by data for the whole page
+
+    def get_card_image_url(self, project):
+        if not project.featured_image:
+            return '/static/images/default_project_image.jpg'
+        return best_url(project.featured_image, self.CARD_IMAGE_WIDTH, info=self.image_info(project))
+
+    def get_card_image_placeholder(self, project):
+        # Inline data: URI painted under the card image while it loads
+        return self.image_info(project)['placeholder'] if project.featured_image else ''
+
+
+def filter_projects(queryset, category=None, technology=None, query=None, slug=None):
+    """
+    Server-side equivalents of the filters projects.js used to apply on the client.
+    Relation filters use EXISTS subqueries so no DISTINCT is needed.
+    """
+    if slug:
+        queryset = queryset.filter(slug=slug)
+
+    if category:
+        queryset = queryset.filter(main_category=category) # Denormalized, indexed column
+
+    if technology:
+        queryset = queryset.filter(Exists(
+            Project.technologies.through.objects.filter(project_id=OuterRef('pk'), skill__name__iexact=technology)
+        ))
+
+    if query:
+        queryset = queryset.filter(
+            Q(title__icontains=query) |
+            Q(short_description__icontains=query) |
+            Q(overview_content__icontains=query) |
+            Exists(Project.technologies.through.objects.filter(project_id=OuterRef('pk'), skill__name__icontains=query))
+        )
+
+    return queryset
@@ -0,0 +1,228 @@
+# portfolio/signals.py
+from django.apps import apps
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+
+from .models import SiteSetting, SocialLink, Project, ProjectImage, RelatedProject, Skill, Blog, Comment, Experience
+from .caching import invalidate_global_context, invalidate_author_stats, bump_content_version
+from .counters import adjust_comment_count
+from .images import delete_derivatives, generate_derivatives, image_fields_by_model
+from .page_cache import ORDER_FIELDS, instance_tags, purge_tags, remember_order_state
+from .prerender import schedule_rebuild
+from .conditional import SITE_VERSION, PROJECTS_VERSION, BLOG_VERSION
+from .related_posts import refresh_related_blogs
+from .search import index_blog, unindex_blog
+
+
+# --- Global context cache invalidation ---
+@receiver([post_save, post_delete], sender=SiteSetting, dispatch_uid='portfolio_site_setting_changed')
+@receiver([post_save, post_delete], sender=SocialLink, dispatch_uid='portfolio_social_link_changed')
+def global_context_changed(sender, **kwargs):
+    invalidate_global_context()
+    bump_content_version(SITE_VERSION)
+
+
+# --- Content versions for HTTP validators (see conditional.py) ---
+@receiver([post_save, post_delete], sender=ProjectImage, dispatch_uid='portfolio_project_image_changed')
+@receiver([post_save, post_delete], sender=Skill, dispatch_uid='portfolio_skill_changed')
+@receiver(m2m_changed, sender=Project.technologies.through, dispatch_uid='portfolio_project_technologies_changed')
+def projects_content_changed(sender, **kwargs):
+    bump_content_version(PROJECTS_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Comment, dispatch_uid='portfolio_comment_changed')
+@receiver([post_save, post_delete], sender=TaggedItem, dispatch_uid='portfolio_tagged_item_changed')
+@receiver([post_save, post_delete], sender=Experience, dispatch_uid='portfolio_experience_changed')
+def blog_content_changed(sender, **kwargs):
+    bump_content_version(BLOG_VERSION)
+
+
+# --- Author bio statistics (see caching.get_author_stats) ---
+@receiver(post_save, sender=Blog, dispatch_uid='portfolio_blog_author_stats_save')
+def blog_saved_for_author_stats(sender, instance, **kwargs):
+    # Blog.save has not replaced _index_state yet, so it still holds the previous status
+    previous_state = getattr(instance, '_index_state', None)
+    if previous_state is None or previous_state.get('status') != instance.status:
+        invalidate_author_stats()
+
+
+@receiver(post_delete, sender=Blog, dispatch_uid='portfolio_blog_author_stats_delete')
+@receiver([post_save, post_delete], sender=Experience, dispatch_uid='portfolio_experience_author_stats')
+def author_stats_changed(sender, **kwargs):
+    invalidate_author_stats()
+
+
+# --- Blog.comment_count (active comments) ---
+@receiver(pre_save, sender=Comment, dispatch_uid='portfolio_comment_count_pre_save')
+def remember_comment_active(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_active = Comment.objects.filter(pk=instance.pk).values_list('active', flat=True).first()
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='portfolio_comment_count_post_save')
+def comment_saved(sender, instance, created, **kwargs):
+    was_active = False if created else getattr(instance, '_previous_active', instance.active)
+    if instance.active != was_active:
+        adjust_comment_count(instance.blog_post_id, 1 if instance.active else -1)
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid='portfolio_comment_count_post_delete')
+def comment_deleted(sender, instance, **kwargs):
+    if instance.active: # Also called for each reply removed by the cascade
+        adjust_comment_count(instance.blog_post_id, -1)
+
+
+# --- Derived project data: main_category and the related-projects index ---
+def refresh_project_technology_data(project_ids):
+    project_ids = list(project_ids)
+    Project.refresh_main_categories(project_ids)
+    RelatedProject.refresh_for(project_ids)
+
+
+@receiver(m2m_changed, sender=Project.technologies.through, dispatch_uid='portfolio_project_technology_data_m2m')
+def project_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse: # project.technologies.add/remove/clear/set
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_project_technology_data([instance.pk])
+        return
+
+    # skill.projects.add/remove/clear: pk_set holds project ids (None on clear)
+    if action == 'pre_clear':
+        instance._affected_project_ids = list(instance.projects.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        refresh_project_technology_data(pk_set)
+    elif action == 'post_clear':
+        refresh_project_technology_data(getattr(instance, '_affected_project_ids', []))
+
+
+@receiver(post_save, sender=Project, dispatch_uid='portfolio_project_related_post_save')
+def project_saved(sender, instance, **kwargs):
+    # Status changes move a project in or out of the related-projects index
+    RelatedProject.refresh_for([instance.pk])
+
+
+@receiver(pre_save, sender=Skill, dispatch_uid='portfolio_skill_category_pre_save')
+def remember_skill_category(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_category = Skill.objects.filter(pk=instance.pk).values_list('category', flat=True).first()
+
+
+@receiver(post_save, sender=Skill, dispatch_uid='portfolio_skill_category_post_save')
+def skill_category_changed(sender, instance, created, **kwargs):
+    if not created and getattr(instance, '_previous_category', instance.category) != instance.category:
+        Project.refresh_main_categories(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Skill, dispatch_uid='portfolio_skill_pre_delete')
+def remember_skill_projects(sender, instance, **kwargs):
+    # The join rows are cascaded without m2m_changed, so capture the projects first
+    instance._affected_project_ids = list(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill, dispatch_uid='portfolio_skill_post_delete')
+def skill_deleted(sender, instance, **kwargs):
+    refresh_project_technology_data(getattr(instance, '_affected_project_ids', []))
+
+
+# --- Blog tag changes: search document and related-posts index ---
+# (text/status changes to the related-posts index are handled in Blog.save)
+@receiver(m2m_changed, sender=TaggedItem, dispatch_uid='portfolio_blog_tags_related_posts')
+def blog_tags_changed(sender, instance, action, **kwargs):
+    if isinstance(instance, Blog) and action in ('post_add', 'post_remove', 'post_clear'):
+        index_blog(instance) # Tag names are part of the search document
+        if instance.status == 'published':
+            refresh_related_blogs(instance.pk)
+
+
+# --- Full-text search index (see search.py) ---
+@receiver(post_save, sender=Blog, dispatch_uid='portfolio_blog_search_index_save')
+def blog_saved_for_search(sender, instance, **kwargs):
+    if getattr(instance, '_index_state_changed', True): # Set by Blog.save
+        index_blog(instance)
+
+
+@receiver(post_delete, sender=Blog, dispatch_uid='portfolio_blog_search_index_delete')
+def blog_deleted_for_search(sender, instance, **kwargs):
+    unindex_blog(instance.pk)
+
+
+# --- Responsive image derivatives (see images.py) ---
+def remember_new_images(sender, instance, **kwargs):
+    # An uncommitted FieldFile is a fresh upload; only then is the previous file name looked up
+    field_names = image_fields_by_model()[sender._meta.label]
+    uploads = [name for name in field_names if getattr(instance, name) and not getattr(instance, name)._committed]
+    previous = {}
+    if uploads and instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values(*uploads).first() or {}
+    instance._image_uploads = {name: previous.get(name) for name in uploads}
+
+
+def create_image_derivatives(sender, instance, **kwargs):
+    for field_name, previous_name in getattr(instance, '_image_uploads', {}).items():
+        source = getattr(instance, field_name).name
+        if previous_name and previous_name != source:
+            delete_derivatives(previous_name)
+        generate_derivatives(source)
+    instance._image_uploads = {}
+
+
+def delete_image_derivatives(sender, instance, **kwargs):
+    for field_name in image_fields_by_model()[sender._meta.label]:
+        if getattr(instance, field_name):
+            delete_derivatives(getattr(instance, field_name).name)
+
+
+for _model_label in image_fields_by_model():
+    _model = apps.get_model(_model_label)
+    pre_save.connect(remember_new_images, sender=_model, dispatch_uid=f'portfolio_images_pre_save_{_model_label}')
+    post_save.connect(create_image_derivatives, sender=_model, dispatch_uid=f'portfolio_images_post_save_{_model_label}')
+    post_delete.connect(delete_image_derivatives, sender=_model, dispatch_uid=f'portfolio_images_post_delete_{_model_label}')
+
+
+# --- Anonymous page cache (see page_cache.py) ---
+PAGE_CACHE_MODELS = (
+    'portfolio.Skill', 'portfolio.Project', 'portfolio.ProjectImage', 'portfolio.Blog', 'portfolio.Comment',
+    'portfolio.Experience', 'portfolio.Education', 'portfolio.Certification', 'portfolio.Award',
+    'portfolio.Service', 'portfolio.Testimonial', 'portfolio.ContactInfo', 'portfolio.SocialLink',
+    'portfolio.SiteSetting', 'taggit.Tag',
+)
+
+
+# Written by visitors: their pages are purged from the page cache, but never queued for pre-rendering
+VISITOR_MODELS = (Comment,)
+
+
+def pages_changed(*tags, prerender=True):
+    purge_tags(*tags)
+    if prerender:
+        schedule_rebuild(*tags) # Pre-rendered copies, if the site has been pre-rendered (see prerender.py)
+
+
+def purge_cached_pages(sender, instance, signal, **kwargs):
+    pages_changed(*instance_tags(instance, deleted=signal is post_delete), prerender=sender not in VISITOR_MODELS)
+
+
+def remember_page_order(sender, instance, **kwargs):
+    remember_order_state(instance) # Compared by instance_tags to tell whether the order changed
+
+
+for _model_label in PAGE_CACHE_MODELS:
+    post_save.connect(purge_cached_pages, sender=apps.get_model(_model_label), dispatch_uid=f'portfolio_page_cache_save_{_model_label}')
+    post_delete.connect(purge_cached_pages, sender=apps.get_model(_model_label), dispatch_uid=f'portfolio_page_cache_delete_{_model_label}')
+
+for _model_name in ORDER_FIELDS:
+    post_init.connect(remember_page_order, sender=apps.get_model('portfolio', _model_name), dispatch_uid=f'portfolio_page_order_{_model_name}')
+
+
+@receiver([post_save, post_delete], sender=TaggedItem, dispatch_uid='portfolio_page_cache_tagged_item')
+def tagged_item_changed(sender, instance, **kwargs):
+    if instance.content_type.model_class() is Blog:
+        pages_changed('blog:*', f'blog:{instance.object_id}')
+
+
+@receiver(m2m_changed, sender=Project.technologies.through, dispatch_uid='portfolio_page_cache_project_technologies')
+def project_technologies_changed_for_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        project_ids = [instance.pk] if not reverse else (pk_set or [])
+        pages_changed('project:*', 'skill:*', *(f'project:{pk}' for pk in project_ids))
@@ -0,0 +1,44 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from portfolio.assets import BUNDLES, get_manifest
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle_css(bundle):
+    """
+    Stylesheet of a bundle from portfolio/assets.py. When the bundle has
+    critical CSS it is inlined and the full stylesheet is loaded without
+    blocking rendering (with a <noscript> fallback). Before `manage.py
+    build_assets` has run, links the source files one by one.
+    Usage: {% bundle_css 'blog_detail' %}
+    """
+    entry = get_manifest().get(bundle)
+    if not entry or 'css' not in entry:
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(name),) for name in BUNDLES[bundle]['css']))
+    url = static(entry['css'])
+    if not entry.get('critical'):
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(entry['critical'].replace('</', '<\\/')), url, url, # Built from our own stylesheets
+    )
+
+
+@register.simple_tag
+def bundle_js(bundle):
+    """
+    Script of a bundle from portfolio/assets.py (the source files one by one before it is built;
+    nothing for bundles without scripts).
+    Usage: {% bundle_js 'blog_detail' %}
+    """
+    entry = get_manifest().get(bundle)
+    if not entry or 'js' not in entry:
+        return format_html_join('\n', '<script src="{}"></script>', ((static(name),) for name in BUNDLES[bundle].get('js', ())))
+    return format_html('<script src="{}"></script>', static(entry['js']))
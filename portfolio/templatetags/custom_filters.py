@@ -1,5 +1,6 @@
 from django import template
-import re # Import the regular expression module for wordcount
+
+from portfolio.models import Blog
 
 register = template.Library()
 
@@ -9,14 +10,22 @@ def wordcount(value):
     Counts the number of words in a string.
     Removes HTML tags before counting to provide a more accurate word count
     for rich text content (like blog post content).
+    Given a Blog post, returns its stored word_count (filled in by Blog.save
+    and migration 0019), so list pages never load the content.
     """
+    if isinstance(value, Blog):
+        return value.word_count or 0
     if not isinstance(value, str):
         return 0
-    # Remove HTML tags using a regular expression
-    clean_text = re.sub(r'<[^>]+>', '', value)
-    # Split by whitespace and count non-empty words
-    words = clean_text.split()
-    return len(words)
+    return Blog.count_words(value)
+
+@register.filter(name='reading_time')
+def reading_time(post):
+    """
+    Minutes needed to read a Blog post: the stored reading_minutes (see wordcount).
+    Usage: {{ post|reading_time }} min read
+    """
+    return post.reading_minutes or 0
 
 @register.filter(name='divide')
 def divide(value, arg):
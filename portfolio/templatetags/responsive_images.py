@@ -0,0 +1,54 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from portfolio.images import best_url, get_image_info, srcset
+
+register = template.Library()
+
+DEFAULT_SIZES = '100vw'
+FALLBACK_WIDTH = 960 # Width of the JPEG used as <img src> by browsers without srcset support
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes=DEFAULT_SIZES, **attrs):
+    """
+    Renders an uploaded image as <picture> with WebP and JPEG srcsets built
+    from its derivatives (see portfolio/images.py), or as a plain <img> when it
+    has none yet. The <img> carries the intrinsic width/height (so the browser
+    reserves the box) and the inline placeholder as its background, shown
+    until the image itself paints. Extra keyword arguments become attributes of the <img>.
+    Usage: {% responsive_image post.featured_image alt=post.title sizes="(max-width: 768px) 100vw, 33vw" loading="lazy" %}
+    """
+    if not image:
+        return ''
+    info = get_image_info(image.name)
+    if info['width'] and 'width' not in attrs:
+        attrs.update(width=info['width'], height=info['height'])
+    if info['placeholder'] and 'style' not in attrs:
+        attrs['style'] = f"background: url({info['placeholder']}) center / cover no-repeat"
+    extra = format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
+
+    derivatives = info['derivatives']
+    jpegs = [item for item in derivatives if item[0] == 'jpeg']
+    if not jpegs:
+        return format_html('<img src="{}" alt="{}"{}>', image.url, alt, extra)
+
+    fallback = ([item for item in jpegs if item[1] <= FALLBACK_WIDTH] or jpegs)[-1]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}"{}>'
+        '</picture>',
+        srcset(derivatives, 'webp'), sizes,
+        image.storage.url(fallback[3]), srcset(derivatives, 'jpeg'), sizes, alt, extra,
+    )
+
+
+@register.simple_tag
+def responsive_image_url(image, max_width):
+    """
+    URL of the largest WebP derivative of `image` no wider than `max_width`
+    (the original when it has none), for places that need a bare URL.
+    Usage: <img src="{% responsive_image_url image.image 320 %}">
+    """
+    return best_url(image, int(max_width)) or ''
@@ -1,3 +1,1360 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import importlib
+import importlib.util
+import json
+import re
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from email import message_from_bytes
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import images
+from .assets import critical_css, get_manifest, minify_css, minify_js
+from .caching import AUTHOR_STATS_KEY, get_author_stats, get_cached_global_context, invalidate_global_context
+from .comments import COMMENTS_PAGE_SIZE, REPLIES_PREVIEW, get_comment_page
+from .counters import BLOG_VIEWS_KEY, flush_blog_views, pending_blog_views, record_blog_view
+from .models import Blog, Comment, Experience, ImageDerivative, ImageMetadata, Message, OutgoingEmail, PrerenderQueue, Project, ProjectImage, RelatedBlog, RelatedProject, SiteSetting, Skill, SocialLink
+from .page_cache import CSRF_PLACEHOLDER, purge_tags
+from .prerender import render_pending, render_site
+from .outbox import MAX_ATTEMPTS, RETRY_BASE_DELAY, queue_email, send_due_emails
+from .search import filter_blogs_fallback, fts_available, search_blog_ids
+from .serializers import ProjectSerializer
+
+
+class GlobalContextCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        self.site_settings = SiteSetting.objects.create(site_title="Test Portfolio")
+        SocialLink.objects.create(platform='github', url='https://github.com/example', order=1)
+        SocialLink.objects.create(platform='twitter', url='https://twitter.com/example', order=2, active=False)
+
+    def test_steady_state_does_no_queries(self):
+        get_cached_global_context() # Warm the cache
+        with self.assertNumQueries(0):
+            context = get_cached_global_context()
+        self.assertEqual(context['site_settings'].site_title, "Test Portfolio")
+        self.assertEqual([link.platform for link in context['social_links']], ['github'])
+
+    def test_site_setting_save_invalidates(self):
+        get_cached_global_context()
+        self.site_settings.site_title = "Renamed"
+        self.site_settings.save()
+        self.assertEqual(get_cached_global_context()['site_settings'].site_title, "Renamed")
+
+    def test_social_link_changes_invalidate(self):
+        get_cached_global_context()
+        link = SocialLink.objects.create(platform='linkedin', url='https://linkedin.com/in/example', order=3)
+        self.assertEqual(len(get_cached_global_context()['social_links']), 2)
+        link.delete()
+        self.assertEqual(len(get_cached_global_context()['social_links']), 1)
+
+    def test_shared_cache_survives_local_reset(self):
+        # Simulates another worker process: empty local level, warm shared level
+        get_cached_global_context()
+        from . import caching
+        caching._local.clear()
+        with self.assertNumQueries(0):
+            get_cached_global_context()
+
+
+class ProjectsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.frontend = Skill.objects.create(name='React', category='frontend')
+        cls.backend = Skill.objects.create(name='Django', category='backend')
+
+    def make_project(self, index, technologies, featured_image=''):
+        project = Project.objects.create(
+            title=f'Project {index}',
+            end_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=index),
+            featured_image=featured_image, # A stored name: no upload, so no derivatives are generated
+        )
+        project.technologies.set(technologies)
+        for order in range(2):
+            ProjectImage.objects.create(project=project, image=f'projects/gallery_images/{index}-{order}.png', order=order)
+        return project
+
+    def get_results(self, **params):
+        return self.client.get(reverse('projects_api'), params).json()['results']
+
+    def test_query_count_is_constant(self):
+        cache.clear()
+        # validators + count + projects + gallery images + technologies + image metadata + derivatives
+        for index in range(2):
+            self.make_project(index, [self.frontend], featured_image=f'projects/{index}.png')
+        with self.assertNumQueries(7):
+            self.client.get(reverse('projects_api'))
+
+        for index in range(2, 12):
+            self.make_project(index, [self.frontend, self.backend], featured_image=f'projects/{index}.png')
+        with self.assertNumQueries(7): # Ten images not looked up yet
+            response = self.client.get(reverse('projects_api'))
+        self.assertEqual(len(response.json()['results']), 12)
+        with self.assertNumQueries(5): # Image metadata now comes from the cache
+            self.client.get(reverse('projects_api'))
+        with self.assertNumQueries(4): # Cards need no gallery images
+            self.client.get(reverse('projects_api'), {'fields': 'card'})
+
+    def test_payload(self):
+        self.make_project(1, [self.frontend, self.backend])
+        project = self.make_project(2, [self.backend])
+        data = self.get_results()
+        self.assertEqual(data[0]['slug'], project.slug)
+        self.assertEqual(data[0]['category'], 'backend')
+        self.assertEqual(data[1]['category'], 'fullstack')
+        self.assertEqual(data[0]['technologies'], ['Django'])
+        self.assertEqual(
+            data[0]['gallery_images_urls'],
+            ['/media/projects/gallery_images/2-0.png', '/media/projects/gallery_images/2-1.png'],
+        )
+
+    def test_filters(self):
+        fullstack = self.make_project(1, [self.frontend, self.backend])
+        frontend = self.make_project(2, [self.frontend])
+        other = self.make_project(3, [])
+        other.overview_content = 'A command line tool'
+        other.save()
+
+        self.assertEqual([p['id'] for p in self.get_results(category='fullstack')], [fullstack.id])
+        self.assertEqual([p['id'] for p in self.get_results(category='frontend')], [frontend.id])
+        self.assertEqual([p['id'] for p in self.get_results(category='other')], [other.id])
+        self.assertEqual([p['id'] for p in self.get_results(tech='django')], [fullstack.id])
+        self.assertEqual([p['id'] for p in self.get_results(q='command line')], [other.id])
+        self.assertEqual([p['id'] for p in self.get_results(q='react')], [frontend.id, fullstack.id])
+
+    def test_sparse_fields(self):
+        self.make_project(1, [self.frontend])
+        data = self.get_results(fields='id,title')
+        self.assertEqual(set(data[0]), {'id', 'title'})
+        # Fields without relations skip the prefetch queries: validators + count + projects
+        with self.assertNumQueries(3):
+            self.client.get(reverse('projects_api'), {'fields': 'id,title'})
+        card = self.get_results(fields='card')[0]
+        self.assertEqual(set(card), set(ProjectSerializer.CARD_FIELDS))
+        self.assertNotIn('full_description', card)
+
+    def test_pagination(self):
+        for index in range(5):
+            self.make_project(index, [])
+        response = self.client.get(reverse('projects_api'), {'page_size': 2, 'page': 2, 'fields': 'id'}).json()
+        self.assertEqual(response['count'], 5)
+        self.assertEqual(response['num_pages'], 3)
+        self.assertEqual(len(response['results']), 2)
+        self.assertIn('page=3', response['next'])
+        self.assertIn('page=1', response['previous'])
+
+
+class ConditionalGetTests(TestCase):
+    """Repeat visits with a matching validator get a 304 after a single aggregate query."""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.skill = Skill.objects.create(name='Django', category='backend')
+        self.project = Project.objects.create(title='Portfolio', end_date=datetime.date(2024, 1, 1))
+        self.project.technologies.add(self.skill)
+        self.blog_post = Blog.objects.create(title='Hello World', content='<p>Hello</p>', status='published')
+
+    def assert_revalidates(self, url, queries=1):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+        return response['ETag']
+
+    def test_project_views(self):
+        for url, queries in (
+            (reverse('projects'), 0), # Answered from the page cache
+            (reverse('project_detail', args=[self.project.slug]), 0),
+            (reverse('projects_api'), 1),
+        ):
+            etag = self.assert_revalidates(url, queries)
+            ProjectImage.objects.create(project=self.project, image='projects/gallery_images/x.png', order=len(url))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_blog_views(self):
+        list_url, detail_url = reverse('blog_list'), reverse('blog_detail', args=[self.blog_post.slug])
+        list_etag = self.assert_revalidates(list_url, queries=0) # Answered from the page cache
+        detail_etag = self.assert_revalidates(detail_url, queries=0)
+        Comment.objects.create(blog_post=self.blog_post, name='Reader', content='Nice post')
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 304) # Comments are not listed
+
+        self.blog_post.title = 'Renamed'
+        self.blog_post.save()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_blog_detail_view_count_keeps_validator(self):
+        url = reverse('blog_detail', args=[self.blog_post.slug])
+        etag = self.client.get(url)['ETag']
+        self.client.get(reverse('blog_page_state', args=[self.blog_post.slug])) # Counts the view
+        flush_blog_views()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.blog_post.refresh_from_db()
+        self.assertEqual(self.blog_post.views, 1)
+
+
+class ProjectMainCategoryTests(TestCase):
+    def setUp(self):
+        self.frontend = Skill.objects.create(name='React', category='frontend')
+        self.backend = Skill.objects.create(name='Django', category='backend')
+        self.project = Project.objects.create(title='Portfolio')
+
+    def refreshed(self):
+        self.project.refresh_from_db()
+        return self.project.main_category
+
+    def test_technologies_changes(self):
+        self.assertEqual(self.refreshed(), 'other')
+        self.project.technologies.add(self.frontend)
+        self.assertEqual(self.refreshed(), 'frontend')
+        self.project.technologies.add(self.backend)
+        self.assertEqual(self.refreshed(), 'fullstack')
+        self.project.technologies.remove(self.frontend)
+        self.assertEqual(self.refreshed(), 'backend')
+        self.project.technologies.clear()
+        self.assertEqual(self.refreshed(), 'other')
+
+    def test_reverse_relation_changes(self):
+        self.frontend.projects.add(self.project)
+        self.assertEqual(self.refreshed(), 'frontend')
+        self.frontend.projects.clear()
+        self.assertEqual(self.refreshed(), 'other')
+
+    def test_skill_category_change_and_delete(self):
+        self.project.technologies.add(self.frontend)
+        self.frontend.category = 'backend'
+        self.frontend.save()
+        self.assertEqual(self.refreshed(), 'backend')
+        self.frontend.delete()
+        self.assertEqual(self.refreshed(), 'other')
+
+    def test_backfill_command(self):
+        self.project.technologies.add(self.frontend, self.backend)
+        Project.objects.filter(pk=self.project.pk).update(main_category='other')
+        with self.assertRaises(CommandError):
+            call_command('backfill_main_category', '--check', stdout=StringIO())
+        call_command('backfill_main_category', stdout=StringIO())
+        self.assertEqual(self.refreshed(), 'fullstack')
+        call_command('backfill_main_category', '--check', stdout=StringIO())
+
+
+class ProjectNavigationTests(TestCase):
+    def expected_neighbours(self, project):
+        # Reference implementation: the full-list scan project_detail used to do
+        ordered = sorted(
+            Project.objects.filter(status='completed'),
+            key=lambda p: (p.end_date is not None, p.end_date or datetime.date.min, p.id),
+        )
+        index = [p.id for p in ordered].index(project.id)
+        previous_project = ordered[index - 1] if index > 0 else None
+        next_project = ordered[index + 1] if index < len(ordered) - 1 else None
+        if len(ordered) > 1:
+            previous_project = previous_project or ordered[-1]
+            next_project = next_project or ordered[0]
+        return previous_project, next_project
+
+    def test_matches_full_scan_with_ties_and_nulls(self):
+        dates = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), None, datetime.date(2023, 5, 1), None, datetime.date(2025, 2, 1)]
+        projects = [Project.objects.create(title=f'Project {i}', end_date=d) for i, d in enumerate(dates)]
+        Project.objects.create(title='Draft', status='planned', end_date=datetime.date(2024, 1, 1))
+        for project in projects:
+            self.assertEqual(project.get_adjacent_projects(), self.expected_neighbours(project))
+
+    def test_single_project_has_no_neighbours(self):
+        project = Project.objects.create(title='Only', end_date=datetime.date(2024, 1, 1))
+        self.assertEqual(project.get_adjacent_projects(), (None, None))
+
+    def test_query_count(self):
+        projects = [Project.objects.create(title=f'Project {i}', end_date=datetime.date(2024, 1, i + 1)) for i in range(5)]
+        with self.assertNumQueries(2):
+            projects[2].get_adjacent_projects()
+        with self.assertNumQueries(4): # Wrap-around at the end: undated projects first, then the earliest dated one
+            projects[4].get_adjacent_projects()
+
+    @skipUnless(connection.vendor == 'sqlite', "Checks SQLite query plans")
+    def test_queries_read_one_index_range(self):
+        dated = Project.objects.create(title='Dated', end_date=datetime.date(2024, 1, 1))
+        undated = Project.objects.create(title='Undated')
+        for project in (dated, undated):
+            for querysets in project._adjacent_querysets():
+                for queryset in querysets:
+                    plan = queryset[:1].explain()
+                    self.assertIn('USING INDEX project_status_end_date_idx (status=? AND end_date', plan)
+                    self.assertNotIn('TEMP B-TREE', plan) # Rows come in index order; nothing is sorted
+
+
+class RelatedProjectTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name='Python', category='backend')
+        self.django = Skill.objects.create(name='Django', category='backend')
+        self.react = Skill.objects.create(name='React', category='frontend')
+        self.css = Skill.objects.create(name='CSS', category='frontend')
+
+    def make_project(self, title, technologies, **kwargs):
+        project = Project.objects.create(title=title, end_date=datetime.date(2024, 1, 1), **kwargs)
+        project.technologies.set(technologies)
+        return project
+
+    def test_ranked_by_jaccard(self):
+        project = self.make_project('Main', [self.python, self.django, self.react])
+        close = self.make_project('Close', [self.python, self.django])
+        loose = self.make_project('Loose', [self.react, self.css])
+        self.make_project('Unrelated', [self.css])
+        with self.assertNumQueries(1):
+            related = project.get_related_projects(limit=2)
+        self.assertEqual(related, [close, loose])
+        self.assertAlmostEqual(RelatedProject.objects.get(project=project, related=close).score, 2 / 3)
+        self.assertAlmostEqual(RelatedProject.objects.get(project=close, related=project).score, 2 / 3)
+
+    def test_incremental_updates(self):
+        project = self.make_project('Main', [self.python])
+        other = self.make_project('Other', [self.react])
+        self.assertFalse(RelatedProject.objects.filter(project=project).exists())
+
+        other.technologies.add(self.python)
+        self.assertTrue(RelatedProject.objects.filter(project=project, related=other).exists())
+
+        other.status = 'planned'
+        other.save()
+        self.assertFalse(RelatedProject.objects.filter(related=other).exists())
+
+        other.status = 'completed'
+        other.save()
+        self.python.delete()
+        self.assertFalse(RelatedProject.objects.exists())
+
+    def test_falls_back_to_recent_projects(self):
+        project = self.make_project('Main', [self.python])
+        related = self.make_project('Related', [self.python])
+        recent = self.make_project('Recent', [self.css])
+        self.assertEqual(project.get_related_projects(), [related, recent])
+
+    def test_rebuild_command(self):
+        project = self.make_project('Main', [self.python])
+        self.make_project('Related', [self.python])
+        RelatedProject.objects.all().delete()
+        call_command('rebuild_related_projects', stdout=StringIO())
+        self.assertEqual(RelatedProject.objects.count(), 2)
+        self.assertEqual(len(project.get_related_projects(limit=1)), 1)
+
+
+class RelatedBlogTests(TestCase):
+    def make_post(self, title, content, tags=(), status='published'):
+        post = Blog.objects.create(title=title, content=content, status=status)
+        if tags:
+            post.tags.add(*tags)
+        return post
+
+    def test_ranks_by_text_and_tags(self):
+        post = self.make_post('Django ORM tips', '<p>Prefetch querysets and select related in the Django ORM.</p>', ['django'])
+        close = self.make_post('Django queries', '<p>Django ORM prefetch and querysets explained.</p>', ['django'])
+        tagged = self.make_post('Deploying apps', '<p>Containers and servers.</p>', ['django'])
+        self.make_post('Baking bread', '<p>Flour, water and salt.</p>')
+        with self.assertNumQueries(1):
+            related = post.get_related_blogs(limit=2)
+        self.assertEqual(related, [close, tagged])
+
+    def test_unpublish_and_tag_changes_update_index(self):
+        post = self.make_post('Python typing', '<p>Type hints in Python.</p>')
+        other = self.make_post('Python packaging', '<p>Packaging Python projects.</p>')
+        self.assertTrue(RelatedBlog.objects.filter(blog=post, related=other).exists())
+
+        other.status = 'draft'
+        other.save()
+        self.assertFalse(RelatedBlog.objects.filter(related=other).exists())
+
+        unrelated = self.make_post('Gardening', '<p>Tomatoes.</p>')
+        self.assertFalse(RelatedBlog.objects.filter(blog=post, related=unrelated).exists())
+        unrelated.tags.add('weekend')
+        post.tags.add('weekend')
+        self.assertTrue(RelatedBlog.objects.filter(blog=post, related=unrelated).exists())
+
+    def test_unrelated_saves_skip_refresh(self):
+        post = self.make_post('Python typing', '<p>Type hints in Python.</p>')
+        post = Blog.objects.get(pk=post.pk)
+        post.likes_count = 3
+        with self.assertNumQueries(1): # Just the UPDATE
+            post.save()
+
+    def test_saves_without_indexed_changes_skip_refresh(self):
+        post = self.make_post('Python typing', '<p>Type hints in Python.</p>')
+        deferred = Blog.objects.defer('content').get(pk=post.pk)
+        deferred.views = 10
+        with self.assertNumQueries(1): # Deferred content is not an edit
+            deferred.save()
+        post.title = 'Python type hints'
+        with self.assertNumQueries(1): # Only update_fields are written
+            post.save(update_fields=['likes_count'])
+
+    def test_rebuild_command(self):
+        post = self.make_post('Python typing', '<p>Type hints in Python.</p>')
+        self.make_post('Python packaging', '<p>Packaging Python projects.</p>')
+        RelatedBlog.objects.all().delete()
+        call_command('rebuild_related_blogs', stdout=StringIO())
+        self.assertEqual(RelatedBlog.objects.count(), 2)
+        self.assertEqual(len(post.get_related_blogs(limit=1)), 1)
+
+    def test_migration_backfills_index(self):
+        self.make_post('Python typing', '<p>Type hints in Python.</p>', ['python'])
+        self.make_post('Python packaging', '<p>Packaging Python projects.</p>', ['python'])
+        expected = set(RelatedBlog.objects.values_list('blog_id', 'related_id'))
+        RelatedBlog.objects.all().delete()
+        migration = importlib.import_module('portfolio.migrations.0018_backfill_related_blogs')
+        migration.build_related_blogs(django_apps, None)
+        self.assertEqual(set(RelatedBlog.objects.values_list('blog_id', 'related_id')), expected)
+
+
+class BlogSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.title_match = Blog.objects.create(title='Caching in Django', content='<p>Notes.</p>', status='published')
+        self.body_match = Blog.objects.create(
+            title='Performance notes', content='<p>A page about <b>caching</b> &amp; speed.</p>', status='published'
+        )
+        self.tag_match = Blog.objects.create(title='Weekend project', content='<p>Nothing here.</p>', status='published')
+        self.tag_match.tags.add('caching')
+        self.draft = Blog.objects.create(title='Caching draft', content='<p>Unpublished.</p>', status='draft')
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('blog_list'), {'q': query, **params})
+        return list(response.context['blog_posts'])
+
+    def test_fts_ranked_results_with_snippets(self):
+        self.assertTrue(fts_available())
+        results = self.search('cach')
+        self.assertEqual(results[0], self.title_match) # Title matches weigh most
+        self.assertCountEqual(results, [self.title_match, self.body_match, self.tag_match])
+        snippet = results[results.index(self.body_match)].search_snippet
+        self.assertIn('<mark>caching</mark>', snippet)
+        self.assertIn('&amp; speed', snippet) # Text is escaped, only the highlight is markup
+
+    def test_index_follows_changes(self):
+        self.body_match.content = '<p>Now about databases.</p>'
+        self.body_match.save()
+        self.assertNotIn(self.body_match, self.search('caching'))
+        self.tag_match.tags.clear()
+        self.assertNotIn(self.tag_match, self.search('caching'))
+        self.title_match.delete()
+        self.assertEqual(self.search('caching'), [])
+
+    def test_tag_filter_and_odd_input(self):
+        self.assertEqual(self.search('caching', tag='caching'), [self.tag_match])
+        self.assertEqual(self.search('"caching*('), self.search('caching')) # FTS syntax is neutralised
+
+    def test_results_are_paged_in_sql(self):
+        extra = [Blog.objects.create(title=f'Caching {number}', content='<p>More.</p>', status='published') for number in range(12)]
+        results = search_blog_ids(Blog.objects.filter(status='published'), 'caching')
+        self.assertEqual(results.count(), 15)
+        with CaptureQueriesContext(connection) as queries:
+            second_page = results[10:20]
+        self.assertEqual(len(second_page), 5)
+        self.assertTrue(any('LIMIT 10 OFFSET 10' in query['sql'] for query in queries))
+        ids = [blog_id for blog_id, snippet in results[:10] + second_page]
+        self.assertCountEqual(ids, [self.title_match.pk, self.body_match.pk, self.tag_match.pk, *(post.pk for post in extra)])
+        self.assertEqual(len(self.search('caching', page=2)), 5)
+
+    def test_fallback_matches_same_posts(self):
+        fallback = filter_blogs_fallback(Blog.objects.filter(status='published'), 'caching')
+        self.assertCountEqual(fallback, [self.title_match, self.body_match, self.tag_match])
+
+
+@override_settings(BLOG_VIEWS_FLUSH_INTERVAL=None)
+class BlogViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.first = Blog.objects.create(title='First', content='<p>One</p>', status='published')
+        self.second = Blog.objects.create(title='Second', content='<p>Two</p>', status='published')
+
+    def test_page_state_does_not_write(self):
+        url = reverse('blog_page_state', args=[self.first.slug])
+        self.client.get(url) # Warm caches
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([q for q in queries if q['sql'].lstrip().upper().startswith(('UPDATE', 'INSERT', 'DELETE'))])
+        self.assertEqual(pending_blog_views([self.first.pk]), {self.first.pk: 2})
+
+    def test_flush_batches_and_keeps_updated_at(self):
+        updated_at = self.first.updated_at
+        for _ in range(3):
+            record_blog_view(self.first.pk)
+        for _ in range(3):
+            record_blog_view(self.second.pk)
+
+        with self.assertNumQueries(4): # blog ids, savepoint, one UPDATE for the shared delta, release
+            self.assertEqual(flush_blog_views(), 6)
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.views, self.second.views), (3, 3))
+        self.assertEqual(self.first.updated_at, updated_at)
+        self.assertEqual(pending_blog_views([self.first.pk, self.second.pk]), {})
+
+    @override_settings(CACHES={'default': {'BACKEND': 'portfolio.tests.EvictingCache', 'LOCATION': 'evicting'}})
+    def test_flush_skips_counts_evicted_meanwhile(self):
+        record_blog_view(self.first.pk)
+        record_blog_view(self.second.pk)
+        EvictingCache.evict_on_read = BLOG_VIEWS_KEY % self.first.pk
+        self.assertEqual(flush_blog_views(), 1)
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.views, 1)
+
+    def test_flush_command(self):
+        record_blog_view(self.first.pk)
+        call_command('flush_blog_views', stdout=StringIO())
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 1)
+        self.assertEqual(flush_blog_views(), 0)
+
+
+class BlogLikeTests(TestCase):
+    def setUp(self):
+        self.post = Blog.objects.create(title='Likes', content='<p>Like me.</p>', status='published')
+        self.url = reverse('like_blog_post', args=[self.post.slug])
+
+    def test_like_toggle_returns_count_without_saving_row(self):
+        updated_at = self.post.updated_at
+        Blog.objects.filter(pk=self.post.pk).update(likes_count=5) # Other visitors' likes
+
+        data = self.client.post(self.url).json()
+        self.assertEqual((data['liked'], data['likes_count']), (True, 6))
+        data = self.client.post(self.url).json()
+        self.assertEqual((data['liked'], data['likes_count']), (False, 5))
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.updated_at, updated_at)
+
+    def test_unlike_never_goes_negative(self):
+        self.client.post(self.url)
+        Blog.objects.filter(pk=self.post.pk).update(likes_count=0)
+        self.assertEqual(self.client.post(self.url).json()['likes_count'], 0)
+
+    def test_unknown_post(self):
+        self.assertEqual(self.client.post(reverse('like_blog_post', args=['missing'])).status_code, 404)
+
+
+@override_settings(BLOG_VIEWS_FLUSH_INTERVAL=None)
+class AuthorStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.post = Blog.objects.create(title='Stats', content='<p>Numbers.</p>', status='published', views=10)
+        Blog.objects.create(title='Draft', content='<p>Hidden.</p>', views=99)
+
+    def test_detail_view_uses_cached_stats(self):
+        url = reverse('blog_detail', args=[self.post.slug])
+        self.client.get(url)
+        purge_tags(f'blog:{self.post.pk}') # Render again instead of serving the cached page
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse([q for q in queries if 'SUM(' in q['sql'].upper()])
+        self.assertEqual(response.context['blog_post_count'], 1)
+        self.assertEqual(response.context['total_blog_views'], 10)
+
+    def test_publish_and_unpublish_invalidate(self):
+        self.assertEqual(get_author_stats()['total_articles'], 1)
+        post = Blog.objects.get(pk=self.post.pk)
+        post.title = 'Renamed'
+        post.save()
+        self.assertIsNotNone(cache.get(AUTHOR_STATS_KEY)) # Status unchanged
+
+        post.status = 'draft'
+        post.save()
+        self.assertEqual(get_author_stats()['total_articles'], 0)
+
+    def test_flush_and_experience_invalidate(self):
+        self.assertEqual(get_author_stats()['years_experience'], 0)
+        record_blog_view(self.post.pk)
+        flush_blog_views()
+        self.assertEqual(get_author_stats()['total_blog_views'], 11)
+
+        Experience.objects.create(title='Developer', company='Acme', start_date=datetime.date(2015, 1, 1), description='Work')
+        self.assertEqual(get_author_stats()['years_experience'], timezone.now().year - 2015)
+
+
+@override_settings(BLOG_VIEWS_FLUSH_INTERVAL=None)
+class CommentPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.post = Blog.objects.create(title='Threads', content='<p>Discuss.</p>', status='published')
+        self.url = reverse('blog_comments', args=[self.post.slug])
+
+    def add_comments(self, count, parent=None, prefix='Comment'):
+        return [
+            Comment.objects.create(blog_post=self.post, parent=parent, name='Reader', content=f'{prefix} {index}')
+            for index in range(count)
+        ]
+
+    def test_comment_count_is_maintained(self):
+        parent, other = self.add_comments(2)
+        self.add_comments(2, parent=parent)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 4)
+
+        other.active = False
+        other.save()
+        other.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+
+        parent.delete() # Cascades to its replies
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_pages_cost_two_queries_and_do_not_overlap(self):
+        for comment in self.add_comments(25):
+            self.add_comments(1, parent=comment, prefix='Reply')
+
+        with self.assertNumQueries(2):
+            first, _ = get_comment_page(self.post)
+        self.assertEqual(len(first), COMMENTS_PAGE_SIZE)
+        self.assertEqual(len(first[0].children), 1)
+
+        seen, next_url = [], self.url
+        while next_url:
+            data = self.client.get(next_url).json()
+            seen.append(data['count'])
+            next_url = data['next']
+        self.assertEqual(seen, [10, 10, 5])
+
+    def test_long_threads_load_more_replies(self):
+        parent = self.add_comments(1)[0]
+        self.add_comments(REPLIES_PREVIEW + 2, parent=parent, prefix='Reply')
+        comments, _ = get_comment_page(self.post)
+        self.assertEqual((len(comments[0].children), comments[0].more_replies), (REPLIES_PREVIEW, 2))
+
+        response = self.client.get(reverse('blog_detail', args=[self.post.slug]))
+        self.assertContains(response, 'Load 2 more replies')
+        self.assertNotContains(response, f'Reply {REPLIES_PREVIEW}')
+
+        data = self.client.get(self.url, {'parent': parent.pk, 'after': comments[0].replies_cursor}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertIn(f'Reply {REPLIES_PREVIEW + 1}', data['html'])
+        self.assertIsNone(data['next'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'after': 'nonsense'}).status_code, 400)
+
+class ReadingTimeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+
+    def test_computed_on_save(self):
+        post = Blog.objects.create(title='Long read', content='<p>' + 'word ' * 450 + '</p>', status='published')
+        self.assertEqual((post.word_count, post.reading_minutes), (450, 2))
+
+        post.content = '<p>Short.</p>'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_minutes), (1, 0))
+
+        post.content = '<p>' + 'word ' * 650 + '</p>'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_minutes), (650, 3))
+
+    def test_list_pages_do_not_load_content(self):
+        Blog.objects.create(title='Listed', content='<p>' + 'word ' * 600 + '</p>', status='published')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, '~3 min read')
+        blog_selects = [q['sql'] for q in queries if 'FROM "portfolio_blog"' in q['sql'] and '"portfolio_blog"."title"' in q['sql']]
+        self.assertTrue(blog_selects)
+        self.assertFalse([sql for sql in blog_selects if '"portfolio_blog"."content"' in sql])
+
+    def test_filters_never_load_content(self):
+        post = Blog.objects.create(title='Legacy', content='<p>' + 'word ' * 200 + '</p>')
+        Blog.objects.filter(pk=post.pk).update(word_count=None, reading_minutes=None)
+        template = Template('{% load custom_filters %}{{ post|reading_time }}/{{ post|wordcount }}')
+        listed = Blog.objects.defer('content').get(pk=post.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(template.render(Context({'post': listed})), '0/0')
+
+    def test_backfill_command(self):
+        post = Blog.objects.create(title='Legacy', content='<p>' + 'word ' * 200 + '</p>')
+        Blog.objects.filter(pk=post.pk).update(word_count=None, reading_minutes=None)
+        call_command('backfill_reading_time', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_minutes), (200, 1))
+
+    def test_migration_backfills_reading_time(self):
+        post = Blog.objects.create(title='Legacy', content='<p>' + 'word ' * 450 + '</p>')
+        Blog.objects.filter(pk=post.pk).update(word_count=None, reading_minutes=None)
+        importlib.import_module('portfolio.migrations.0019_backfill_reading_time').backfill_reading_time(django_apps, None)
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_minutes), (450, 2))
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, name, size=(1000, 500), mode='RGB'):
+        buffer = BytesIO()
+        Image.new(mode, size, 'red').save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_upload_creates_derivatives(self):
+        post = Blog.objects.create(title='Pictures', content='<p>Look.</p>', featured_image=self.upload('cover.png'))
+        derivatives = ImageDerivative.objects.filter(source=post.featured_image.name)
+        self.assertEqual(
+            sorted(derivatives.values_list('format', 'width', 'height')),
+            [(fmt, width, width // 2) for fmt in ('jpeg', 'webp') for width in (320, 640, 960, 1000)],
+        )
+        webp = derivatives.get(format='webp', width=320)
+        self.assertTrue(webp.file.storage.exists(webp.file.name))
+        self.assertLess(webp.size, post.featured_image.size)
+
+    def test_sources_differing_in_extension_keep_their_own_derivatives(self):
+        png = Blog.objects.create(title='PNG', content='<p>Look.</p>', featured_image=self.upload('same.png', size=(400, 200)))
+        jpg = Blog.objects.create(title='JPG', content='<p>Look.</p>', featured_image=self.upload('same.jpg', size=(400, 100)))
+        png_files = set(ImageDerivative.objects.filter(source=png.featured_image.name).values_list('file', flat=True))
+        jpg_files = set(ImageDerivative.objects.filter(source=jpg.featured_image.name).values_list('file', flat=True))
+        self.assertFalse(png_files & jpg_files)
+        with default_storage.open(f'derivatives/{png.featured_image.name}-400w.webp') as file:
+            self.assertEqual(Image.open(file).size, (400, 200)) # Not overwritten by same.jpg's derivatives
+
+    def test_replacing_and_deleting_clean_up(self):
+        post = Blog.objects.create(title='Pictures', content='<p>Look.</p>', featured_image=self.upload('first.png'))
+        first = post.featured_image.name
+        post.featured_image = self.upload('second.png', size=(400, 400), mode='RGBA')
+        post.save()
+        self.assertFalse(ImageDerivative.objects.filter(source=first).exists())
+        self.assertEqual(ImageDerivative.objects.filter(source=post.featured_image.name).count(), 4) # 320 and 400, two formats
+
+        post = Blog.objects.get(pk=post.pk)
+        post.likes_count = 1
+        with self.assertNumQueries(1): # Saves without a new upload do no image work
+            post.save()
+        post.delete()
+        self.assertFalse(ImageDerivative.objects.exists())
+
+    def test_responsive_image_tag(self):
+        post = Blog.objects.create(title='Pictures', content='<p>Look.</p>', featured_image=self.upload('tag.png'))
+        template = Template('{% load responsive_images %}{% responsive_image post.featured_image alt=post.title sizes="50vw" loading="lazy" %}')
+        with self.assertNumQueries(0): # Served from the cache
+            html = template.render(Context({'post': post}))
+        self.assertIn('<source type="image/webp" srcset="/media/derivatives/blog/tag.png-320w.webp 320w', html)
+        self.assertIn('src="/media/derivatives/blog/tag.png-960w.jpg"', html)
+        self.assertIn('sizes="50vw" alt="Pictures" loading="lazy"', html)
+
+        self.assertIn('width="1000" height="500" style="background: url(data:image/webp;base64,', html)
+
+        bare = Template('{% load responsive_images %}{% responsive_image post.featured_image alt="x" %}')
+        self.assertEqual(bare.render(Context({'post': Blog(featured_image='blog/missing.png')})), '<img src="/media/blog/missing.png" alt="x">')
+
+
+    def test_metadata_and_placeholder(self):
+        project = Project.objects.create(
+            title='Pictured', slug='pictured', status='completed', featured_image=self.upload('card.png', size=(1200, 900)),
+        )
+        metadata = ImageMetadata.objects.get(source=project.featured_image.name)
+        self.assertEqual((metadata.width, metadata.height), (1200, 900))
+        self.assertTrue(metadata.placeholder.startswith('data:image/webp;base64,'))
+        self.assertLess(len(metadata.placeholder), 1000)
+
+        card = self.client.get(reverse('projects_api'), {'fields': 'card'}).json()['results'][0]
+        self.assertEqual(card['card_image_placeholder'], metadata.placeholder)
+        self.assertTrue(card['card_image_url'].endswith('card.png-640w.webp'))
+
+    def test_images_without_derivatives_are_cached_briefly(self):
+        post = Blog.objects.create(title='Pictures', content='<p>Look.</p>', featured_image=self.upload('kept.png'))
+        infos = images.get_image_infos([post.featured_image.name, 'blog/pending.png'])
+        self.assertEqual(infos['blog/pending.png']['derivatives'], [])
+
+        def expiry(source): # LocMemCache's own bookkeeping: when the entry expires
+            return cache._expire_info[cache.make_and_validate_key(images._cache_key(source))]
+        self.assertIsNone(expiry(post.featured_image.name))
+        self.assertLessEqual(expiry('blog/pending.png'), time.time() + images.MISSING_INFO_TIMEOUT)
+
+    def test_backfill_command_skips_unchanged_images(self):
+        name = default_storage.save('blog/legacy.png', self.upload('legacy.png'))
+        post = Blog.objects.create(title='Legacy', content='<p>Old.</p>')
+        Blog.objects.filter(pk=post.pk).update(featured_image=name) # Bypasses the upload signals
+
+        out = StringIO()
+        call_command('backfill_image_derivatives', workers=1, stdout=out)
+        self.assertIn('1 generated, 0 skipped, 0 failed', out.getvalue())
+        self.assertEqual(ImageDerivative.objects.filter(source=name).count(), 8)
+
+        out = StringIO()
+        call_command('backfill_image_derivatives', workers=2, stdout=out)
+        self.assertIn('0 generated, 1 skipped', out.getvalue())
+
+        default_storage.delete(name)
+        default_storage.save(name, self.upload('legacy.png', size=(300, 200)))
+        out = StringIO()
+        call_command('backfill_image_derivatives', workers=2, stdout=out)
+        self.assertIn('1 generated, 0 skipped', out.getvalue())
+        self.assertEqual(set(ImageDerivative.objects.filter(source=name).values_list('width', flat=True)), {300})
+
+
+class StaticFilesPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root, ignore_errors=True)
+        settings_override = override_settings(STATIC_ROOT=cls.static_root)
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        hashed = staticfiles_storage.stored_name('css/style.css')
+        self.assertRegex(hashed, r'^css/style\.[0-9a-f]{12}\.css$')
+        self.assertTrue(staticfiles_storage.exists(hashed + '.gz'))
+        if importlib.util.find_spec('brotli'):
+            self.assertTrue(staticfiles_storage.exists(hashed + '.br'))
+
+    def test_hashed_files_are_served_immutable_and_compressed(self):
+        url = static('css/style.css')
+        self.assertNotEqual(url, '/static/css/style.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'max-age=315360000, public, immutable')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        # Unhashed names stay reachable but may change, so they are cached briefly
+        response = self.client.get('/static/css/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class AssetBundleTests(TestCase):
+    def setUp(self):
+        bundles_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, bundles_root, ignore_errors=True)
+        settings_override = override_settings(
+            ASSET_BUNDLES_ROOT=bundles_root,
+            STATICFILES_DIRS=[settings.BASE_DIR / 'static', ('dist', bundles_root)],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_minifiers_keep_strings_and_regexes(self):
+        js = "const a = 'http://x // y';  // note\nconst re = /\\/\\*[^/]*/g;\n/* block */\nlet b = a.length / 2\n`${a} /* kept */`\n"
+        self.assertEqual(minify_js(js), "const a = 'http://x // y'; \nconst re = /\\/\\*[^/]*/g;\n \nlet b = a.length / 2\n`${a} /* kept */`")
+        self.assertEqual(minify_js("x = a       / 2 / b; if (y) return  /z/.test(s)"), "x = a / 2 / b; if (y) return /z/.test(s)")
+        css = "/* c */\n.a > .b ,\n.c :hover {\n  content: '  /* x */ ';\n  color : red;\n}\n"
+        self.assertEqual(minify_css(css), ".a>.b,.c :hover{content:'  /* x */ ';color :red}")
+
+    def test_bundles_without_scripts_render_none_before_the_build(self):
+        template = Template("{% load asset_bundles %}{% bundle_js 'index' %}{% bundle_js 'contact_success' %}")
+        self.assertEqual(template.render(Context()), '')
+
+    def test_critical_css_keeps_only_rules_for_the_markup(self):
+        css = ".hero{color:red}.hero:hover{color:blue}.footer{color:green}@media (max-width:768px){.hero h1{font-size:1rem}.footer{margin:0}}@keyframes spin{to{opacity:1}}@keyframes fade{to{opacity:0}}.hero span{animation:fade 1s}"
+        self.assertEqual(
+            critical_css(css, '<section class="hero"><h1><span>Hi</span></h1></section>'),
+            ".hero{color:red}@media (max-width:768px){.hero h1{font-size:1rem}}@keyframes fade{to{opacity:0}}.hero span{animation:fade 1s}",
+        )
+
+    def test_pages_use_built_bundles(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, static('css/style.css')) # Source files until the bundles are built
+        self.assertContains(response, static('js/main.js'))
+        html = response.content.decode()
+        self.assertLess(html.index('swiper-bundle.min.css'), html.index(static('css/style.css'))) # Site rules win ties
+
+        call_command('build_assets', stdout=StringIO())
+        entry = get_manifest()['index']
+        self.assertIn('.hero-title', entry['critical'])
+        self.assertNotIn('.footer-content', entry['critical']) # Below the fold
+        self.assertLess(entry['css_size'], len(Path(finders.find('css/style.css')).read_bytes()))
+
+        response = self.client.get(reverse('home'))
+        self.assertNotContains(response, static('css/style.css'))
+        self.assertContains(response, f'<link rel="preload" href="{static(entry["css"])}" as="style"')
+        self.assertContains(response, f'<script src="{static(get_manifest()["base"]["js"])}"></script>')
+        self.assertContains(response, '<style>:root{')
+
+        response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, f'<link rel="stylesheet" href="{static(get_manifest()["base"]["css"])}">') # No critical CSS
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of SMTP for smtplib; DATA is refused while server.reject_data > 0."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost ready')
+        while line := self.rfile.readline().decode().rstrip('\r\n'):
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250 localhost')
+            elif command == 'DATA':
+                if self.server.reject_data > 0:
+                    self.server.reject_data -= 1
+                    self.reply('451 Try again later')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                self.server.messages.append(message_from_bytes(data))
+                self.reply('250 Queued')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else: # MAIL, RCPT, RSET, NOOP
+                self.reply('250 OK')
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.smtp = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeSMTPHandler)
+        self.smtp.daemon_threads = True
+        self.smtp.connections, self.smtp.reject_data, self.smtp.messages = 0, 0, []
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.addCleanup(self.smtp.server_close)
+        self.addCleanup(self.smtp.shutdown)
+        settings_override = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.smtp.server_address[1],
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='', EMAIL_TIMEOUT=5,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def submit(self):
+        return self.client.post(reverse('submit_contact_form'), {
+            'name': 'Ada', 'email': 'ada@example.com', 'subject': 'Hello', 'message': 'Nice portfolio.',
+        })
+
+    def test_contact_form_queues_emails_without_sending(self):
+        response = self.submit()
+        self.assertEqual(response.json()['success'], True)
+        self.assertEqual(self.smtp.connections, 0)
+        message = Message.objects.get()
+        self.assertEqual(
+            {email.to[0]: bool(email.html_body) for email in message.emails.all()},
+            {settings.CONTACT_EMAIL: False, 'ada@example.com': True},
+        )
+
+    def test_worker_sends_over_one_connection(self):
+        self.submit()
+        self.submit()
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertIn('Sent 4 email(s)', out.getvalue())
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 4)
+        self.assertEqual(OutgoingEmail.objects.filter(status='sent').count(), 4)
+        self.assertEqual(send_due_emails(), {'sent': 0, 'retrying': 0, 'failed': 0}) # Nothing due twice
+
+    def test_failures_are_retried_with_backoff(self):
+        email = queue_email('Hi', 'Body', ['ada@example.com'])
+        self.smtp.reject_data = 1
+        with self.assertLogs('portfolio.outbox', 'WARNING'):
+            self.assertEqual(send_due_emails(), {'sent': 0, 'retrying': 1, 'failed': 0})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('451', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + datetime.timedelta(seconds=RETRY_BASE_DELAY - 5))
+        self.assertEqual(send_due_emails(), {'sent': 0, 'retrying': 0, 'failed': 0}) # Not due yet
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_due_emails(), {'sent': 1, 'retrying': 0, 'failed': 0})
+        self.assertEqual(self.smtp.messages[0]['Subject'], 'Hi')
+
+    def test_gives_up_after_max_attempts(self):
+        queue_email('Hi', 'Body', ['ada@example.com'])
+        OutgoingEmail.objects.update(attempts=MAX_ATTEMPTS - 1)
+        self.smtp.reject_data = 1
+        with self.assertLogs('portfolio.outbox', 'WARNING'):
+            self.assertEqual(send_due_emails(), {'sent': 0, 'retrying': 0, 'failed': 1})
+        self.assertEqual(OutgoingEmail.objects.get().status, 'failed')
+
+    def test_unreachable_server_claims_nothing(self):
+        email = queue_email('Hi', 'Body', ['ada@example.com'])
+        with override_settings(EMAIL_PORT=self.unused_port()), self.assertLogs('portfolio.outbox', 'WARNING'):
+            self.assertEqual(send_due_emails(), {'sent': 0, 'retrying': 0, 'failed': 0})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 0))
+
+    def unused_port(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            return probe.getsockname()[1]
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.project = Project.objects.create(title='Portfolio', end_date=datetime.date(2024, 1, 1))
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        url = reverse('project_detail', args=[self.project.slug])
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Portfolio')
+        self.assertEqual(self.client.get(url, {'page': 2})['X-Page-Cache'], 'miss') # Keyed by query string too
+
+        user = get_user_model().objects.create_user('reader', password='secret')
+        self.client.force_login(user)
+        self.assertFalse(self.client.get(url).has_header('X-Page-Cache'))
+
+    def test_signals_purge_only_dependent_pages(self):
+        detail, home = reverse('project_detail', args=[self.project.slug]), reverse('home')
+        self.client.get(detail)
+        self.client.get(home)
+
+        Blog.objects.create(title='Unrelated', content='<p>Text</p>', status='published')
+        self.assertEqual(self.client.get(detail)['X-Page-Cache'], 'hit')
+        self.assertEqual(self.client.get(home)['X-Page-Cache'], 'miss') # Home lists the latest posts
+
+        self.project.title = 'Renamed'
+        self.project.save()
+        response = self.client.get(detail)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Renamed')
+
+    def test_detail_pages_are_purged_per_object(self):
+        words = '<p>Caching pages with tags in Django.</p>'
+        edited = Blog.objects.create(title='Gardening', content='<p>Tomatoes and basil.</p>', status='published')
+        kept = Blog.objects.create(title='Tagged caching', content=words, status='published')
+        for number in range(3): # kept's related posts, so edited is not linked from it
+            Blog.objects.create(title=f'Caching {number}', content=words, status='published')
+        pages = {post: reverse('blog_detail', args=[post.slug]) for post in (edited, kept)}
+        listing = reverse('blog_list')
+        for url in (*pages.values(), listing):
+            self.client.get(url)
+
+        edited.title = 'Gardening notes'
+        edited.save()
+        self.assertEqual(self.client.get(pages[kept])['X-Page-Cache'], 'hit')
+        self.assertContains(self.client.get(pages[edited]), 'Gardening notes')
+        self.assertEqual(self.client.get(listing)['X-Page-Cache'], 'miss') # Listings depend on every post
+
+        Comment.objects.create(blog_post=edited, name='Reader', content='Nice post')
+        self.assertEqual(self.client.get(pages[edited])['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(pages[kept])['X-Page-Cache'], 'hit')
+        self.assertEqual(self.client.get(listing)['X-Page-Cache'], 'hit')
+
+        edited.status = 'draft' # Changes every post's related list and the author's article count
+        edited.save()
+        self.assertEqual(self.client.get(pages[kept])['X-Page-Cache'], 'miss')
+
+    def test_csrf_token_is_per_visitor(self):
+        home = reverse('home')
+        self.client.get(home)
+        visitor = Client(enforce_csrf_checks=True)
+        response = visitor.get(home)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        self.assertNotIn(CSRF_PLACEHOLDER, response.content.decode())
+
+        posted = visitor.post(reverse('submit_contact_form'), {
+            'csrfmiddlewaretoken': token, 'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hi',
+        })
+        self.assertEqual(posted.status_code, 200)
+
+
+class BlogPageStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.post = Blog.objects.create(title='Shared', content='<p>Same for all.</p>', status='published')
+        self.detail = reverse('blog_detail', args=[self.post.slug])
+        self.state = reverse('blog_page_state', args=[self.post.slug])
+
+    def test_detail_page_has_no_visitor_state(self):
+        self.client.get(self.detail)
+        response = Client().get(self.detail)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotIn('csrfmiddlewaretoken', response.content.decode())
+        self.assertFalse(response.cookies) # Nothing per-visitor, so a CDN can share it too
+
+        user = get_user_model().objects.create_user('reader', first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.client.force_login(user)
+        self.assertNotContains(self.client.get(self.detail), 'Ada Lovelace')
+
+    def test_state_for_anonymous_visitor(self):
+        visitor = Client(enforce_csrf_checks=True)
+        state = visitor.get(self.state).json()
+        self.assertEqual((state['liked'], state['likes_count'], state['is_authenticated']), (False, 0, False))
+        self.assertEqual(state['comment_defaults'], {'name': '', 'email': '', 'readonly': False})
+
+        liked = visitor.post(reverse('like_blog_post', args=[self.post.slug]), HTTP_X_CSRFTOKEN=state['csrf_token'])
+        self.assertEqual(liked.status_code, 200)
+        response = visitor.get(self.state)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual((response.json()['liked'], response.json()['likes_count']), (True, 1))
+
+    def test_state_for_signed_in_user(self):
+        user = get_user_model().objects.create_user('reader', first_name='Ada', last_name='Lovelace', email='ada@example.com')
+        self.client.force_login(user)
+        state = self.client.get(self.state).json()
+        self.assertTrue(state['is_authenticated'])
+        self.assertEqual(state['comment_defaults'], {'name': 'Ada Lovelace', 'email': 'ada@example.com', 'readonly': True})
+
+    def test_unknown_post(self):
+        self.assertEqual(self.client.get(reverse('blog_page_state', args=['missing'])).status_code, 404)
+
+
+class PrerenderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(PRERENDER_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        self.project = Project.objects.create(title='Portfolio', end_date=datetime.date(2024, 1, 1))
+        self.post = Blog.objects.create(title='Static', content='<p>On disk.</p>', status='published')
+        self.post.tags.add('django')
+
+    def page(self, path):
+        return (self.root / path).read_text()
+
+    def test_renders_every_public_page(self):
+        for number in range(10):
+            Blog.objects.create(title=f'Filler {number}', content='<p>More.</p>', status='published')
+        call_command('prerender', stdout=StringIO())
+
+        for path in ('index.html', 'projects/index.html', 'blog/index.html', 'blog/page/2/index.html', 'tags/django/index.html'):
+            self.assertTrue((self.root / path).exists(), path)
+        self.assertIn('Portfolio', self.page(f'projects/{self.project.slug}/index.html'))
+        self.assertIn('On disk.', self.page(f'blog/{self.post.slug}/index.html'))
+        self.assertEqual(json.loads(self.page('api/projects/index.json'))['results'][0]['title'], 'Portfolio')
+        self.assertIn('name="csrfmiddlewaretoken" value=""', self.page('index.html')) # Fetched from /csrf/ instead
+
+    def test_changes_rerender_only_affected_pages(self):
+        render_site()
+        blog_page = f'blog/{self.post.slug}/index.html'
+        (self.root / blog_page).write_text('untouched')
+
+        self.project.title = 'Renamed'
+        self.project.save()
+        self.assertNotIn('Renamed', self.page(f'projects/{self.project.slug}/index.html')) # Queued, not rendered in the request
+        render_pending()
+        self.assertIn('Renamed', self.page(f'projects/{self.project.slug}/index.html'))
+        self.assertEqual(self.page(blog_page), 'untouched')
+        self.assertFalse(PrerenderQueue.objects.exists())
+
+        new_post = Blog.objects.create(title='Fresh', content='<p>New.</p>', status='published')
+        render_pending()
+        self.assertIn('New.', self.page(f'blog/{new_post.slug}/index.html'))
+        self.assertIn('Fresh', self.page('blog/index.html'))
+
+        self.post.delete()
+        render_pending()
+        self.assertFalse((self.root / 'blog' / self.post.slug).exists())
+        self.assertFalse((self.root / 'tags' / 'django').exists())
+
+    def test_pending_renders_ignore_this_process_caches(self):
+        render_site()
+        project_url = reverse('project_detail', args=[self.project.slug])
+        self.assertEqual(self.client.get(project_url)['X-Page-Cache'], 'miss') # Now cached here
+        # Changed by another process: its purges never reach this process's LocMemCache
+        Project.objects.filter(pk=self.project.pk).update(title='Renamed elsewhere')
+        SocialLink.objects.bulk_create([SocialLink(platform='github', name='GitHub', url='https://github.com/elsewhere')])
+        PrerenderQueue.objects.create(tag=f'project:{self.project.pk}')
+
+        render_pending()
+        page = self.page(f'projects/{self.project.slug}/index.html')
+        self.assertIn('Renamed elsewhere', page)
+        self.assertIn('https://github.com/elsewhere', page) # Not the cached global context
+
+    def test_comments_queue_nothing(self):
+        render_site()
+        Comment.objects.create(blog_post=self.post, name='Reader', content='Nice post')
+        self.assertFalse(PrerenderQueue.objects.exists())
+
+    def test_pending_command(self):
+        out = StringIO()
+        call_command('prerender', '--pending', stdout=out)
+        self.assertIn('No queued changes.', out.getvalue())
+
+        render_site()
+        self.project.title = 'Renamed'
+        self.project.save()
+        call_command('prerender', '--pending', stdout=StringIO())
+        self.assertIn('Renamed', self.page(f'projects/{self.project.slug}/index.html'))
+
+    def test_nothing_is_queued_before_the_first_build(self):
+        Blog.objects.create(title='Fresh', content='<p>New.</p>', status='published')
+        self.assertFalse(PrerenderQueue.objects.exists())
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_blog_list_paths_and_links(self):
+        for number in range(10):
+            Blog.objects.create(title=f'Filler {number}', content='<p>More.</p>', status='published')
+        self.assertContains(self.client.get(reverse('blog_list')), f'href="{reverse("blog_page", args=[2])}"')
+        response = self.client.get(reverse('blog_page', args=[2]))
+        self.assertEqual(list(response.context['blog_posts']), [self.post])
+        self.assertContains(response, f'href="{reverse("blog_tag", args=["django"])}"')
+        self.assertEqual(list(self.client.get(reverse('blog_tag', args=['django'])).context['blog_posts']), [self.post])
+        self.assertEqual(list(self.client.get(reverse('blog_list'), {'tag': 'django'}).context['blog_posts']), [self.post])
+
+    def test_tag_routes_leave_post_urls_alone(self):
+        post = Blog.objects.create(title='Tag', content='<p>Slugged tag.</p>', status='published')
+        self.assertEqual(post.slug, 'tag')
+        self.assertContains(self.client.get(reverse('blog_detail', args=['tag'])), 'Slugged tag.')
+        self.assertEqual(self.client.get(reverse('blog_page_state', args=['tag'])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('blog_comments', args=['tag'])).status_code, 200)
+        self.assertEqual(self.client.post(reverse('like_blog_post', args=['tag'])).status_code, 200)
+
+
+class EvictingCache(LocMemCache):
+    """Evicts the key `evict_on_read` right after get_many() has read it."""
+    evict_on_read = None
+
+    def get_many(self, keys, version=None):
+        values = super().get_many(keys, version=version)
+        if self.evict_on_read in values:
+            self.delete(self.evict_on_read, version=version)
+        return values
+
+
+class LoopRecordingCache(LocMemCache):
+    """Records cache calls made on a running event loop (where a sync backend blocks it)."""
+    calls_on_loop = []
+
+    def _record(self, method):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.calls_on_loop.append(method)
+
+    def get(self, *args, **kwargs):
+        self._record('get')
+        return super().get(*args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        self._record('get_many')
+        return super().get_many(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._record('set')
+        return super().set(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        self._record('set_many')
+        return super().set_many(*args, **kwargs)
+
+
+class AsyncViewTests(TestCase):
+    """The ASGI URLconf serves async views that render the same pages as the sync ones."""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_global_context()
+        SiteSetting.objects.create(site_title="Test Portfolio")
+        skill = Skill.objects.create(name='Django', category='backend')
+        self.project = Project.objects.create(title='Portfolio', end_date=datetime.date(2024, 1, 1), featured=True)
+        self.project.technologies.add(skill)
+        Project.objects.create(title='Older', end_date=datetime.date(2023, 1, 1))
+        self.post = Blog.objects.create(title='Async', content='<p>Awaited.</p>', status='published')
+        self.post.tags.add('django')
+        Comment.objects.create(blog_post=self.post, name='Reader', content='Nice post')
+
+    def urls(self):
+        return [
+            reverse('projects'),
+            reverse('project_detail', args=[self.project.slug]),
+            reverse('projects_api') + '?fields=card',
+            reverse('blog_list'),
+            reverse('blog_tag', args=['django']),
+            reverse('blog_list') + '?q=awaited',
+            reverse('blog_detail', args=[self.post.slug]),
+        ]
+
+    async def test_async_views_match_sync_views(self):
+        expected = {}
+        for url in self.urls():
+            expected[url] = (await self.async_client.get(url)).content
+        await sync_to_async(cache.clear)()
+
+        with override_settings(ROOT_URLCONF='myportfolio.asgi_urls'):
+            for url in self.urls():
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertTrue(iscoroutinefunction(response.resolver_match.func), url)
+                self.assertEqual(response.content, expected[url], url)
+
+    @override_settings(ROOT_URLCONF='myportfolio.asgi_urls')
+    async def test_home_page_cache_and_validators(self):
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Portfolio')
+        self.assertContains(response, 'Async')
+        self.assertEqual((await self.async_client.get(reverse('home')))['X-Page-Cache'], 'hit')
+
+        await sync_to_async(cache.clear)()
+        url = reverse('blog_detail', args=[self.post.slug])
+        etag = (await self.async_client.get(url))['ETag']
+        self.assertEqual((await self.async_client.get(url, headers={'If-None-Match': etag})).status_code, 304)
+        self.assertEqual((await self.async_client.get(reverse('blog_detail', args=['missing']))).status_code, 404)
+
+    @override_settings(
+        ROOT_URLCONF='myportfolio.asgi_urls',
+        CACHES={'default': {'BACKEND': 'portfolio.tests.LoopRecordingCache', 'LOCATION': 'loop-recording'}},
+    )
+    async def test_page_cache_stays_off_the_event_loop(self):
+        LoopRecordingCache.calls_on_loop.clear()
+        url = reverse('blog_detail', args=[self.post.slug])
+        self.assertEqual((await self.async_client.get(url))['X-Page-Cache'], 'miss')
+        self.assertEqual((await self.async_client.get(url))['X-Page-Cache'], 'hit')
+        self.assertEqual(LoopRecordingCache.calls_on_loop, [])
@@ -6,6 +6,7 @@ urlpatterns = [
     # Core Portfolio URLs
     path('', views.home, name='home'), # Renamed from index to home for clarity
     path('contact/submit/', views.submit_contact_form, name='submit_contact_form'), # For AJAX POST submission
+    path('csrf/', views.csrf_token, name='csrf_token'), # CSRF token for forms on pre-rendered pages (JSON)
     path('contact/email-success/', views.email_success, name='email_success'), # New URL for email success page
 
     # Projects URLs
@@ -15,7 +16,12 @@ urlpatterns = [
 
     # Blog URLs
     path('blog/', views.blog_list, name='blog_list'), # List all blog posts
+    path('blog/page/<int:page>/', views.blog_list, name='blog_page'), # Further pages of the list
     path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'), # Individual blog post detail
+    path('blog/<slug:slug>/state/', views.blog_page_state, name='blog_page_state'), # Per-visitor like status, comment defaults and CSRF token (JSON)
     path('blog/<slug:slug>/like/', views.like_blog_post, name='like_blog_post'), # Like/Unlike blog post
     path('blog/<slug:slug>/comment/', views.post_comment, name='post_comment'), # Post a comment (handled by post_comment view)
+    path('blog/<slug:slug>/comments/', views.blog_comments, name='blog_comments'), # Paged comments and replies (JSON with HTML fragment)
+    path('tags/<slug:tag_slug>/', views.blog_list, name='blog_tag'), # Posts with one tag; outside blog/ so no post slug can collide
+    path('tags/<slug:tag_slug>/page/<int:page>/', views.blog_list, name='blog_tag_page'),
 ]
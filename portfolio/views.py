@@ -1,9 +1,10 @@
 # portfolio/views.py
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Q, Sum # For complex queries
-from django.http import JsonResponse
+from django.db.models import Q # For complex queries
+from django.http import JsonResponse, Http404, QueryDict
 from django.views.decorators.http import require_POST, require_GET
-from django.core.mail import send_mail, EmailMultiAlternatives # For contact form email sending
+from django.views.decorators.cache import never_cache
+from django.middleware.csrf import get_token
 from django.conf import settings # To access EMAIL_HOST_USER, etc.
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.decorators import login_required # For like functionality
@@ -12,6 +13,7 @@ from django.utils import timezone # For date handling
 from taggit.models import Tag # Import Tag model for blog post tagging
 from django.db.models import Q # For complex queries in blog filtering
 from django.db import models # Import models for type hinting and validation
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.urls import reverse
 
@@ -22,6 +24,14 @@ from .models import (
 )
 # Import your forms
 from .forms import ContactForm, CommentForm 
+from .caching import get_cached_global_context, get_author_stats
+from .serializers import ProjectSerializer, filter_projects
+from .conditional import projects_condition, blog_list_condition, blog_detail_condition
+from .search import search_blog_ids, filter_blogs_fallback
+from .counters import record_blog_view, adjust_blog_likes
+from .outbox import queue_email
+from .page_cache import add_page_tags, cache_page_tagged
+from .comments import COMMENTS_PAGE_SIZE, COMMENTS_MAX_PAGE_SIZE, get_comment_page, decode_cursor
 
 User = get_user_model() # Get the currently active user model
 
@@ -31,32 +41,35 @@ def get_global_context():
     """
     Helper function to fetch site-wide settings and social links,
     typically needed on most pages.
+    Served from a process-local + shared cache (see caching.py); the cache is
+    invalidated by SiteSetting/SocialLink save/delete signals.
     """
-    site_settings = SiteSetting.objects.first() 
-    if not site_settings:
-        # Create a default SiteSetting if none exists, to prevent errors on first run
-        site_settings = SiteSetting.objects.create(
-            site_title="My Portfolio", 
-            tagline="A Passionate Developer",
-            about_me="A dedicated full-stack developer."
-        )
-    
-    social_links = SocialLink.objects.filter(active=True).order_by('order')
-    
-    return {
-        'site_settings': site_settings,
-        'social_links': social_links,
-    }
+    return get_cached_global_context()
 
 
 # --- Portfolio Core Views ---
 
 @require_GET # Redundant decorator removed, only one is needed
+@cache_page_tagged(
+    'site', 'skill:*', 'project:*', 'experience:*', 'education:*', 'certification:*', 'award:*',
+    'service:*', 'testimonial:*', 'contactinfo:*', 'blog:*',
+)
 def home(request):
     """Homepage view."""
     context = get_global_context() # Use the standardized helper
     
+    context.update(home_sections())
     context.update({
+        'contact_info': ContactInfo.objects.first(), # Could be None if not created
+        'contact_form': ContactForm(), # For the contact form often on the homepage
+    })
+    
+    return render(request, 'portfolio/index.html', context)
+
+
+def home_sections():
+    """The (lazy) querysets of the homepage sections; shared with async_views.home."""
+    return {
         'skills': Skill.objects.filter(featured=True).order_by('order'), # Only featured skills for home
         'projects': Project.objects.filter(featured=True, status='completed').order_by('-end_date')[:3], # Featured & completed
         'experiences': Experience.objects.all().order_by('-start_date'),
@@ -65,15 +78,12 @@ def home(request):
         'awards': Award.objects.filter(featured=True).order_by('-date_received'), # Only featured awards for home
         'services': Service.objects.filter(featured=True).order_by('order'), # Only featured services for home
         'testimonials': Testimonial.objects.filter(featured=True).order_by('-date_given')[:3], # Featured testimonials
-        'contact_info': ContactInfo.objects.first(), # Could be None if not created
-        'latest_blog_posts': Blog.objects.filter(status='published').order_by('-published_at')[:3],
-        'contact_form': ContactForm(), # For the contact form often on the homepage
-    })
-    
-    return render(request, 'portfolio/index.html', context)
+        'latest_blog_posts': Blog.objects.filter(status='published').defer('content').order_by('-published_at')[:3],
+    }
 
 
 @require_GET
+@cache_page_tagged('site', 'experience:*', 'education:*', 'skill:*', 'certification:*', 'award:*')
 def about(request):
     """About page view."""
     context = get_global_context()
@@ -96,14 +106,6 @@ def submit_contact_form(request):
         subject = form.cleaned_data['subject'] or 'Portfolio Contact Form Submission'
         message_content = form.cleaned_data['message']
 
-        # Save the message to the database
-        Message.objects.create(
-            name=name,
-            email=email,
-            subject=subject,
-            message=message_content
-        )
-
         # Prepare context for the email
         form_data = {
             'name': name,
@@ -118,30 +120,32 @@ def submit_contact_form(request):
             {'form_data': form_data}
         )
 
-        try:
-            # Send email to site owner (plain text)
-            send_mail(
+        # Save the message and queue both emails together; the send_outbox worker delivers them (see outbox.py)
+        with transaction.atomic():
+            contact_message = Message.objects.create(
+                name=name,
+                email=email,
+                subject=subject,
+                message=message_content
+            )
+            # Email to site owner (plain text)
+            queue_email(
                 subject,
                 f"Name: {name}\nEmail: {email}\n\nMessage:\n{message_content}",
-                settings.DEFAULT_FROM_EMAIL,
                 [settings.CONTACT_EMAIL],
-                fail_silently=False,
+                message=contact_message,
             )
-            # Send confirmation email to user (HTML)
-            email_message = EmailMultiAlternatives(
+            # Confirmation email to user (HTML)
+            queue_email(
                 "Thank you for contacting Hezekiah",
                 "Thank you for contacting me! Here is a copy of your message.",  # fallback plain text
-                settings.DEFAULT_FROM_EMAIL,
                 [email],
+                html_body=email_html_content,
+                message=contact_message,
             )
-            email_message.attach_alternative(email_html_content, "text/html")
-            email_message.send()
-
-            # Return JSON success (no redirect)
-            return JsonResponse({'success': True, 'message': 'Your message was sent successfully!'})
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            return JsonResponse({'success': False, 'message': 'Failed to send message. Please try again later.'}, status=500)
+
+        # Return JSON success (no redirect)
+        return JsonResponse({'success': True, 'message': 'Your message was sent successfully!'})
     else:
         return JsonResponse({'success': False, 'errors': form.errors}, status=400)
 
@@ -156,6 +160,8 @@ def email_success(request):
 # --- Projects Views ---
 
 @require_GET
+@cache_page_tagged('site', 'project:*')
+@projects_condition
 def projects_list(request): # Kept original name projects_list as in your urls/template
     """View to display a list of all projects."""
     context = get_global_context()
@@ -175,6 +181,8 @@ def projects_list(request): # Kept original name projects_list as in your urls/t
 
 
 @require_GET
+@cache_page_tagged('site', 'project:order', 'skill:*') # Plus the projects shown, added below
+@projects_condition
 def project_detail(request, slug):
     """
     View to display a single project's details.
@@ -182,51 +190,15 @@ def project_detail(request, slug):
     project = get_object_or_404(Project, slug=slug, status='completed') # Ensure project is completed
     context = get_global_context()
 
-    # Fetch previous and next projects based on completion_date (end_date in model)
-    # Using 'id' as a secondary sort to ensure consistent ordering for prev/next
-    all_projects = Project.objects.filter(status='completed').order_by('end_date', 'id')
-    project_list = list(all_projects)
-    
-    current_project_index = -1
-    for i, p in enumerate(project_list):
-        if p.id == project.id:
-            current_project_index = i
-            break
-
-    previous_project = None
-    next_project = None
-
-    if current_project_index != -1:
-        if current_project_index > 0:
-            previous_project = project_list[current_project_index - 1]
-        if current_project_index < len(project_list) - 1:
-            next_project = project_list[current_project_index + 1]
-
-    # Optional: If no prev/next, wrap around to loop through projects (e.g., from last to first, or first to last)
-    # This creates an infinite loop of navigation. Adjust as per desired UX.
-    if len(project_list) > 1: # Only wrap around if there's more than one project
-        if not previous_project:
-            previous_project = project_list[-1]
-        if not next_project:
-            next_project = project_list[0]
-
-    # Fetch related projects (example: by common technologies, excluding current project)
-    project_tech_ids = project.technologies.values_list('id', flat=True)
-    related_projects = Project.objects.filter(
-        technologies__id__in=project_tech_ids, status='completed'
-    ).exclude(
-        pk=project.pk 
-    ).distinct().order_by('-end_date')[:3] 
-
-    # If not enough related projects, fill with other recent completed projects
-    if related_projects.count() < 3:
-        remaining_count = 3 - related_projects.count()
-        if remaining_count > 0:
-            other_recent_projects = Project.objects.filter(status='completed').exclude(
-                Q(pk=project.pk) | Q(id__in=[p.id for p in related_projects])
-            ).order_by('-end_date')[:remaining_count]
-            related_projects = list(related_projects) + list(other_recent_projects)
+    # Previous and next projects by completion date (end_date, then id), wrapping around.
+    # Two indexed keyset queries instead of loading every project.
+    previous_project, next_project = project.get_adjacent_projects()
 
+    # Related projects ranked by technology overlap, read from the precomputed index
+    related_projects = project.get_related_projects()
+
+    # The cached page goes stale only when this project or one it links to changes
+    add_page_tags(request, *project_page_tags(project, previous_project, next_project, *related_projects))
 
     context.update({
         'project': project,
@@ -236,190 +208,228 @@ def project_detail(request, slug):
     })
     return render(request, 'portfolio/project_detail.html', context)
 
+def project_page_tags(*projects):
+    return {f'project:{project.pk}' for project in projects if project is not None}
+
+PROJECTS_API_PAGE_SIZE = 12
+PROJECTS_API_MAX_PAGE_SIZE = 50
+
+
 @require_GET
+@projects_condition
 def projects_api(request):
     """
     API endpoint to return project data in JSON format for client-side use (e.g., projects.js).
-    Supports basic client-side filtering and searching by returning all data
-    and letting JavaScript handle the filtering.
+    Query parameters:
+      category  - frontend | backend | fullstack | other
+      tech      - technology (Skill) name, case-insensitive
+      q         - text search over title, descriptions and technology names
+      slug      - a single project (used by the details modal)
+      page      - 1-based page number; page_size (max 50) controls its length
+      fields    - comma-separated field list ("card" selects the grid card fields)
+    Returns {'count', 'num_pages', 'page', 'next', 'previous', 'results'}.
     """
-    projects_queryset = Project.objects.filter(status='completed').order_by('-end_date')
-
-    projects_data = []
-    for project in projects_queryset:
-        # Access gallery images via the correct related_name
-        gallery_images_urls = [img.image.url for img in project.gallery_images.all().order_by('order')]
-
-        technology_names = [tech.name for tech in project.technologies.all()]
-
-        # Use featured_image, fall back to first gallery image if available
-        main_project_image_url = project.featured_image.url if project.featured_image else (gallery_images_urls[0] if gallery_images_urls else None)
-
-        project_dict = {
-            'id': project.id,
-            'title': project.title,
-            'slug': project.slug, # Include slug for direct linking
-            'short_description': project.short_description, # Use short_description
-            'description': project.description, # This is the property mapping to overview_content
-            'full_description': project.overview_content, # This field is still in your model, include it
-            'category': project.get_main_category,
-            'completion_date': project.end_date.strftime('%B %Y') if project.end_date else (project.start_date.strftime('%B %Y') if project.start_date else None),
-            'technologies': technology_names,
-            'featured_image_url': main_project_image_url, # Renamed for clarity
-            'gallery_images_urls': gallery_images_urls, # Renamed for clarity
-            'live_url': project.live_demo_link, # Renamed to match template/model
-            'github_url': project.github_link, # Renamed to match template/model
-            'documentation_url': project.documentation_url,
-            'key_features': project.key_features.strip().splitlines() if project.key_features else [], # Changed from 'features'
-            'challenges_and_solutions': project.challenges_and_solutions or '', # Changed from 'challenges'
-            'project_type': project.project_type,
-            'client': project.client,
-            'version': project.version,
-            'seo_description': project.seo_description,
-            'seo_keywords': project.seo_keywords,
-            # Example for your API serialization:
-            'main_image_url': project.featured_image.url if project.featured_image else '/static/images/default_project_image.jpg',
-            # Optionally, provide an images array if you want a gallery:
-            'images': [project.featured_image.url] if project.featured_image else [],
-        }
-        projects_data.append(project_dict)
+    fields = ProjectSerializer.parse_fields(request.GET.get('fields'))
+    projects_queryset = filter_projects(
+        ProjectSerializer.get_queryset(fields),
+        category=request.GET.get('category', '').strip().lower() or None,
+        technology=request.GET.get('tech', '').strip() or None,
+        query=request.GET.get('q', '').strip() or None,
+        slug=request.GET.get('slug', '').strip() or None,
+    )
+
+    try:
+        page_size = min(max(int(request.GET.get('page_size', PROJECTS_API_PAGE_SIZE)), 1), PROJECTS_API_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = PROJECTS_API_PAGE_SIZE
+
+    paginator = Paginator(projects_queryset, page_size)
+    page = request.GET.get('page')
+    try:
+        projects_paged = paginator.page(page)
+    except PageNotAnInteger:
+        projects_paged = paginator.page(1)
+    except EmptyPage:
+        projects_paged = paginator.page(paginator.num_pages)
 
-    return JsonResponse(projects_data, safe=False)
+    def page_url(number):
+        params = request.GET.copy()
+        params['page'] = number
+        return f"{request.path}?{params.urlencode()}"
+
+    return JsonResponse({
+        'count': paginator.count,
+        'num_pages': paginator.num_pages,
+        'page': projects_paged.number,
+        'next': page_url(projects_paged.next_page_number()) if projects_paged.has_next() else None,
+        'previous': page_url(projects_paged.previous_page_number()) if projects_paged.has_previous() else None,
+        'results': ProjectSerializer(projects_paged.object_list, fields).data,
+    })
 
 
 # --- Blog Views ---
 
+BLOG_PAGE_SIZE = 10
+
+
+def blog_page_url(page, tag_slug=None, query=''):
+    """
+    Link to a page of the blog list. Plain paths (blog/page/2/, tags/django/)
+    so that every page can be pre-rendered; search results keep the query string.
+    """
+    if query:
+        params = QueryDict(mutable=True)
+        params['q'] = query
+        if tag_slug:
+            params['tag'] = tag_slug
+        params['page'] = page
+        return f"{reverse('blog_list')}?{params.urlencode()}"
+    if tag_slug:
+        return reverse('blog_tag', args=[tag_slug]) if page == 1 else reverse('blog_tag_page', args=[tag_slug, page])
+    return reverse('blog_list') if page == 1 else reverse('blog_page', args=[page])
+
+
+def blog_page_links(posts_paged, tag_slug=None, query=''):
+    """Pagination links of a blog list page, for the template."""
+    links = {'page_links': [(number, blog_page_url(number, tag_slug, query)) for number in posts_paged.paginator.page_range]}
+    if posts_paged.has_previous():
+        links['previous_page_url'] = blog_page_url(posts_paged.previous_page_number(), tag_slug, query)
+    if posts_paged.has_next():
+        links['next_page_url'] = blog_page_url(posts_paged.next_page_number(), tag_slug, query)
+    return links
+
+
 @require_GET
-def blog_list(request): # Standardized name to blog_list
-    """View to display a list of all published blog posts."""
+@cache_page_tagged('site', 'blog:*', 'tag:*')
+@blog_list_condition
+def blog_list(request, tag_slug=None, page=None): # Standardized name to blog_list
+    """View to display a list of all published blog posts (optionally of one tag)."""
     context = get_global_context()
-    blog_posts_list = Blog.objects.filter(status='published').order_by('-published_at')
+    blog_posts_list = Blog.objects.filter(status='published').defer('content').order_by('-published_at') # Cards never show the body
 
-    # Apply tag filter if 'tag' parameter is present
-    tag_slug = request.GET.get('tag')
+    # Apply tag filter from the path (tags/<slug>/) or the older ?tag= parameter
+    tag_slug = tag_slug or request.GET.get('tag')
     if tag_slug:
         tag = get_object_or_404(Tag, slug=tag_slug)
         blog_posts_list = blog_posts_list.filter(tags=tag)
         context['current_tag'] = tag
 
-    # Apply search query filter if 'q' parameter is present
-    query = request.GET.get('q')
+    # Apply search query filter if 'q' parameter is present.
+    # FTS5 (BM25-ranked, with snippets) on SQLite, icontains fallback elsewhere.
+    query = request.GET.get('q', '').strip()
+    ranked_results = None
     if query:
-        blog_posts_list = blog_posts_list.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(excerpt__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
+        ranked_results = search_blog_ids(blog_posts_list, query)
+        if ranked_results is None:
+            blog_posts_list = filter_blogs_fallback(blog_posts_list, query)
         context['search_query'] = query
 
-    paginator = Paginator(blog_posts_list, 10)
-    page = request.GET.get('page')
+    # Ranked search results are paged in SQL: only the current page's posts and snippets are loaded
+    paginator = Paginator(ranked_results if ranked_results is not None else blog_posts_list, BLOG_PAGE_SIZE)
+    page = page or request.GET.get('page')
     try:
         posts_paged = paginator.page(page)
     except PageNotAnInteger:
         posts_paged = paginator.page(1)
     except EmptyPage:
         posts_paged = paginator.page(paginator.num_pages)
+
+    if ranked_results is not None:
+        posts_by_id = Blog.objects.defer('content').in_bulk([blog_id for blog_id, snippet in posts_paged.object_list])
+        page_posts = []
+        for blog_id, snippet in posts_paged.object_list:
+            post = posts_by_id[blog_id]
+            post.search_snippet = snippet
+            page_posts.append(post)
+        posts_paged.object_list = page_posts
     
     context['blog_posts'] = posts_paged # Changed to 'blog_posts' for consistency
+    context.update(blog_page_links(posts_paged, tag_slug, query))
     context['all_tags'] = Tag.objects.all().order_by('name') # Pass all tags for tag cloud/filter
     return render(request, 'portfolio/blog.html', context)
 
 
 @require_GET
+@cache_page_tagged('site', 'blog:order', 'tag:*', 'experience:*') # Plus the posts shown, added below
+@blog_detail_condition
 def blog_detail(request, slug):
     """
     View for a specific blog post's details with comments and likes.
-    This view also handles comment form submission for GET requests (initial display).
+    The page is the same for every visitor: the like status, the comment form
+    defaults and the CSRF token are loaded by blog_detail.js from blog_page_state.
     """
     blog_post = get_object_or_404(Blog, slug=slug, status='published')
     context = get_global_context()
 
-    # Increment post views (only on GET requests to avoid incrementing on form submissions)
-    blog_post.views += 1
-    blog_post.save()
-
-    # Comments for this blog post (top-level and active)
-    # Using 'replies' as related_name in Comment model, so prefetch that.
-    comments = Comment.objects.filter(
-        blog_post=blog_post, active=True, parent__isnull=True
-    ).prefetch_related('replies').order_by('created_at')
-
-    # Pass request.user to the CommentForm instance for initial data and readonly fields
-    comment_form = CommentForm(initial={'blog_post': blog_post.id}, user=request.user)
-
-    # --- DEBUGGING RELATED BLOGS ---
-    print(f"\n--- Debugging related_blogs for post: '{blog_post.title}' (ID: {blog_post.pk}) ---")
-    print(f"Current post's status: '{blog_post.status}'")
-
-    # Get tags for the current blog post
-    blog_tags_ids = blog_post.tags.values_list('id', flat=True)
-    print(f"Current blog post tags IDs: {list(blog_tags_ids)}") # Convert to list for printing
-
-    # First attempt: Related by tags
-    related_blogs_by_tags = Blog.objects.filter(
-        status='published'
-    ).filter(
-        tags__id__in=blog_tags_ids # This needs tags_ids to have values
-    ).exclude(
-        pk=blog_post.pk
-    ).distinct().order_by('-published_at')[:3]
-
-    print(f"Related blogs by tags count (initial query): {related_blogs_by_tags.count()}")
-    for b in related_blogs_by_tags:
-        print(f"  - Found by Tag: '{b.title}' (ID: {b.pk})")
-
-    related_blogs = list(related_blogs_by_tags) # Start with posts found by tags
-
-    # If not enough related blogs, fill with other recent published blogs
-    if len(related_blogs) < 3: # Use len() here as related_blogs is now a list
-        remaining_count = 3 - len(related_blogs)
-        if remaining_count > 0:
-            existing_ids = [b.id for b in related_blogs] + [blog_post.id] # IDs already found + current post ID
-            print(f"Need {remaining_count} more posts. Existing IDs to exclude from 'other_recent_blogs': {existing_ids}")
-
-            other_recent_blogs = Blog.objects.filter(
-                status='published'
-            ).exclude(
-                id__in=existing_ids # Exclude current post and already found related posts
-            ).order_by('-published_at')[:remaining_count]
-
-            print(f"Other recent blogs count (fallback query): {other_recent_blogs.count()}")
-            for b in other_recent_blogs:
-                print(f"  - Found as Other Recent: '{b.title}' (ID: {b.pk})")
-
-            related_blogs.extend(list(other_recent_blogs)) # Use extend to add to the list
-
-    print(f"Final related_blogs count passed to template: {len(related_blogs)}")
-    print(f"--- End debugging ---\n")
-    # --- END DEBUGGING RELATED BLOGS ---
-
-    # Calculate total articles and total views for author bio (can be optimized with aggregation)
-    total_articles = Blog.objects.filter(status='published').count()
-    total_blog_views = Blog.objects.filter(status='published').aggregate(total_views=Sum('views'))['total_views'] or 0
-
-    # Calculate years of experience (example - adjust logic based on your needs)
-    # Assuming start_year in SiteSetting or calculated from first Experience
-    years_experience = 0
-    first_experience = Experience.objects.order_by('start_date').first()
-    if first_experience:
-        years_experience = timezone.now().year - first_experience.start_date.year
+    # First page of the discussion; later pages and longer threads load from blog_comments
+    comments, comments_next = get_comment_page(blog_post)
 
+    # Anonymous form; blog_detail.js fills in and locks name/email for signed-in users
+    comment_form = CommentForm(initial={'blog_post': blog_post.id})
+
+    # Related posts (tag overlap + TF-IDF text similarity), read from the precomputed index
+    related_blogs = blog_post.get_related_blogs()
+
+    # Author bio numbers, materialized in the cache (see caching.get_author_stats)
+    author_stats = get_author_stats()
+
+    # The cached page goes stale only when this post (or its comments) or a related post changes
+    add_page_tags(request, *blog_page_tags(blog_post, *related_blogs))
 
     context.update({
         'blog_post': blog_post, # Use 'blog_post' variable name consistently
         'comments': comments,
+        'comments_next_url': comment_page_url(blog_post, cursor=comments_next),
         'comment_form': comment_form,
         'related_blogs': related_blogs,
-        'has_user_liked': blog_post.liked_by.filter(id=request.user.id).exists() if request.user.is_authenticated else False, # Re-check like status
-        'blog_post_count': total_articles, # For author bio
-        'total_blog_views': total_blog_views, # For author bio
-        'years_experience': years_experience, # For author bio
+        'blog_post_count': author_stats['total_articles'], # For author bio
+        'total_blog_views': author_stats['total_blog_views'], # For author bio
+        'years_experience': author_stats['years_experience'], # For author bio
     })
     return render(request, 'portfolio/blog_detail.html', context)
 
 
+def blog_page_tags(*posts):
+    return {f'blog:{post.pk}' for post in posts}
+
+
+@require_GET
+@never_cache
+def blog_page_state(request, slug):
+    """
+    Per-visitor part of the blog detail page, as JSON: like status, comment form
+    defaults and a CSRF token (also set as the csrftoken cookie). Also counts
+    the view, since the page itself may be served from a cache.
+    """
+    blog = Blog.objects.filter(slug=slug, status='published').values('pk', 'likes_count').first()
+    if blog is None:
+        raise Http404("No Blog matches the given query.")
+
+    # Count the view in the cache; flush_blog_views writes the totals in batches,
+    # so reading a post never takes the database write lock (see counters.py).
+    record_blog_view(blog['pk'])
+
+    user = request.user
+    if user.is_authenticated:
+        comment_defaults = {'name': user.get_full_name() or user.username, 'email': user.email, 'readonly': True}
+    else:
+        comment_defaults = {'name': '', 'email': '', 'readonly': False}
+    return JsonResponse({
+        'liked': blog['pk'] in request.session.get('liked_posts', []), # Same session list like_blog_post toggles
+        'likes_count': blog['likes_count'],
+        'is_authenticated': user.is_authenticated,
+        'comment_defaults': comment_defaults,
+        'csrf_token': get_token(request),
+    })
+
+
+@require_GET
+@never_cache
+def csrf_token(request):
+    """A CSRF token as JSON (also set as the csrftoken cookie), for forms on pre-rendered pages."""
+    return JsonResponse({'csrf_token': get_token(request)})
+
+
 @require_POST
 def post_comment(request, slug): # This view processes the comment form submission
     """
@@ -471,7 +481,45 @@ def post_comment(request, slug): # This view processes the comment form submissi
         return JsonResponse({'success': False, 'errors': form.errors}, status=400)
 
 
-from django.db import transaction # Import transaction for atomicity
+def comment_page_url(blog_post, parent_id=None, cursor=None):
+    """URL of the blog_comments page continuing after `cursor` (None when there is nothing more)."""
+    if cursor is None:
+        return None
+    params = QueryDict(mutable=True)
+    if parent_id is not None:
+        params['parent'] = parent_id
+    params['after'] = cursor
+    return f"{reverse('blog_comments', args=[blog_post.slug])}?{params.urlencode()}"
+
+
+@require_GET
+def blog_comments(request, slug):
+    """
+    Paged comments for a blog post, used by "load more comments/replies".
+    Query parameters:
+      parent - comment id whose replies to list (top-level comments when absent)
+      after  - cursor returned by the previous page
+      limit  - page length (max 50)
+    Returns {'html': rendered comments, 'count': comments in this page, 'next': URL of the next page or None}.
+    """
+    blog_post = get_object_or_404(Blog.objects.only('pk', 'slug'), slug=slug, status='published')
+    try:
+        parent_id = int(request.GET['parent']) if request.GET.get('parent') else None
+        after = decode_cursor(request.GET['after']) if request.GET.get('after') else None
+        limit = min(max(int(request.GET.get('limit', COMMENTS_PAGE_SIZE)), 1), COMMENTS_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'success': False, 'errors': {'cursor': ['Invalid page parameters.']}}, status=400)
+
+    comments, cursor = get_comment_page(blog_post, parent_id=parent_id, after=after, limit=limit)
+    next_url = comment_page_url(blog_post, parent_id, cursor)
+    html = render_to_string('portfolio/comment_page.html', {
+        'comments': comments,
+        'comments_next_url': next_url,
+        'blog_post': blog_post,
+    }, request=request)
+    return JsonResponse({'html': html, 'count': len(comments), 'next': next_url})
+
+
 from django.views.decorators.csrf import csrf_protect # Import CSRF protection decorator
 # --- Blog Post Liking ---
 @require_POST
@@ -480,39 +528,37 @@ def like_blog_post(request, slug):
     """
     Handles liking/unliking a blog post.
     Allows anonymous users to like.
+    The count is changed with a single conditional F() update (see counters.py),
+    so concurrent likes are never lost and the Blog row is not re-saved.
     """
-    blog_post = get_object_or_404(Blog, slug=slug) # Ensure 'Blog' is your actual model name
+    blog_id = Blog.objects.filter(slug=slug).values_list('pk', flat=True).first()
+    if blog_id is None:
+        raise Http404("No Blog matches the given query.")
 
     # Check if the user (even anonymous) has 'liked' in their session
     # We'll store blog_post.id in the session list
     liked_posts_in_session = request.session.get('liked_posts', [])
-    
-    message = ''
-    liked = False # Renamed from has_liked for consistency with JS expectation
-
-    with transaction.atomic(): # Ensure likes_count is updated safely
-        if blog_post.id in liked_posts_in_session:
-            # User (session) has already liked, so unlike
-            blog_post.likes_count = max(0, blog_post.likes_count - 1) # Ensure not negative
-            liked_posts_in_session.remove(blog_post.id)
-            message = 'Post unliked.'
-            liked = False # Set to false as it's now unliked
-        else:
-            # User (session) has not liked, so like
-            blog_post.likes_count += 1
-            liked_posts_in_session.append(blog_post.id)
-            message = 'Post liked successfully!'
-            liked = True # Set to true as it's now liked
-
-        blog_post.save()
-        
-        # Update the session with the modified list
-        request.session['liked_posts'] = liked_posts_in_session
-        request.session.modified = True # <--- ADD THIS LINE! Ensures session is saved.
+
+    if blog_id in liked_posts_in_session:
+        # User (session) has already liked, so unlike
+        likes_count = adjust_blog_likes(blog_id, -1)
+        liked_posts_in_session.remove(blog_id)
+        message = 'Post unliked.'
+        liked = False # Set to false as it's now unliked
+    else:
+        # User (session) has not liked, so like
+        likes_count = adjust_blog_likes(blog_id, 1)
+        liked_posts_in_session.append(blog_id)
+        message = 'Post liked successfully!'
+        liked = True # Set to true as it's now liked
+
+    # Update the session with the modified list
+    request.session['liked_posts'] = liked_posts_in_session
+    request.session.modified = True # <--- ADD THIS LINE! Ensures session is saved.
 
     return JsonResponse({
         'success': True,
-        'likes_count': blog_post.likes_count,
+        'likes_count': likes_count,
         'liked': liked, # <--- Renamed key to 'liked' to match frontend expectation
         'message': message
     })
\ No newline at end of file
@@ -3,9 +3,10 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('DOM Content Loaded: Initializing blog_detail.js');
 
     // --- Global Variables from Django Context (set in blog_detail.html) ---
-    const USER_IS_AUTHENTICATED = window.USER_IS_AUTHENTICATED === 'true';
-    const USER_FULL_NAME = window.USER_FULL_NAME || '';
-    const USER_EMAIL = window.USER_EMAIL || '';
+    // The page is shared by all visitors; the user values are filled in by loadPageState()
+    let USER_IS_AUTHENTICATED = window.USER_IS_AUTHENTICATED === 'true';
+    let USER_FULL_NAME = window.USER_FULL_NAME || '';
+    let USER_EMAIL = window.USER_EMAIL || '';
     const postSlug = window.POST_SLUG || null;
     const blogPostId = window.POST_ID || null;
 
@@ -362,6 +363,37 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log('Reply form hidden.');
     }
 
+    // --- Load more comments / replies (cursor-paged, see blog_comments view) ---
+    // Each button is replaced by the page it fetches, which carries its own button if there is more.
+    if (commentsList) {
+        commentsList.addEventListener('click', async function(e) {
+            const button = e.target.closest('.load-more-comments');
+            if (!button || button.disabled) return;
+
+            button.disabled = true;
+            const originalButtonText = button.innerHTML;
+            button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Loading...';
+
+            try {
+                const response = await fetch(button.dataset.url, {
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                });
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const data = await response.json();
+                button.insertAdjacentHTML('beforebegin', data.html);
+                button.remove();
+                setupCommentReplies();
+            } catch (error) {
+                console.error('Error loading comments:', error);
+                showToast('Could not load more comments. Please try again.', 'error');
+                button.disabled = false;
+                button.innerHTML = originalButtonText;
+            }
+        });
+    }
+
     // --- Table of Contents Generation ---
     function generateTOC() {
         const postContent = document.querySelector('.post-content');
@@ -841,8 +873,64 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
 
+    // --- Per-visitor Page State ---
+    // Like status, comment form defaults and the CSRF token are not in the
+    // (cached) HTML; they come from blog_page_state, which also counts the view.
+    async function loadPageState() {
+        if (!window.blog_post_STATE_URL) {
+            console.warn('blog_post_STATE_URL is not defined in window. Skipping page state.');
+            return;
+        }
+        try {
+            const response = await fetch(window.blog_post_STATE_URL, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                credentials: 'same-origin'
+            });
+            if (!response.ok) {
+                console.error('HTTP Error loading page state:', response.status, response.statusText);
+                return;
+            }
+            const state = await response.json();
+            console.log('Page state loaded. Liked:', state.liked, 'Authenticated:', state.is_authenticated); // Never the token or contact details
+
+            window.CSRF_TOKEN = state.csrf_token;
+            document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(input => {
+                input.value = state.csrf_token;
+            });
+
+            if (likeButton) {
+                likeButton.classList.toggle('liked', state.liked);
+            }
+            if (likeCountSpan) {
+                likeCountSpan.textContent = state.likes_count;
+            }
+
+            USER_IS_AUTHENTICATED = state.is_authenticated;
+            USER_FULL_NAME = state.comment_defaults.name;
+            USER_EMAIL = state.comment_defaults.email;
+            if (commentForm && state.comment_defaults.readonly) {
+                const nameInput = commentForm.querySelector('input[name="name"]');
+                const emailInput = commentForm.querySelector('input[name="email"]');
+                if (nameInput) {
+                    nameInput.value = USER_FULL_NAME;
+                    nameInput.readOnly = true;
+                    nameInput.placeholder = 'Your Name (Auto-filled)';
+                }
+                if (emailInput) {
+                    emailInput.value = USER_EMAIL;
+                    emailInput.readOnly = true;
+                    emailInput.placeholder = 'Your Email (Auto-filled)';
+                }
+            }
+        } catch (error) {
+            console.error('Error loading page state:', error);
+        }
+    }
+
+
     // --- Main Initialization Function ---
     function initializeBlogDetailFeatures() {
+        loadPageState();
         generateTOC();
         highlightActiveTOCItem();
         setupTOCSmoothScroll();
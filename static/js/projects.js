@@ -13,9 +13,14 @@ document.addEventListener('DOMContentLoaded', function() {
     const nextImageBtn = document.querySelector('.modal-image-nav .next-btn');
 
     // Variables
-    let allProjectsData = []; // This will store all projects fetched from the backend
+    const PROJECTS_API_URL = '/api/projects/';
+    const CARD_FIELDS = 'card'; // Server-side alias for the fields a grid card renders
+    const DETAIL_FIELDS = 'id,title,category,completion_date,full_description,technologies,key_features,challenges_and_solutions,live_url,github_url,main_image_url,images';
+    let allProjectsData = []; // Projects loaded so far for the current filter/search (card fields only)
+    let nextPageUrl = null; // Next page of results returned by the API, if any
     let activeFilter = 'all';
     let currentSearchTerm = '';
+    let searchDebounceTimer = null;
     let currentProject = null; // Stores the currently viewed project object in the modal
     let currentImageIndex = 0;
 
@@ -25,28 +30,42 @@ document.addEventListener('DOMContentLoaded', function() {
         setupEventListeners();
     }
 
+    // --- Build the API URL for the active filter and search term ---
+    function buildProjectsUrl() {
+        const params = new URLSearchParams({ fields: CARD_FIELDS });
+        if (activeFilter !== 'all') {
+            params.set('category', activeFilter);
+        }
+        if (currentSearchTerm) {
+            params.set('q', currentSearchTerm);
+        }
+        return `${PROJECTS_API_URL}?${params.toString()}`;
+    }
+
     // --- Fetch Projects from Backend API ---
-    async function fetchProjects() {
-        projectsGrid.innerHTML = ''; // Clear grid before loading
-        // Show loading state
-        const loadingElement = document.createElement('div');
-        loadingElement.className = 'project-loading';
-        loadingElement.innerHTML = `
-          <div class="loading-spinner"></div>
-          <p>Loading projects...</p>
-        `;
-        projectsGrid.appendChild(loadingElement);
+    // Filtering, searching and pagination happen server-side; `append` loads the next page.
+    async function fetchProjects(append = false) {
+        if (!append) {
+            projectsGrid.innerHTML = ''; // Clear grid before loading
+            // Show loading state
+            const loadingElement = document.createElement('div');
+            loadingElement.className = 'project-loading';
+            loadingElement.innerHTML = `
+              <div class="loading-spinner"></div>
+              <p>Loading projects...</p>
+            `;
+            projectsGrid.appendChild(loadingElement);
+        }
 
         try {
-            // Adjust the fetch URL if you implement server-side filtering/searching
-            // For now, fetching all and doing client-side filtering as per your initial JS
-            const response = await fetch('/api/projects/'); // This is the API endpoint
+            const response = await fetch(append ? nextPageUrl : buildProjectsUrl());
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             const data = await response.json();
-            allProjectsData = data; // Store all fetched projects globally
-            filterProjects(); // Apply initial filter (all) and render
+            allProjectsData = append ? allProjectsData.concat(data.results) : data.results;
+            nextPageUrl = data.next;
+            renderProjects(allProjectsData);
         } catch (error) {
             console.error('Error fetching projects:', error);
             projectsGrid.innerHTML = `
@@ -94,6 +113,18 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Add animation delay based on index for staggered effect
                 projectElement.style.animationDelay = `${index * 0.1}s`;
             });
+
+            // Offer the next page, if the API reported one
+            if (nextPageUrl) {
+                const loadMoreBtn = document.createElement('button');
+                loadMoreBtn.className = 'cta-button load-more-btn';
+                loadMoreBtn.textContent = 'Load more projects';
+                loadMoreBtn.addEventListener('click', () => {
+                    loadMoreBtn.disabled = true;
+                    fetchProjects(true);
+                });
+                projectsGrid.appendChild(loadMoreBtn);
+            }
         }, 300); // Reduced delay for smoother feel
     }
 
@@ -113,10 +144,13 @@ document.addEventListener('DOMContentLoaded', function() {
         projectCard.dataset.category = project.category || 'other'; // Use derived category or default
         projectCard.dataset.tech = project.technologies.join(', ').toLowerCase(); // For search on technologies
 
-        // Set image (use the first image from gallery or fallback to main image)
-        const imageUrl = (project.images && project.images.length > 0) ? project.images[0] : project.main_image_url;
+        // Set image (card-sized derivative from the server, see ProjectSerializer.get_card_image_url)
+        const imageUrl = project.card_image_url;
         if (imageUrl) {
-            projectImageDiv.style.backgroundImage = `url(${imageUrl})`;
+            // The inline placeholder (if any) shows underneath until the image arrives
+            projectImageDiv.style.backgroundImage = project.card_image_placeholder
+                ? `url(${imageUrl}), url(${project.card_image_placeholder})`
+                : `url(${imageUrl})`;
             projectImageDiv.style.backgroundSize = 'cover';
             projectImageDiv.style.backgroundPosition = 'center';
         } else {
@@ -128,7 +162,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
         // Set title and short description
         projectTitle.textContent = project.title;
-        projectDescription.textContent = project.description; // 'description' is short_description from model
+        projectDescription.textContent = project.short_description;
 
         // Add technology tags
         projectTechContainer.innerHTML = ''; // Clear any template default
@@ -147,8 +181,8 @@ document.addEventListener('DOMContentLoaded', function() {
             liveLink.style.display = 'none';
         }
 
-        if (project.codeUrl) {
-            codeLink.href = project.codeUrl;
+        if (project.github_url) {
+            codeLink.href = project.github_url;
             codeLink.style.display = 'inline-flex';
         } else {
             codeLink.style.display = 'none';
@@ -172,43 +206,36 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // --- Filter Projects based on active filter and search term ---
+    // The API does the filtering; this just refetches the first page.
     function filterProjects() {
-        let filteredProjects = [...allProjectsData];
-
-        // Apply category filter
-        if (activeFilter !== 'all') {
-            filteredProjects = filteredProjects.filter(project => {
-                // The `project.category` should come from your backend API response
-                // (which is derived using `get_main_category` property in models.py)
-                return project.category === activeFilter; 
-            });
-        }
-
-        // Apply search filter (client-side)
-        if (currentSearchTerm) {
-            const searchTerm = currentSearchTerm.toLowerCase();
-            filteredProjects = filteredProjects.filter(project => {
-                return (
-                    project.title.toLowerCase().includes(searchTerm) ||
-                    project.description.toLowerCase().includes(searchTerm) ||
-                    project.full_description.toLowerCase().includes(searchTerm) || // Search full description too
-                    project.technologies.some(tech => tech.toLowerCase().includes(searchTerm))
-                );
-            });
-        }
-        renderProjects(filteredProjects);
+        fetchProjects();
     }
 
     // --- Open Project Modal with details ---
-    function openProjectModal(projectId) {
-        currentProject = allProjectsData.find(p => p.id === projectId);
+    // The grid only holds card fields, so the long-form details are fetched on demand.
+    async function openProjectModal(projectId) {
+        const cardProject = allProjectsData.find(p => p.id === projectId);
+        if (!cardProject) return;
+
+        try {
+            const params = new URLSearchParams({ slug: cardProject.slug, fields: DETAIL_FIELDS });
+            const response = await fetch(`${PROJECTS_API_URL}?${params.toString()}`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const data = await response.json();
+            currentProject = data.results[0];
+        } catch (error) {
+            console.error('Error fetching project details:', error);
+            return;
+        }
         if (!currentProject) return;
 
         currentImageIndex = 0; // Reset image index when opening a new modal
 
         // Populate modal content
         document.querySelector('.modal-title').textContent = currentProject.title;
-        document.querySelector('.modal-date').textContent = currentProject.date; // Ensure date is formatted correctly in JSON
+        document.querySelector('.modal-date').textContent = currentProject.completion_date || '';
         document.querySelector('.modal-category').textContent = currentProject.category;
         document.querySelector('.modal-description').innerHTML = currentProject.full_description; // Use innerHTML for rich text
 
@@ -216,15 +243,15 @@ document.addEventListener('DOMContentLoaded', function() {
         const liveLink = document.querySelector('.modal-link.live-link');
         const codeLink = document.querySelector('.modal-link.code-link');
 
-        if (currentproject.live_url) {
-            liveLink.href = currentproject.live_url;
+        if (currentProject.live_url) {
+            liveLink.href = currentProject.live_url;
             liveLink.style.display = 'inline-flex';
         } else {
             liveLink.style.display = 'none';
         }
 
-        if (currentProject.codeUrl) {
-            codeLink.href = currentProject.codeUrl;
+        if (currentProject.github_url) {
+            codeLink.href = currentProject.github_url;
             codeLink.style.display = 'inline-flex';
         } else {
             codeLink.style.display = 'none';
@@ -339,10 +366,13 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         });
 
-        // Search input
+        // Search input (debounced, since every change is a server round-trip)
         searchInput.addEventListener('input', (e) => {
-            currentSearchTerm = e.target.value.trim();
-            filterProjects();
+            clearTimeout(searchDebounceTimer);
+            searchDebounceTimer = setTimeout(() => {
+                currentSearchTerm = e.target.value.trim();
+                filterProjects();
+            }, 250);
         });
 
         // Modal close button and overlay